@@ -87,7 +87,9 @@ result = generate_image(
     # 重试配置
     max_retries=5,              # 最大重试 5 次
     retry_on_network_error=True,  # 遇到网络错误时重试
-    retry_delay=3.0,             # 重试间隔 3 秒
+    retry_backoff_base=1.0,      # 指数退避：约 1s、2s、4s... 后重试
+    retry_backoff_cap=30.0,      # 单次等待最多 30 秒
+    retry_jitter=True,           # 加入随机抖动
     
     # 超时配置
     submit_timeout=30,           # 提交超时 30 秒
@@ -142,7 +144,7 @@ result = generate_image(
     enable_failover=True,
     max_retries=3,
     retry_on_network_error=True,
-    retry_delay=2.0,
+    retry_backoff_base=0.5,
     
     # 超时配置
     submit_timeout=30,
@@ -6,7 +6,9 @@
 # 文件描述：基础使用示例
 # 文件路径：examples/basic_usage.py
 
-from msimg import generate_image
+import asyncio
+
+from msimg import generate_image, generate_image_async
 
 # ==================== 示例 1: 最简单的用法 ====================
 print("=" * 60)
@@ -70,18 +72,30 @@ presets = {
     "flux-majic": "FLUX 魔法模型",
 }
 
-for preset_name, description in presets.items():
+
+async def generate_all_presets():
+    """同时使用所有预设模型生成图片"""
+    tasks = [
+        generate_image_async(
+            prompt="可爱的小猫咪",
+            api_configs="your-api-key-here",
+            models=preset_name,
+            size="1:1",
+            verbose=False  # 关闭详细日志
+        )
+        for preset_name in presets
+    ]
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+results = asyncio.run(generate_all_presets())
+
+for (preset_name, description), result in zip(presets.items(), results):
     print(f"\n使用模型: {description} ({preset_name})")
     
-    result = generate_image(
-        prompt="可爱的小猫咪",
-        api_configs="your-api-key-here",
-        models=preset_name,
-        size="1:1",
-        verbose=False  # 关闭详细日志
-    )
-    
-    if result:
+    if isinstance(result, Exception):
+        print(f"❌ 生成失败: {result}")
+    elif result:
         filename = f"cat_{preset_name}.jpg"
         result['image'].save(filename)
         print(f"✅ 生成成功！保存到: {filename}")
@@ -11,15 +11,24 @@
 无需调用 generate_image，可以直接上传各种格式的图片
 """
 
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from io import BytesIO
 from msimg.image_uploader import (
     create_smms_uploader,
     create_luoguo_uploader,
     create_github_uploader,
+    upload_many_async,
 )
 from PIL import Image
 import base64
 
+# 在控制台显示图床的上传日志（msimg 默认不输出日志）
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
 # ==================== 示例 1: 上传本地图片 ====================
 print("=" * 60)
 print("📤 示例 1: 上传本地图片")
@@ -75,12 +84,13 @@ print("=" * 60)
 # 实际使用时替换为真实的 Base64 数据
 img = Image.new('RGB', (100, 100), color='blue')
 buffer = BytesIO()
-img.save(buffer, format='PNG')
+img.save(buffer, format='PNG', compress_level=1)  # 纯色图片用最快的压缩级别即可
 img_bytes = buffer.getvalue()
-base64_str = base64.b64encode(img_bytes).decode('utf-8')
+base64_bytes = base64.b64encode(img_bytes)
+base64_str = base64_bytes.decode('ascii')
 
-# 方式 1: data URI 格式
-data_uri = f"data:image/png;base64,{base64_str}"
+# 方式 1: data URI 格式（直接拼接字节，只解码一次）
+data_uri = (b"data:image/png;base64," + base64_bytes).decode('ascii')
 
 uploader = create_luoguo_uploader()
 
@@ -127,18 +137,53 @@ images = [
     Image.new('RGB', (150, 150), 'green'),  # PIL.Image
 ]
 
-for i, img in enumerate(images, 1):
-    try:
-        url = uploader(img)
-        print(f"✅ 图片 {i} 上传成功: {url}")
-    except Exception as e:
-        print(f"❌ 图片 {i} 上传失败: {e}")
+# 在事件循环中并发上传，结果顺序与 images 一致，失败的位置为 None
+results = asyncio.run(upload_many_async(uploader, images))
+
+for i, result in enumerate(results, 1):
+    if result is None:
+        print(f"❌ 图片 {i} 上传失败")
+    else:
+        print(f"✅ 图片 {i} 上传成功: {result}")
 
 # ==================== 示例 7: 使用多个图床（故障转移）====================
 print("\n" + "=" * 60)
 print("📤 示例 7: 多图床故障转移")
 print("=" * 60)
 
+
+def race_upload(uploaders, img, timeout=30):
+    """
+    同时向多个图床发起上传，返回最先成功的 URL
+
+    :param uploaders: 上传函数列表
+    :param img: 图片（支持多种格式）
+    :param timeout: 等待所有图床的总超时时间（秒）
+    :return: 最先成功的图片 URL，全部失败返回 None
+    """
+    executor = ThreadPoolExecutor(max_workers=len(uploaders))
+    futures = {executor.submit(up, img): i for i, up in enumerate(uploaders, 1)}
+    try:
+        for fut in as_completed(futures, timeout=timeout):
+            i = futures[fut]
+            try:
+                url = fut.result()
+            except Exception as e:
+                logger.debug("图床 %s 上传失败: %s", i, e)
+                continue
+            if url:
+                print(f"✅ 使用图床 {i} 上传成功: {url}")
+                return url
+    except FuturesTimeoutError:
+        logger.debug("等待图床上传超时（%s秒）", timeout)
+    finally:
+        # 取消尚未开始的上传，不等待落后的图床，直接返回
+        for fut in futures:
+            fut.cancel()
+        executor.shutdown(wait=False)
+    return None
+
+
 # 创建多个上传器
 uploaders = [
     create_smms_uploader(api_token='your-token'),
@@ -148,18 +193,9 @@ uploaders = [
 
 img = Image.new('RGB', (200, 200), color='yellow')
 
-# 尝试多个图床
-for i, uploader in enumerate(uploaders, 1):
-    try:
-        url = uploader(img)
-        print(f"✅ 使用图床 {i} 上传成功: {url}")
-        break  # 成功后退出
-    except Exception as e:
-        print(f"⚠️  图床 {i} 上传失败: {e}")
-        if i < len(uploaders):
-            print(f"🔄 尝试下一个图床...")
-        else:
-            print(f"❌ 所有图床上传失败")
+# 同时尝试多个图床，取最快成功的结果
+if race_upload(uploaders, img) is None:
+    print(f"❌ 所有图床上传失败")
 
 # ==================== 示例 8: 集成到自己的项目中 ====================
 print("\n" + "=" * 60)
@@ -20,9 +20,17 @@
 import os
 import base64
 import configparser
+import functools
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Union
 from PIL import Image, ImageDraw, ImageFont
 
+# 在控制台显示上传器 verbose 模式的日志（msimg 默认不输出日志）
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
 # ============================================================================
 # 配置部分
 # ============================================================================
@@ -45,8 +53,15 @@ DEFAULT_CONFIG = {
 }
 
 
+@functools.lru_cache(maxsize=1)
 def load_config():
-    """加载配置（优先从 config.ini 读取）"""
+    """
+    加载配置（每个进程只解析一次）
+
+    优先级：环境变量 > config.ini > DEFAULT_CONFIG。
+    环境变量名为 MSIMG_ + 配置名，例如 MSIMG_WECHAT_APP_ID（MSIMG_API_KEY 保持原名），
+    CI 中无需写入 config.ini。
+    """
     config = DEFAULT_CONFIG.copy()
 
     config_file = Path(__file__).parent / 'config.ini'
@@ -64,6 +79,11 @@ def load_config():
             config['WECHAT_SERVER_TOKEN'] = parser.get('optional', 'server_token', fallback='')
             config['MSIMG_API_KEY'] = parser.get('optional', 'msimg_api_key', fallback='')
 
+    # 环境变量覆盖
+    for key in DEFAULT_CONFIG:
+        env_name = key if key.startswith('MSIMG_') else f"MSIMG_{key}"
+        config[key] = os.environ.get(env_name, config[key])
+
     return config
 
 
@@ -82,8 +102,9 @@ TEST_IMAGE_URL = CONFIG['TEST_IMAGE_URL']
 # 配置检查
 # ============================================================================
 
+@functools.lru_cache(maxsize=1)
 def check_config():
-    """检查配置是否完整"""
+    """检查配置是否完整（配置在进程内不变，只检查一次）"""
     if not (WECHAT_APP_ID and WECHAT_APP_SECRET):
         print("\n" + "=" * 70)
         print("⚠️  配置不完整")
@@ -111,7 +132,8 @@ msimg_api_key = your_msimg_api_key
         print("\n💡 提示：")
         print("  • 如果遇到 IP 白名单错误，请配置 server_url")
         print("  • server_url 优先使用，失败后自动降级到直接获取")
-        print("  • 可以只配置 app_id 和 app_secret，程序会自动尝试\n")
+        print("  • 可以只配置 app_id 和 app_secret，程序会自动尝试")
+        print("  • 也可以通过环境变量配置，如 MSIMG_WECHAT_APP_ID、MSIMG_WECHAT_APP_SECRET\n")
         print("=" * 70 + "\n")
         return False
 
@@ -122,6 +144,25 @@ msimg_api_key = your_msimg_api_key
 # 辅助函数
 # ============================================================================
 
+# 候选中文字体（按优先级）
+FONT_CANDIDATES = (
+    "msyh.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_fonts() -> tuple:
+    """查找可用字体（只探测一次），返回 (标题字体, 副标题字体)"""
+    for font_path in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(font_path, 60), ImageFont.truetype(font_path, 30)
+        except OSError:
+            continue
+    return ImageFont.load_default(), ImageFont.load_default()
+
+
 def create_test_image(save_path: str = TEST_IMAGE_PATH) -> str:
     """创建测试图片"""
     print(f"\n🎨 正在创建测试图片...")
@@ -131,20 +172,7 @@ def create_test_image(save_path: str = TEST_IMAGE_PATH) -> str:
 
     text = "微信公众号图床测试"
 
-    try:
-        font = ImageFont.truetype("msyh.ttc", 60)
-        small_font = ImageFont.truetype("msyh.ttc", 30)
-    except:
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/PingFang.ttc", 60)
-            small_font = ImageFont.truetype("/System/Library/Fonts/PingFang.ttc", 30)
-        except:
-            try:
-                font = ImageFont.truetype("/usr/share/fonts/truetype/wqy/wqy-microhei.ttc", 60)
-                small_font = ImageFont.truetype("/usr/share/fonts/truetype/wqy/wqy-microhei.ttc", 30)
-            except:
-                font = ImageFont.load_default()
-                small_font = ImageFont.load_default()
+    font, small_font = _resolve_fonts()
 
     try:
         bbox = draw.textbbox((0, 0), text, font=font)
@@ -166,18 +194,27 @@ def create_test_image(save_path: str = TEST_IMAGE_PATH) -> str:
     position2 = ((800 - text_width2) // 2, position[1] + text_height + 20)
     draw.text(position2, subtitle, fill=(200, 200, 200), font=small_font)
 
-    img.save(save_path, 'JPEG', quality=95)
+    img.save(save_path, 'JPEG', quality=85)
     print(f"✅ 测试图片已创建: {save_path}")
 
     return save_path
 
 
-def image_to_base64(image_path: str) -> str:
-    """将图片转换为 Base64"""
-    with open(image_path, 'rb') as f:
-        image_data = f.read()
-    base64_str = base64.b64encode(image_data).decode('utf-8')
-    return f"data:image/jpeg;base64,{base64_str}"
+@functools.lru_cache(maxsize=16)
+def _read_image_bytes(image_path: str, mtime: float) -> bytes:
+    """读取图片字节（按路径 + 修改时间缓存，文件被重新生成后自动失效）"""
+    return Path(image_path).read_bytes()
+
+
+def read_image_bytes(image_path: str) -> bytes:
+    """读取图片字节，同一文件多次读取只访问一次磁盘"""
+    return _read_image_bytes(image_path, os.path.getmtime(image_path))
+
+
+def image_to_base64(image: Union[str, bytes]) -> str:
+    """将图片（路径或字节）转换为 Base64"""
+    image_data = image if isinstance(image, bytes) else read_image_bytes(image)
+    return (b"data:image/jpeg;base64," + base64.b64encode(image_data)).decode('ascii')
 
 
 def print_section(title: str):
@@ -329,68 +366,45 @@ def test_multiple_input_formats():
     try:
         from msimg.wechat_uploader import create_wechat_uploader
 
+        # 关闭结果缓存，确保每种输入格式都真正上传一次
         uploader = create_wechat_uploader(
             app_id=WECHAT_APP_ID,
             app_secret=WECHAT_APP_SECRET,
             server_url=WECHAT_SERVER_URL if WECHAT_SERVER_URL else None,
+            cache=False,
             verbose=True
         )
 
+        image_bytes = read_image_bytes(TEST_IMAGE_PATH)
+
+        # 各输入格式互不依赖，并发上传
+        inputs = [
+            ("📁", "本地文件路径", TEST_IMAGE_PATH),
+            ("🌐", "网络 URL", TEST_IMAGE_URL),
+            ("🖼️ ", "PIL.Image 对象", Image.open(TEST_IMAGE_PATH)),
+            ("📝", "Base64 编码", image_to_base64(image_bytes)),
+            ("💾", "字节流", image_bytes),
+        ]
+
+        outcomes = {}
+        with ThreadPoolExecutor(max_workers=len(inputs)) as executor:
+            futures = {executor.submit(uploader, value): name for _, name, value in inputs}
+            for future in as_completed(futures):
+                try:
+                    outcomes[futures[future]] = (True, future.result())
+                except Exception as e:
+                    outcomes[futures[future]] = (False, e)
+
+        # 按固定顺序输出结果
         results = []
-
-        # 5.1 本地文件路径
-        print("📁 测试本地文件路径...")
-        try:
-            media_id = uploader(TEST_IMAGE_PATH)
-            print_result("本地文件路径", f"Media ID: {media_id}", True)
-            results.append(True)
-        except Exception as e:
-            print_result("本地文件路径", f"失败: {e}", False)
-            results.append(False)
-
-        # 5.2 网络 URL
-        print("\n🌐 测试网络 URL...")
-        try:
-            media_id = uploader(TEST_IMAGE_URL)
-            print_result("网络 URL", f"Media ID: {media_id}", True)
-            results.append(True)
-        except Exception as e:
-            print_result("网络 URL", f"失败: {e}", False)
-            results.append(False)
-
-        # 5.3 PIL.Image 对象
-        print("\n🖼️  测试 PIL.Image 对象...")
-        try:
-            img = Image.open(TEST_IMAGE_PATH)
-            media_id = uploader(img)
-            print_result("PIL.Image 对象", f"Media ID: {media_id}", True)
-            results.append(True)
-        except Exception as e:
-            print_result("PIL.Image 对象", f"失败: {e}", False)
-            results.append(False)
-
-        # 5.4 Base64 编码
-        print("\n📝 测试 Base64 编码...")
-        try:
-            base64_str = image_to_base64(TEST_IMAGE_PATH)
-            media_id = uploader(base64_str)
-            print_result("Base64 编码", f"Media ID: {media_id}", True)
-            results.append(True)
-        except Exception as e:
-            print_result("Base64 编码", f"失败: {e}", False)
-            results.append(False)
-
-        # 5.5 字节流
-        print("\n💾 测试字节流...")
-        try:
-            with open(TEST_IMAGE_PATH, 'rb') as f:
-                image_bytes = f.read()
-            media_id = uploader(image_bytes)
-            print_result("字节流", f"Media ID: {media_id}", True)
-            results.append(True)
-        except Exception as e:
-            print_result("字节流", f"失败: {e}", False)
-            results.append(False)
+        for icon, name, _ in inputs:
+            print(f"\n{icon} 测试{name}...")
+            success, value = outcomes[name]
+            if success:
+                print_result(name, f"Media ID: {value}", True)
+            else:
+                print_result(name, f"失败: {value}", False)
+            results.append(success)
 
         return all(results)
 
@@ -521,6 +535,7 @@ def test_error_handling():
                 app_secret=WECHAT_APP_SECRET,
                 server_url=WECHAT_SERVER_URL if WECHAT_SERVER_URL else None,
                 upload_type=WechatUploadType.TEMPORARY,
+                auto_resize=False,
                 verbose=False
             )
 
@@ -563,6 +578,7 @@ def test_error_handling():
                 app_secret=WECHAT_APP_SECRET,
                 server_url=WECHAT_SERVER_URL if WECHAT_SERVER_URL else None,
                 upload_type=WechatUploadType.PERMANENT,
+                auto_resize=False,
                 verbose=False
             )
 
@@ -598,7 +614,7 @@ def test_format_conversion():
         draw.text((100, 100), "PNG Test", fill=(255, 255, 255, 255))
 
         png_path = "test_png_alpha.png"
-        png_img.save(png_path, 'PNG')
+        png_img.save(png_path, 'PNG', compress_level=1)
         print(f"✅ PNG 测试图片已创建: {png_path}")
 
         # 上传并测试自动转换
@@ -668,9 +684,10 @@ def run_all_tests():
     # 统计结果
     print_section("📊 测试结果统计")
 
-    passed = sum(1 for r in results.values() if r is True)
-    failed = sum(1 for r in results.values() if r is False)
-    skipped = sum(1 for r in results.values() if r is None)
+    counts = Counter(results.values())
+    passed = counts.get(True, 0)
+    failed = counts.get(False, 0)
+    skipped = counts.get(None, 0)
     total = len(results)
 
     for name, result in results.items():
@@ -736,8 +753,7 @@ msimg_api_key =
 """
 
     config_file = Path(__file__).parent / 'config.ini.example'
-    with open(config_file, 'w', encoding='utf-8') as f:
-        f.write(config_content)
+    config_file.write_text(config_content, encoding='utf-8')
 
     print(f"\n✅ 配置文件模板已创建: {config_file}")
     print(f"💡 请复制此文件为 config.ini 并填写配置\n")
@@ -6,48 +6,76 @@
 # 文件描述：msimg 模块入口文件，导出核心功能
 # 文件路径：msimg/__init__.py
 
+import importlib
+
 from .version import __version__, __author__, __email__
-from .generator import generate_image
-from .config import APIConfig
-from .strategies import SelectionStrategy, NotificationMode
-from .constants import SIZE_PRESETS, MODEL_PRESETS
-from .exceptions import (
-    MsimgError,
-    APIError,
-    NetworkError,
-    TimeoutError,
-    ValidationError,
-)
-
-# 图床上传器类
-from .image_uploader import (
-    # 上传器类
-    SMUploader,
-    ImgURLUploader,
-    LuoGuoUploader,
-    QiniuUploader,
-    AliyunOSSUploader,
-    UpyunUploader,
-    GitHubUploader,
-    LocalStorageUploader,
-
-    # 便捷创建函数
-    create_smms_uploader,
-    create_imgurl_uploader,
-    create_luoguo_uploader,
-    create_qiniu_uploader,
-    create_aliyun_uploader,
-    create_upyun_uploader,
-    create_github_uploader,
-    create_local_uploader,
-)
-
-# 微信公众号图床上传器
-from .wechat_uploader import (
-    WechatUploader,
-    create_wechat_uploader,
-    WechatUploadType
-)
+
+# 导出名称 -> 所在子模块（首次访问时才导入，避免 import msimg 时加载 requests、PIL 等依赖）
+_LAZY_IMPORTS = {
+    # 核心功能
+    "generate_image": ".generator",
+    "generate_image_async": ".generator",
+
+    # 配置类
+    "APIConfig": ".config",
+
+    # 策略枚举
+    "SelectionStrategy": ".strategies",
+    "NotificationMode": ".strategies",
+
+    # 预设常量
+    "SIZE_PRESETS": ".constants",
+    "MODEL_PRESETS": ".constants",
+
+    # 异常类
+    "MsimgError": ".exceptions",
+    "APIError": ".exceptions",
+    "NetworkError": ".exceptions",
+    "TimeoutError": ".exceptions",
+    "ValidationError": ".exceptions",
+
+    # 图床上传器类
+    "SMUploader": ".image_uploader",
+    "ImgURLUploader": ".image_uploader",
+    "LuoGuoUploader": ".image_uploader",
+    "QiniuUploader": ".image_uploader",
+    "AliyunOSSUploader": ".image_uploader",
+    "UpyunUploader": ".image_uploader",
+    "GitHubUploader": ".image_uploader",
+    "LocalStorageUploader": ".image_uploader",
+
+    # 图床便捷创建函数
+    "create_smms_uploader": ".image_uploader",
+    "create_imgurl_uploader": ".image_uploader",
+    "create_luoguo_uploader": ".image_uploader",
+    "create_qiniu_uploader": ".image_uploader",
+    "create_aliyun_uploader": ".image_uploader",
+    "create_upyun_uploader": ".image_uploader",
+    "create_github_uploader": ".image_uploader",
+    "create_local_uploader": ".image_uploader",
+    "upload_batch": ".image_uploader",
+    "upload_many_async": ".image_uploader",
+
+    # 微信公众号图床上传器
+    "WechatUploader": ".wechat_uploader",
+    "create_wechat_uploader": ".wechat_uploader",
+    "WechatUploadType": ".wechat_uploader",
+}
+
+
+def __getattr__(name: str):
+    """按需导入导出的名称（PEP 562），导入后缓存到模块全局变量"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
+
 
 __all__ = [
     # 版本信息
@@ -57,6 +85,7 @@ __all__ = [
 
     # 核心功能
     "generate_image",
+    "generate_image_async",
 
     # 配置类
     "APIConfig",
@@ -98,4 +127,6 @@ __all__ = [
     "create_github_uploader",
     "create_local_uploader",
     "create_wechat_uploader",
+    "upload_batch",
+    "upload_many_async",
 ]
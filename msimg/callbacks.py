@@ -7,10 +7,68 @@
 # 文件路径：msimg/callbacks.py
 
 from typing import List, Callable, Dict, Any, Optional, Union
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from PIL import Image
+import atexit
 import random
+import threading
 
 from .strategies import SelectionStrategy, NotificationMode
+from .image_uploader import _LRUCache, _digest_reuse, _image_cache_key, _image_to_bytes
+
+
+def _noop(*args, **kwargs) -> None:
+    """空操作（用于替换无需执行的 notify / upload / 日志输出）"""
+    return None
+
+
+# 上传结果缓存（进程内共享）：{(id(回调), 图片内容键): (回调, URL)}
+# 值中保留回调对象本身，命中时校验身份，避免回调被回收后 id 复用导致误命中
+_upload_result_cache = _LRUCache(maxsize=256)
+
+
+# 通知回调共享线程池（惰性创建，进程退出时等待未完成的通知发送完毕）
+_notify_executor: Optional[ThreadPoolExecutor] = None
+_notify_executor_lock = threading.Lock()
+
+
+# 故障转移对冲上传共享线程池（惰性创建，只在设置了 hedge_delay 时使用）
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    """
+    获取故障转移对冲上传共享线程池（惰性创建，线程安全）
+
+    :return: ThreadPoolExecutor 对象
+    """
+    global _hedge_executor
+    if _hedge_executor is None:
+        with _notify_executor_lock:
+            if _hedge_executor is None:
+                _hedge_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='msimg-hedge')
+                atexit.register(_hedge_executor.shutdown)
+    return _hedge_executor
+
+
+def _get_notify_executor() -> ThreadPoolExecutor:
+    """
+    获取通知回调共享线程池（惰性创建，线程安全）
+
+    :return: ThreadPoolExecutor 对象
+    """
+    global _notify_executor
+    if _notify_executor is None:
+        with _notify_executor_lock:
+            if _notify_executor is None:
+                _notify_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='msimg-notify')
+                atexit.register(_notify_executor.shutdown)
+    return _notify_executor
+
+
+def _in_notify_worker() -> bool:
+    """当前线程是否为通知回调共享线程池的工作线程"""
+    return threading.current_thread().name.startswith('msimg-notify')
 
 
 class ResourceSelector:
@@ -23,6 +81,8 @@ class ResourceSelector:
     - ROUND_ROBIN: 轮询选择（记住上次位置）
     """
 
+    __slots__ = ('strategy', 'round_robin_index')
+
     def __init__(self, strategy: SelectionStrategy):
         """
         初始化选择器
@@ -32,47 +92,44 @@ class ResourceSelector:
         self.strategy = strategy
         self.round_robin_index = 0
 
-    def select(self, resources: List, used_indices: set = None) -> tuple:
+    def select(self, resources: List, used_indices: set = None, used_mask: int = 0) -> tuple:
         """
         选择资源
         
         :param resources: 资源列表
-        :param used_indices: 已使用过的索引集合（用于容错时跳过已失败的）
+        :param used_indices: 已使用过的索引集合（兼容旧版本，会合并到 used_mask）
+        :param used_mask: 已使用过的索引位掩码，第 i 位为 1 表示索引 i 已失败（用于容错时跳过）
         :return: (选中的资源, 索引)
         """
         if not resources:
             return None, -1
 
-        if used_indices is None:
-            used_indices = set()
+        if used_indices:
+            for i in used_indices:
+                used_mask |= 1 << i
 
-        # 获取可用的索引
-        available_indices = [i for i in range(
-            len(resources)) if i not in used_indices]
-        if not available_indices:
+        # 可用索引的位掩码
+        n = len(resources)
+        full = (1 << n) - 1
+        available = full & ~used_mask
+        if not available:
             return None, -1
 
-        if self.strategy == SelectionStrategy.RANDOM:
-            # 随机选择
-            index = random.choice(available_indices)
-        elif self.strategy == SelectionStrategy.SEQUENTIAL:
-            # 顺序选择（第一个可用的）
-            index = available_indices[0]
-        elif self.strategy == SelectionStrategy.ROUND_ROBIN:
-            # 轮询选择
-            # 从当前位置开始找下一个可用的
-            for _ in range(len(resources)):
-                if self.round_robin_index in available_indices:
-                    index = self.round_robin_index
-                    self.round_robin_index = (
-                        self.round_robin_index + 1) % len(resources)
-                    break
-                self.round_robin_index = (
-                    self.round_robin_index + 1) % len(resources)
-            else:
-                index = available_indices[0]
+        if self.strategy is SelectionStrategy.RANDOM:
+            # 随机选择：随机取第 k 个可用位（逐次清除最低位），不构造候选列表
+            remaining = available
+            for _ in range(random.randrange(bin(available).count('1'))):
+                remaining &= remaining - 1
+            index = (remaining & -remaining).bit_length() - 1
+        elif self.strategy is SelectionStrategy.ROUND_ROBIN:
+            # 轮询选择：把可用掩码循环右移到当前位置，最低位即为从当前位置起的下一个可用索引
+            start = self.round_robin_index % n
+            rotated = ((available >> start) | (available << (n - start))) & full
+            index = (start + (rotated & -rotated).bit_length() - 1) % n
+            self.round_robin_index = (index + 1) % n
         else:
-            index = available_indices[0]
+            # 顺序选择（第一个可用的，即最低位）
+            index = (available & -available).bit_length() - 1
 
         return resources[index], index
 
@@ -84,101 +141,197 @@ class NotificationManager:
     负责管理消息通知的发送，支持多种通知模式和策略
     """
 
+    # 使用 __slots__ 节省实例内存并加快属性访问；notify 是按实例绑定的入口（见 __init__）
+    __slots__ = ('callbacks', 'mode', 'strategy', 'verbose', 'blocking', 'selector', 'notify',
+                 '_log', '_callback_names', '_callbacks_named', '_send_on_success', '_send_on_error')
+
     def __init__(
         self,
         callbacks: Optional[List[Callable]] = None,
         mode: NotificationMode = NotificationMode.NONE,
         strategy: SelectionStrategy = SelectionStrategy.SEQUENTIAL,
         verbose: bool = True,
+        blocking: bool = True,
     ):
         """
         初始化通知管理器
         
         :param callbacks: 回调函数列表
         :param mode: 通知模式（SUCCESS/ERROR/ALL/NONE）
-        :param strategy: 回调函数选择策略
+        :param strategy: 回调函数选择策略（SEQUENTIAL 在当前线程按顺序通知全部回调，PARALLEL 并发通知全部回调，
+                         RANDOM/ROUND_ROBIN 只通知其中一个）
         :param verbose: 是否显示详细日志
+        :param blocking: 是否等待通知发送完成；False 时在后台线程发送，notify 立即返回
         """
         self.callbacks = callbacks or []
         self.mode = mode
         self.strategy = strategy
         self.verbose = verbose
+        self.blocking = blocking
+        self._log = print if verbose else _noop
         self.selector = ResourceSelector(strategy)
+        self._callback_names = [getattr(cb, '__name__', f'回调函数{i+1}')
+                                for i, cb in enumerate(self.callbacks)]
+        self._callbacks_named = tuple(zip(self.callbacks, self._callback_names))
+
+        # 模式和策略在创建后不再变化，预先计算，避免每次通知都重复判断
+        self._send_on_success = bool(self.callbacks) and mode in (NotificationMode.SUCCESS, NotificationMode.ALL)
+        self._send_on_error = bool(self.callbacks) and mode in (NotificationMode.ERROR, NotificationMode.ALL)
 
-    def notify(self, message: str, is_success: bool = True, data: Optional[Dict[str, Any]] = None):
+        # 不会发送任何通知时，直接把 notify 设为空操作；否则按配置生成专用的 notify 函数
+        if self._send_on_success or self._send_on_error:
+            self.notify = self._compile_notify()
+        else:
+            self.notify = _noop
+
+    def _compile_notify(self) -> Callable:
         """
-        发送通知
-        
-        :param message: 消息内容
-        :param is_success: 是否为成功消息
-        :param data: 附加数据
+        根据创建时已确定的模式、策略、阻塞方式和回调列表，生成专用的 notify 函数
+
+        生成的函数中不再包含对这些配置的判断，例如单个回调的阻塞通知就是一段直接调用回调的 try/except。
+        回调和名称通过命名空间传入，不拼接到源码中。
+
+        :return: notify(message, is_success=True, data=None) 函数
         """
-        # 根据模式判断是否需要发送
-        if self.mode == NotificationMode.NONE:
-            return
-
-        if self.mode == NotificationMode.SUCCESS and not is_success:
-            return
-
-        if self.mode == NotificationMode.ERROR and is_success:
-            return
-
-        if not self.callbacks:
-            return
-
-        # 根据策略选择回调函数
-        if self.strategy == SelectionStrategy.SEQUENTIAL:
-            # 顺序调用所有回调
-            self._notify_all(message, is_success, data)
-        elif self.strategy == SelectionStrategy.RANDOM:
-            # 随机选择一个回调
-            self._notify_single(message, is_success, data)
-        elif self.strategy == SelectionStrategy.ROUND_ROBIN:
-            # 轮询选择回调
-            self._notify_single(message, is_success, data)
+        namespace = {
+            'log': self._log,
+            'call': self._call_callback,
+            'wait': wait,
+            'get_executor': _get_notify_executor,
+            'select_one': self._notify_single,
+        }
+        lines = ['def notify(message, is_success=True, data=None):']
+
+        # 通知模式：只保留需要的判断
+        if not self._send_on_error:
+            lines.append('    if not is_success: return')
+        elif not self._send_on_success:
+            lines.append('    if is_success: return')
+
+        # 通知数据只构建一次，所有回调共享同一个字典（回调不应修改它）
+        lines.append("    payload = {'message': message, 'is_success': is_success, "
+                     "'data': data if data is not None else {}}")
+
+        if self.strategy in (SelectionStrategy.RANDOM, SelectionStrategy.ROUND_ROBIN):
+            # 随机 / 轮询：只选择一个回调
+            lines.append('    select_one(payload)')
+        elif len(self._callbacks_named) == 1 and self.blocking:
+            # 单个回调且需要等待：直接调用
+            callback, name = self._callbacks_named[0]
+            namespace.update(cb0=callback, name0=name)
+            lines += [
+                '    try:',
+                '        cb0(payload)',
+                '        log(f"📢 通知已发送到: {name0}")' if self.verbose else '        pass',
+                '    except Exception as e:',
+                '        log(f"⚠️  调用回调函数失败: {str(e)}")' if self.verbose else '        pass',
+            ]
+        elif self.strategy in (SelectionStrategy.PARALLEL, SelectionStrategy.RACE):
+            # 并行 / 竞速：所有回调并发发送
+            calls = []
+            for i, (callback, name) in enumerate(self._callbacks_named):
+                namespace[f'cb{i}'] = callback
+                namespace[f'name{i}'] = name
+                calls.append(f'submit(call, cb{i}, name{i}, payload)')
+            if self.blocking:
+                # 在通知线程池的工作线程中（回调内再次发送通知）时不能等待同一个线程池，改为在当前线程依次发送
+                namespace.update(in_worker=_in_notify_worker, send_all=self._send_all)
+                lines += [
+                    '    if in_worker():',
+                    '        send_all(payload)',
+                    '        return',
+                    '    submit = get_executor().submit',
+                    f'    wait(({", ".join(calls)},))',
+                ]
+            else:
+                lines.append('    submit = get_executor().submit')
+                lines += [f'    {c}' for c in calls]
         else:
-            # 默认调用所有
-            self._notify_all(message, is_success, data)
+            # 顺序：按列表顺序依次发送；非阻塞时整组作为一个后台任务，仍保持顺序
+            namespace['send_all'] = self._send_all
+            if self.blocking:
+                lines.append('    send_all(payload)')
+            else:
+                lines.append('    get_executor().submit(send_all, payload)')
+
+        exec('\n'.join(lines), namespace)
+        notify = namespace['notify']
+        notify.__doc__ = '发送通知（message: 消息内容，is_success: 是否为成功消息，data: 附加数据）'
+        return notify
 
-    def _notify_all(self, message: str, is_success: bool, data: Optional[Dict[str, Any]]):
-        """调用所有回调函数"""
-        for index, callback in enumerate(self.callbacks):
-            self._call_callback(callback, index, message, is_success, data)
+    def _send_all(self, payload: Dict[str, Any]):
+        """在当前线程中按顺序调用所有回调函数"""
+        for callback, name in self._callbacks_named:
+            self._call_callback(callback, name, payload)
 
-    def _notify_single(self, message: str, is_success: bool, data: Optional[Dict[str, Any]]):
+    def _notify_single(self, payload: Dict[str, Any]):
         """调用单个回调函数"""
         callback, index = self.selector.select(self.callbacks)
         if callback:
-            self._call_callback(callback, index, message, is_success, data)
+            name = self._callback_names[index]
+            if self.blocking:
+                self._call_callback(callback, name, payload)
+            else:
+                _get_notify_executor().submit(self._call_callback, callback, name, payload)
 
     def _call_callback(
         self,
         callback: Callable,
-        index: int,
-        message: str,
-        is_success: bool,
-        data: Optional[Dict[str, Any]]
+        callback_name: str,
+        payload: Dict[str, Any],
     ):
         """调用回调函数"""
         try:
-            callback_name = getattr(callback, '__name__', f'回调函数{index+1}')
+            callback(payload)
 
-            # 构建通知数据
-            notification_data = {
-                'message': message,
-                'is_success': is_success,
-                'data': data or {},
-            }
+            self._log(f"📢 通知已发送到: {callback_name}")
 
-            # 调用回调函数
-            callback(notification_data)
+        except Exception as e:
+            self._log(f"⚠️  调用回调函数失败: {str(e)}")
 
-            if self.verbose:
-                print(f"📢 通知已发送到: {callback_name}")
 
-        except Exception as e:
-            if self.verbose:
-                print(f"⚠️  调用回调函数失败: {str(e)}")
+class _CanonicalImage:
+    """
+    图片输入的统一字节表示（惰性转换，线程安全，只转换一次）
+
+    PIL 图片沿用原始格式（有原始字节时直接复用），否则编码为 PNG（无损，保留透明通道）；
+    本地文件读取一次，网络图片下载一次。
+    """
+
+    __slots__ = ('original', '_bytes', '_lock')
+
+    def __init__(self, original: Union[str, Image.Image]):
+        self.original = original
+        self._bytes: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    @property
+    def bytes(self) -> bytes:
+        if self._bytes is None:
+            with self._lock:
+                if self._bytes is None:
+                    self._bytes = _image_to_bytes(self.original, format=None)[0]
+        return self._bytes
+
+
+class _LazyImageKey:
+    """
+    上传结果缓存使用的图片内容键（惰性计算，只计算一次）
+
+    结果缓存为空时不需要查询，上传成功写入缓存时才计算；此时编码缓存已算好像素摘要，可直接复用。
+    """
+
+    __slots__ = ('_image', '_value')
+
+    def __init__(self, image: Union[str, bytes, Image.Image]):
+        self._image = image
+        self._value: Optional[str] = None
+
+    @property
+    def value(self) -> str:
+        if self._value is None:
+            self._value = _image_cache_key(self._image)
+        return self._value
 
 
 class ImageUploadManager:
@@ -188,12 +341,18 @@ class ImageUploadManager:
     负责管理图片上传到图床的过程，支持多图床和不同的上传策略
     """
 
+    # 使用 __slots__ 节省实例内存并加快属性访问；upload 是按实例绑定的入口（见 __init__）
+    __slots__ = ('upload_callbacks', 'strategy', 'verbose', 'hedge_delay', 'selector', 'upload',
+                 '_log', '_callback_names', '_use_result_cache', '_canonicalize', '_upload_impl')
+
     def __init__(
         self,
         upload_callbacks: Optional[List[Callable[[
             Union[str, bytes, Image.Image]], str]]] = None,
         strategy: SelectionStrategy = SelectionStrategy.SEQUENTIAL,
         verbose: bool = True,
+        hedge_delay: Optional[float] = None,
+        result_cache: bool = True,
     ):
         """
         初始化上传管理器
@@ -201,13 +360,46 @@ class ImageUploadManager:
         :param upload_callbacks: 上传回调函数列表，函数签名为 func(image) -> str(url)
         :param strategy: 上传策略
         :param verbose: 是否显示详细日志
+        :param hedge_delay: 故障转移模式下，当前图床超过该时间（秒）未返回时，并发尝试下一个图床；
+                            默认 None，严格按顺序逐个尝试。开启后慢的图床不会被中断，仍会在后台完成上传，
+                            同一张图片可能同时出现在多个图床上（只返回最先成功的 URL）
+        :param result_cache: 是否为自定义回调缓存上传结果（同一回调上传相同图片时直接返回上次的 URL）；
+                             内置图床函数（create_*_uploader 创建）由其自身的 cache 参数控制，不受此影响
         """
         self.upload_callbacks = upload_callbacks or []
         self.strategy = strategy
         self.verbose = verbose
+        self._log = print if verbose else _noop
+        self.hedge_delay = hedge_delay
         self.selector = ResourceSelector(strategy)
+        self._callback_names = [getattr(cb, '__name__', f'图床{i+1}')
+                                for i, cb in enumerate(self.upload_callbacks)]
+
+        # 内置图床函数（create_*_uploader 创建）带 cache 属性，由其自身决定是否缓存（cache=False 时为 None），
+        # 只为其他回调做结果缓存
+        self._use_result_cache = result_cache and any(not hasattr(cb, 'cache') for cb in self.upload_callbacks)
+
+        # 多个图床中有可直接接收字节的函数时，上传前把图片统一转换为字节（只转换一次）
+        self._canonicalize = (len(self.upload_callbacks) > 1
+                              and any(getattr(cb, '__canonical__', False) for cb in self.upload_callbacks))
+
+        if strategy is SelectionStrategy.SEQUENTIAL:
+            # 顺序尝试所有图床（故障转移）
+            self._upload_impl = self._upload_with_failover
+        elif strategy is SelectionStrategy.PARALLEL:
+            # 同时上传到所有图床（镜像）
+            self._upload_impl = self._upload_parallel
+        else:
+            # 选择单个图床上传
+            self._upload_impl = self._upload_single
 
-    def upload(self, image: Union[str, bytes, Image.Image]) -> Optional[str]:
+        # 没有图床时，直接把 upload 设为空操作
+        if self.upload_callbacks:
+            self.upload = self._upload
+        else:
+            self.upload = _noop
+
+    def _upload(self, image: Union[str, bytes, Image.Image]) -> Optional[str]:
         """
         上传图片到图床
         
@@ -222,59 +414,135 @@ class ImageUploadManager:
         if not self.upload_callbacks:
             return None
 
-        if self.verbose:
-            print(f"\n📤 开始上传图片到图床...")
+        self._log(f"\n📤 开始上传图片到图床...")
 
-        # 根据策略上传
-        if self.strategy == SelectionStrategy.SEQUENTIAL:
-            # 顺序尝试所有图床（故障转移）
-            return self._upload_with_failover(image)
-        else:
-            # 选择单个图床上传
-            return self._upload_single(image)
+        # 图片内容键惰性计算且只计算一次，供各图床回调的结果缓存使用
+        image_key = _LazyImageKey(image) if self._use_result_cache else None
 
-    def _upload_with_failover(self, image: Union[str, bytes, Image.Image]) -> Optional[str]:
-        """顺序尝试所有图床（故障转移）"""
-        for index, callback in enumerate(self.upload_callbacks):
-            url = self._call_upload_callback(callback, index, image)
-            if url:
-                return url
+        if self._canonicalize and not isinstance(image, bytes):
+            image = _CanonicalImage(image)
+
+        # 根据策略上传（上传方式在初始化时已确定）；同一次上传内编码与缓存键共用像素摘要
+        with _digest_reuse():
+            return self._upload_impl(image, image_key)
+
+    @staticmethod
+    def clear_cache():
+        """清空上传结果缓存（例如更换图床账号后）"""
+        _upload_result_cache.clear()
+
+    def _upload_with_failover(self, image: Union[str, bytes, Image.Image],
+                              image_key: Optional[_LazyImageKey] = None) -> Optional[str]:
+        """
+        按顺序尝试所有图床（故障转移）
+
+        未设置 hedge_delay 时在当前线程中逐个尝试，返回第一个成功的 URL；
+        设置后，上一个图床失败或超过 hedge_delay 秒仍未返回时，启动下一个图床（对冲请求），
+        返回最先成功的 URL，尚未开始的任务会被取消，已开始的上传仍会在后台完成。
+        """
+        total = len(self.upload_callbacks)
+        if self.hedge_delay is None:
+            for index, callback in enumerate(self.upload_callbacks):
+                url = self._call_upload_callback(callback, index, image, image_key)
+                if url:
+                    return url
+            print(f"❌ 所有图床上传均失败")
+            return None
+
+        executor = _get_hedge_executor()
+        pending = set()
+        next_index = 0
+
+        try:
+            while True:
+                if next_index < total:
+                    pending.add(executor.submit(
+                        self._call_upload_callback,
+                        self.upload_callbacks[next_index], next_index, image, image_key))
+                    next_index += 1
+
+                if not pending:
+                    break
+
+                # 还有未尝试的图床时，最多等待 hedge_delay 秒
+                timeout = self.hedge_delay if next_index < total else None
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = future.result()
+                    if url:
+                        return url
+        finally:
+            for future in pending:
+                future.cancel()
 
         print(f"❌ 所有图床上传均失败")
         return None
 
-    def _upload_single(self, image: Union[str, bytes, Image.Image]) -> Optional[str]:
+    def _upload_parallel(self, image: Union[str, bytes, Image.Image],
+                         image_key: Optional[_LazyImageKey] = None) -> Optional[str]:
+        """
+        同时上传到所有图床（镜像），等待全部完成
+
+        总耗时约等于最慢的图床，而不是所有图床耗时之和。
+
+        :return: 按图床顺序第一个成功的 URL，全部失败返回 None
+        """
+        total = len(self.upload_callbacks)
+        with ThreadPoolExecutor(max_workers=total) as executor:
+            futures = [executor.submit(self._call_upload_callback, callback, index, image, image_key)
+                       for index, callback in enumerate(self.upload_callbacks)]
+            urls = [future.result() for future in futures]
+
+        succeeded = [url for url in urls if url]
+        self._log(f"📦 镜像上传完成: {len(succeeded)}/{total} 个图床成功")
+        if succeeded:
+            return succeeded[0]
+
+        print(f"❌ 所有图床上传均失败")
+        return None
+
+    def _upload_single(self, image: Union[str, bytes, Image.Image],
+                       image_key: Optional[_LazyImageKey] = None) -> Optional[str]:
         """上传到单个选中的图床"""
         callback, index = self.selector.select(self.upload_callbacks)
         if callback:
-            return self._call_upload_callback(callback, index, image)
+            return self._call_upload_callback(callback, index, image, image_key)
         return None
 
     def _call_upload_callback(
         self,
         callback: Callable[[Union[str, bytes, Image.Image]], str],
         index: int,
-        image: Union[str, bytes, Image.Image]
+        image: Union[str, bytes, Image.Image],
+        image_key: Optional[_LazyImageKey] = None,
     ) -> Optional[str]:
-        """调用上传回调函数"""
+        """调用上传回调函数（同一回调上传过相同图片时直接返回缓存的 URL）"""
+        callback_name = self._callback_names[index]
+        use_cache = image_key is not None and not hasattr(callback, 'cache')
+        # 结果缓存为空时无需计算内容键
+        if use_cache and len(_upload_result_cache):
+            cached = _upload_result_cache.get((id(callback), image_key.value))
+            if cached is not None and cached[0] is callback:
+                self._log(f"♻️  {callback_name} 已上传过该图片，使用缓存的 URL: {cached[1]}")
+                return cached[1]
+
         try:
-            callback_name = getattr(callback, '__name__', f'图床{index+1}')
-            if self.verbose:
-                print(f"🔄 尝试使用: {callback_name}")
+            self._log(f"🔄 尝试使用: {callback_name}")
 
+            if isinstance(image, _CanonicalImage):
+                image = image.bytes if getattr(callback, '__canonical__', False) else image.original
             url = callback(image)
 
             if url:
-                if self.verbose:
-                    print(f"✅ 上传成功！")
-                    print(f"🔗 图片URL: {url}")
+                if use_cache:
+                    _upload_result_cache.put((id(callback), image_key.value), (callback, url))
+                self._log(f"✅ 上传成功！")
+                self._log(f"🔗 图片URL: {url}")
                 return url
             else:
-                if self.verbose:
-                    print(f"⚠️  {callback_name} 返回空URL")
+                self._log(f"⚠️  {callback_name} 返回空URL")
                 return None
 
         except Exception as e:
-            if self.verbose:
-                print(f"⚠️  {callback_name} 上传失败: {str(e)}")
+            self._log(f"⚠️  {callback_name} 上传失败: {str(e)}")
             return None
@@ -8,10 +8,14 @@
 
 from dataclasses import dataclass
 from typing import Optional
+import sys
 from .constants import DEFAULT_BASE_URL
 
+# Python 3.10+ 支持 dataclass(slots=True)，实例不再创建 __dict__（更省内存，属性访问更快）
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_DATACLASS_SLOTS)
 class APIConfig:
     """
     API 配置类
@@ -28,4 +32,6 @@ class APIConfig:
     def __post_init__(self):
         if self.name is None:
             # 如果未设置名称，使用 base_url 作为标识
-            self.name = self.base_url.split("//")[-1].split("/")[0]
\ No newline at end of file
+            rest = self.base_url.partition("//")[2] or self.base_url
+            slash = rest.find("/")
+            self.name = rest if slash < 0 else rest[:slash]
\ No newline at end of file
@@ -6,6 +6,9 @@
 # 文件描述：常量定义
 # 文件路径：msimg/constants.py
 
+import sys
+import types
+
 # 默认 API 基础 URL
 DEFAULT_BASE_URL = "https://api-inference.modelscope.cn/"
 
@@ -37,13 +40,13 @@ MODEL_PRESETS = {
 }
 
 # 完整模型 ID（用于验证）
-FULL_MODEL_IDS = {
+FULL_MODEL_IDS = frozenset({
     "Qwen/Qwen-Image",
     "MAILAND/majicflus_v1",
     "MusePublic/489_ckpt_FLUX_1",
     "yiwanji/FLUX_xiao_hong_shu_ji_zhi_zhen_shi_V2",
     "MusePublic/42_ckpt_SD_XL",
-}
+})
 
 # 任务状态映射
 TASK_STATUS_MAP = {
@@ -55,3 +58,8 @@ TASK_STATUS_MAP = {
     "CANCELED": "⚠️ 已取消",
     "TIMEOUT": "⏰ 超时",
 }
+
+# 预设表只读（防止被意外修改），键做字符串驻留以加快查找
+SIZE_PRESETS = types.MappingProxyType({sys.intern(k): v for k, v in SIZE_PRESETS.items()})
+MODEL_PRESETS = types.MappingProxyType({sys.intern(k): v for k, v in MODEL_PRESETS.items()})
+TASK_STATUS_MAP = types.MappingProxyType({sys.intern(k): v for k, v in TASK_STATUS_MAP.items()})
@@ -7,10 +7,19 @@
 # 文件路径：msimg/generator.py
 
 from typing import Optional, List, Callable, Dict, Union
+import asyncio
+import functools
+import hashlib
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import random
 import time
-import json
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from PIL import Image
 from io import BytesIO
 
@@ -24,6 +33,50 @@ from .constants import (
 from .strategies import SelectionStrategy, NotificationMode
 from .callbacks import ResourceSelector, NotificationManager, ImageUploadManager
 from .exceptions import ValidationError
+from .image_uploader import _dumps_json, _image_to_bytes, _loads_json, _remember_source_bytes
+
+# 自定义尺寸格式：宽度x高度（例如 1920x1080）
+_CUSTOM_SIZE_RE = re.compile(r'^\d+x\d+$')
+
+# 需要重试的 HTTP 状态码：429 限流和所有 5xx 服务端错误
+_RETRY_STATUS_CODES = frozenset([429, *range(500, 600)])
+
+# 任务状态响应中的 task_status 字段，以及需要完整解析响应的终态
+_TASK_STATUS_RE = re.compile(rb'"task_status"\s*:\s*"([A-Z_]+)"')
+_TERMINAL_STATUSES = frozenset([b"SUCCEED", b"FAILED", b"CANCELED", b"TIMEOUT"])
+
+_URLLIB3_V2 = int(urllib3.__version__.split('.')[0]) >= 2
+
+
+# 后台上传线程池（async_upload=True 时使用，惰性创建）
+_upload_executor: Optional[ThreadPoolExecutor] = None
+_upload_executor_lock = threading.Lock()
+
+
+def _get_upload_executor() -> ThreadPoolExecutor:
+    """
+    获取后台上传线程池（惰性创建，线程安全）
+
+    :return: ThreadPoolExecutor 对象
+    """
+    global _upload_executor
+    if _upload_executor is None:
+        with _upload_executor_lock:
+            if _upload_executor is None:
+                _upload_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='msimg-upload')
+    return _upload_executor
+
+
+# 生成任务 Session 缓存（进程内共享）：{(base_url, api_key, 代理): Session}，按最近使用顺序排列
+_SESSION_CACHE: "OrderedDict[tuple, requests.Session]" = OrderedDict()
+_SESSION_LOCK = threading.Lock()
+_SESSION_CACHE_SIZE = 16
+
+
+# 生成结果缓存（进程内共享，cache_ttl 开启时使用）：{摘要: (monotonic 过期时刻, 图片字节)}
+# 保存编码后的字节而不是 PIL 图片，命中时重新打开，控制内存占用且调用方修改图片不影响缓存
+_GENERATION_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+_GENERATION_CACHE_LOCK = threading.Lock()
 
 
 def get_status_display(status: str) -> str:
@@ -36,6 +89,65 @@ def get_status_display(status: str) -> str:
     return TASK_STATUS_MAP.get(status, f"❓ {status}")
 
 
+def _create_retry(
+    max_retries: int,
+    retry_on_network_error: bool,
+    backoff_base: float,
+    backoff_cap: float,
+    jitter: bool,
+) -> Retry:
+    """
+    创建生成任务请求使用的 urllib3 重试策略（指数退避 + 随机抖动）
+    
+    - 连接错误：请求尚未发出，所有方法都可以重试，由 retry_on_network_error 决定
+    - 读取超时 / HTTP 429 / 5xx：只重试 GET（遵循 Retry-After 响应头）。提交任务的 POST 不是幂等的，
+      服务端可能已接收任务后才返回 502/504，自动重发会重复生成（消耗额度），
+      POST 的 429 由 _generate_image_single 中的提交循环显式重试并输出日志
+    - HTTP 4xx：请求本身有误，立即失败
+    
+    :param max_retries: 最大重试次数
+    :param retry_on_network_error: 是否在网络错误时重试
+    :param backoff_base: 退避基数（秒）
+    :param backoff_cap: 单次等待上限（秒）
+    :param jitter: 是否加入随机抖动
+    :return: Retry 对象
+    """
+    network_retries = max_retries if retry_on_network_error else 0
+    kwargs = dict(
+        total=max_retries,
+        connect=network_retries,
+        read=network_retries,
+        status=max_retries,
+        other=0,
+        backoff_factor=backoff_base,
+        status_forcelist=_RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+    )
+    if _URLLIB3_V2:
+        # urllib3 2.x 才支持 backoff_max / backoff_jitter 参数
+        kwargs['backoff_max'] = backoff_cap
+        if jitter:
+            kwargs['backoff_jitter'] = backoff_base
+    return Retry(**kwargs)
+
+
+def _retry_wait_time(attempt: int, backoff_base: float, backoff_cap: float, jitter: bool,
+                     retry_after: Optional[str] = None) -> float:
+    """
+    计算第 attempt 次重试前的等待时间（与 _create_retry 的退避规则一致）
+
+    :param retry_after: 响应头 Retry-After 的值（秒数），有效时优先使用
+    :return: 等待秒数（不超过 backoff_cap）
+    """
+    if retry_after and retry_after.strip().isdigit():
+        return min(backoff_cap, float(retry_after))
+    delay = min(backoff_cap, backoff_base * (2 ** attempt))
+    if jitter:
+        delay += random.uniform(0, backoff_base)
+    return delay
+
+
 def _parse_api_configs(api_configs: Union[str, List[str], APIConfig, List[APIConfig]]) -> List[APIConfig]:
     """
     解析 API 配置参数
@@ -51,15 +163,14 @@ def _parse_api_configs(api_configs: Union[str, List[str], APIConfig, List[APICon
         return [APIConfig(api_key=api_configs)]
     
     if isinstance(api_configs, list):
-        result = []
+        # 已经全是 APIConfig 时直接使用原列表（只读，不复制）
+        if all(isinstance(item, APIConfig) for item in api_configs):
+            return api_configs
         for item in api_configs:
-            if isinstance(item, APIConfig):
-                result.append(item)
-            elif isinstance(item, str):
-                result.append(APIConfig(api_key=item))
-            else:
+            if not isinstance(item, (APIConfig, str)):
                 raise ValidationError(f"不支持的 API 配置类型: {type(item)}")
-        return result
+        return [item if isinstance(item, APIConfig) else APIConfig(api_key=item)
+                for item in api_configs]
     
     raise ValidationError(f"不支持的 API 配置类型: {type(api_configs)}")
 
@@ -74,16 +185,8 @@ def _parse_models(models: Union[str, List[str]]) -> List[str]:
     if isinstance(models, str):
         models = [models]
     
-    result = []
-    for model in models:
-        # 检查是否为预设名称
-        if model in MODEL_PRESETS:
-            result.append(MODEL_PRESETS[model])
-        else:
-            # 直接使用完整 ID
-            result.append(model)
-    
-    return result
+    # 预设名称转换为完整 ID，其余直接作为完整 ID 使用
+    return [MODEL_PRESETS.get(model, model) for model in models]
 
 
 def generate_image(
@@ -103,29 +206,41 @@ def generate_image(
     
     # ==================== 容错和重试配置 ====================
     enable_failover: bool = True,
+    parallel_attempts: int = 1,
     max_retries: int = 3,
     retry_on_network_error: bool = True,
-    retry_delay: float = 2.0,
+    retry_delay: Optional[float] = None,
+    retry_backoff_base: float = 0.5,
+    retry_backoff_cap: float = 30.0,
+    retry_jitter: bool = True,
     
     # ==================== 超时配置 ====================
     submit_timeout: int = 30,
     poll_timeout: int = 300,
     download_timeout: int = 60,
     poll_interval: int = 5,
+    poll_interval_initial: float = 0.5,
+    poll_interval_max: Optional[float] = None,
+    poll_growth: float = 1.5,
+    poll_long_wait: Optional[int] = None,
     
     # ==================== 图床上传配置 ====================
     image_upload_callbacks: Optional[Union[Callable[[Image.Image], str], List[Callable[[Image.Image], str]]]] = None,
     upload_strategy: SelectionStrategy = SelectionStrategy.SEQUENTIAL,
     upload_on_success: bool = False,
+    async_upload: bool = False,
     
     # ==================== 消息通知配置 ====================
     notification_callbacks: Optional[Union[Callable, List[Callable]]] = None,
     notification_mode: NotificationMode = NotificationMode.NONE,
     notification_strategy: SelectionStrategy = SelectionStrategy.SEQUENTIAL,
+    notification_blocking: bool = True,
     
     # ==================== 其他配置 ====================
     verbose: bool = True,
     proxies: Optional[Dict[str, str]] = None,
+    cache_ttl: Optional[float] = None,
+    cache_max: int = 64,
     
 ) -> Optional[Dict]:
     """
@@ -155,42 +270,61 @@ def generate_image(
     :param save_path: 图片保存路径，None 时不保存
     
     === API 配置 ===
-    :param api_selection_strategy: API 选择策略（RANDOM/SEQUENTIAL/ROUND_ROBIN）
+    :param api_selection_strategy: API 选择策略（RANDOM/SEQUENTIAL/ROUND_ROBIN/RACE）
+                                   RACE 为竞速模式：同时向所有 API 提交任务，取最先成功的结果
     
     === 容错和重试配置 ===
     :param enable_failover: 是否启用容错（API/模型失败时自动切换）
+    :param parallel_attempts: 容错模式下同时进行的 (API, 模型) 组合数量，大于 1 时按容错顺序并行尝试前几个组合，
+                              取最先成功的结果并取消其余任务（每个组合都会提交一次任务并消耗额度）
     :param max_retries: 网络错误时的最大重试次数
     :param retry_on_network_error: 是否在网络错误时重试
-    :param retry_delay: 重试间隔时间（秒）
+    :param retry_delay: 兼容旧版本的参数，设置后作为 retry_backoff_base 使用
+    :param retry_backoff_base: 指数退避基数（秒），第 n 次重试等待 base * 2^n 秒
+    :param retry_backoff_cap: 单次重试等待时间上限（秒）
+    :param retry_jitter: 是否为重试等待时间加入随机抖动，避免大量客户端同时重试
     
     === 超时配置 ===
     :param submit_timeout: 提交任务的超时时间（秒）
     :param poll_timeout: 轮询任务状态的总超时时间（秒）
     :param download_timeout: 下载图片的超时时间（秒）
-    :param poll_interval: 轮询间隔时间（秒）
+    :param poll_interval: 轮询间隔时间（秒），未设置 poll_interval_max 时作为轮询间隔上限
+    :param poll_interval_initial: 首次轮询间隔（秒），之后按 poll_growth 递增
+    :param poll_interval_max: 轮询间隔上限（秒），默认等于 poll_interval
+    :param poll_growth: 任务状态未变化时轮询间隔的增长倍数，状态变化后重置
+    :param poll_long_wait: 长轮询等待时间（秒），通过 "Prefer: wait=N" 请求服务端在状态变化前挂起查询；
+                           服务端未在 Preference-Applied 中确认时自动退回普通轮询。默认 None 不使用（需服务端支持时再开启）
     
     === 图床上传配置 ===
     :param image_upload_callbacks: 图床上传函数，格式: func(image: Image.Image) -> str(url)
                                   支持单个函数或列表
-    :param upload_strategy: 图床选择策略（SEQUENTIAL 为故障转移模式）
+    :param upload_strategy: 图床选择策略（SEQUENTIAL 为故障转移模式，PARALLEL 为同时上传到所有图床）
     :param upload_on_success: 是否在生成成功后自动上传
+    :param async_upload: 是否在后台线程上传，不阻塞返回。开启后结果中的 'url' 为 None，
+                         可通过 result['url_future'].result() 获取 URL，
+                         连续生成多张图片时上一张的上传与下一张的生成会同时进行
     
     === 消息通知配置 ===
     :param notification_callbacks: 消息通知函数，格式: func(data: dict) -> None
                                    data 包含: message, is_success, data
                                    支持单个函数或列表
     :param notification_mode: 通知模式（SUCCESS/ERROR/ALL/NONE）
-    :param notification_strategy: 通知策略（SEQUENTIAL 为全部通知，RANDOM/ROUND_ROBIN 为单个通知）
+    :param notification_strategy: 通知策略（SEQUENTIAL 为按顺序全部通知，PARALLEL 为并发全部通知，RANDOM/ROUND_ROBIN 为单个通知）
+    :param notification_blocking: 是否等待通知发送完成，False 时通知在后台线程发送，不阻塞生成流程
     
     === 其他配置 ===
     :param verbose: 是否显示详细日志
     :param proxies: 代理配置，格式: {'http': 'http://...', 'https': 'https://...'}
+    :param cache_ttl: 生成结果缓存有效期（秒），None 表示不缓存。开启后相同的 (API, 提示词, 模型, 尺寸)
+                      在有效期内直接返回上次生成的图片，不再提交任务（图片生成本身是随机的，需按需开启）
+    :param cache_max: 生成结果缓存最多保留的图片数量（进程内共享，按最近使用淘汰）
     
     返回值:
     :return: 成功返回字典:
             {
                 'image': PIL.Image 对象,
                 'url': 图床 URL（如果上传）,
+                'url_future': 图床 URL 的 Future（仅 async_upload=True 时）,
                 'model': 使用的模型,
                 'api': 使用的 API 名称,
                 'size': 图片尺寸元组,
@@ -240,12 +374,18 @@ def generate_image(
     if notification_callbacks is not None and callable(notification_callbacks):
         notification_callbacks = [notification_callbacks]
     
+    if retry_delay is not None:
+        retry_backoff_base = retry_delay
+    
+    if poll_interval_max is None:
+        poll_interval_max = poll_interval
+    
     # 处理尺寸参数
     if size in SIZE_PRESETS:
         size_str = SIZE_PRESETS[size]
         if verbose:
             print(f"ℹ️  使用预设尺寸: {size} → {size_str}")
-    elif re.match(r'^\d+x\d+$', size):
+    elif _CUSTOM_SIZE_RE.match(size):
         size_str = size
         if verbose:
             print(f"ℹ️  使用自定义尺寸: {size_str}")
@@ -266,28 +406,94 @@ def generate_image(
         mode=notification_mode,
         strategy=notification_strategy,
         verbose=verbose,
+        blocking=notification_blocking,
     )
     
+    # 单次生成的公共参数
+    single_kwargs = dict(
+        prompt=prompt,
+        size_str=size_str,
+        max_retries=max_retries,
+        retry_on_network_error=retry_on_network_error,
+        retry_backoff_base=retry_backoff_base,
+        retry_backoff_cap=retry_backoff_cap,
+        retry_jitter=retry_jitter,
+        submit_timeout=submit_timeout,
+        poll_timeout=poll_timeout,
+        download_timeout=download_timeout,
+        poll_interval_initial=poll_interval_initial,
+        poll_interval_max=poll_interval_max,
+        poll_growth=poll_growth,
+        poll_long_wait=poll_long_wait,
+        verbose=verbose,
+        proxies=proxies,
+    )
+    
+    # 生成成功后的处理参数（保存、上传、通知）
+    finish_kwargs = dict(
+        save_path=save_path,
+        upload_on_success=upload_on_success,
+        image_upload_callbacks=image_upload_callbacks,
+        upload_strategy=upload_strategy,
+        async_upload=async_upload,
+        verbose=verbose,
+        notification_manager=notification_manager,
+    )
+    
+    # 生成结果缓存：相同的 API、提示词、模型、尺寸在有效期内直接使用上次的图片
+    if cache_ttl:
+        for model in models_list:
+            for api_config in api_configs_list:
+                cached = _get_cached_generation(api_config, prompt, model, size_str)
+                if cached is not None:
+                    if verbose:
+                        print(f"♻️  命中生成结果缓存 - API: {api_config.name}, 模型: {model}")
+                    return _finish_generation(cached, api_config, model, **finish_kwargs)
+    
     # ==================== 主循环（支持容错） ====================
     
-    used_api_indices = set()
-    used_model_indices = set()
+    # 已失败的 API / 模型索引（位掩码，第 i 位为 1 表示索引 i 已失败）
+    used_api_mask = 0
+    used_model_mask = 0
+    all_models_mask = (1 << len(models_list)) - 1
+    
+    # 竞速模式：所有 API 同时尝试，只需在模型之间容错
+    race_apis = api_selection_strategy is SelectionStrategy.RACE and len(api_configs_list) > 1
     
     # 最大尝试次数 = API 数量 * 模型数量（如果启用容错）
-    max_attempts = len(api_configs_list) * len(models_list) if enable_failover else 1
+    if race_apis:
+        max_attempts = len(models_list) if enable_failover else 1
+    else:
+        max_attempts = len(api_configs_list) * len(models_list) if enable_failover else 1
+    
+    # 并行尝试：按容错顺序排好所有组合，同时进行前 parallel_attempts 个
+    if enable_failover and not race_apis and parallel_attempts > 1 and max_attempts > 1:
+        attempts = _plan_attempts(api_configs_list, models_list, api_selector, model_selector)
+        result_image, api_config, model = _parallel_generate_image(
+            attempts, parallel_attempts, notification_manager, **single_kwargs)
+        if result_image is not None:
+            if cache_ttl:
+                _cache_generation(prompt, model, size_str, result_image, api_config, cache_ttl, cache_max)
+            return _finish_generation(result_image, api_config, model, **finish_kwargs)
+        max_attempts = 0
     
     for attempt in range(max_attempts):
         # 选择 API 和模型
-        api_config, api_index = api_selector.select(
-            api_configs_list,
-            used_api_indices if enable_failover else None
-        )
+        if race_apis:
+            api_config, api_index = None, -1
+            api_label = f"竞速({', '.join(c.name for c in api_configs_list)})"
+        else:
+            api_config, api_index = api_selector.select(
+                api_configs_list,
+                used_mask=used_api_mask if enable_failover else 0
+            )
+            api_label = api_config.name if api_config is not None else None
         model, model_index = model_selector.select(
             models_list,
-            used_model_indices if enable_failover else None
+            used_mask=used_model_mask if enable_failover else 0
         )
         
-        if api_config is None or model is None:
+        if api_label is None or model is None:
             error_msg = "所有 API 和模型组合都已尝试，无可用资源"
             print(f"⚠️  {error_msg}")
             notification_manager.notify(error_msg, is_success=False)
@@ -296,90 +502,51 @@ def generate_image(
         if verbose:
             print(f"\n{'='*60}")
             print(f"🔄 尝试次数: {attempt + 1}/{max_attempts}")
-            print(f"🌐 使用 API: {api_config.name}")
+            print(f"🌐 使用 API: {api_label}")
             print(f"🤖 使用模型: {model}")
             print(f"{'='*60}\n")
         
         # 通知开始生成
         notification_manager.notify(
-            f"开始生成图片 - API: {api_config.name}, 模型: {model}",
+            f"开始生成图片 - API: {api_label}, 模型: {model}",
             is_success=True,
-            data={'prompt': prompt, 'model': model, 'api': api_config.name}
+            data={'prompt': prompt, 'model': model, 'api': api_label}
         )
         
         # 尝试生成图片
-        result_image = _generate_image_single(
-            prompt=prompt,
-            api_config=api_config,
-            model=model,
-            size_str=size_str,
-            max_retries=max_retries,
-            retry_on_network_error=retry_on_network_error,
-            retry_delay=retry_delay,
-            submit_timeout=submit_timeout,
-            poll_timeout=poll_timeout,
-            download_timeout=download_timeout,
-            poll_interval=poll_interval,
-            verbose=verbose,
-            proxies=proxies,
-        )
+        if race_apis:
+            result_image, api_config = _race_generate_image(
+                api_configs=api_configs_list,
+                model=model,
+                **single_kwargs,
+            )
+        else:
+            result_image = _generate_image_single(
+                api_config=api_config,
+                model=model,
+                **single_kwargs,
+            )
         
         if result_image is not None:
-            # 生成成功
-            image = result_image
-            
-            # 保存图片到本地
-            if save_path:
-                try:
-                    image.save(save_path)
-                    if verbose:
-                        print(f"💾 图片已保存到: {save_path}")
-                except Exception as e:
-                    print(f"⚠️  保存图片失败: {str(e)}")
-            
-            # 上传到图床
-            uploaded_url = None
-            if upload_on_success and image_upload_callbacks:
-                upload_manager = ImageUploadManager(
-                    upload_callbacks=image_upload_callbacks,
-                    strategy=upload_strategy,
-                    verbose=verbose,
-                )
-                uploaded_url = upload_manager.upload(image)
-            
-            # 构建返回结果
-            result = {
-                'image': image,
-                'url': uploaded_url,
-                'model': model,
-                'api': api_config.name,
-                'size': image.size,
-            }
-            
-            # 通知成功
-            notification_manager.notify(
-                f"图片生成成功！",
-                is_success=True,
-                data=result
-            )
-            
-            return result
+            if cache_ttl:
+                _cache_generation(prompt, model, size_str, result_image, api_config, cache_ttl, cache_max)
+            return _finish_generation(result_image, api_config, model, **finish_kwargs)
         
         # 生成失败，标记当前组合已使用
         notification_manager.notify(
-            f"生成失败 - API: {api_config.name}, 模型: {model}",
+            f"生成失败 - API: {api_label}, 模型: {model}",
             is_success=False,
-            data={'prompt': prompt, 'model': model, 'api': api_config.name}
+            data={'prompt': prompt, 'model': model, 'api': api_label}
         )
         
         if enable_failover:
             # 标记当前模型已失败
-            used_model_indices.add(model_index)
+            used_model_mask |= 1 << model_index
             
-            # 如果所有模型都试过了，切换 API 并重置模型
-            if len(used_model_indices) >= len(models_list):
-                used_api_indices.add(api_index)
-                used_model_indices.clear()
+            # 如果所有模型都试过了，切换 API 并重置模型（竞速模式下已同时尝试所有 API）
+            if not race_apis and used_model_mask == all_models_mask:
+                used_api_mask |= 1 << api_index
+                used_model_mask = 0
                 if verbose:
                     print(f"⚠️  所有模型在当前 API 上都失败，切换到下一个 API")
         else:
@@ -392,6 +559,382 @@ def generate_image(
     return None
 
 
+def _finish_generation(
+    image: Image.Image,
+    api_config: APIConfig,
+    model: str,
+    save_path: Optional[str],
+    upload_on_success: bool,
+    image_upload_callbacks: Optional[List[Callable]],
+    upload_strategy: SelectionStrategy,
+    async_upload: bool,
+    verbose: bool,
+    notification_manager: NotificationManager,
+) -> Dict:
+    """
+    生成成功后的处理：保存到本地、上传到图床、发送成功通知（内部函数）
+    
+    :return: generate_image 的返回结果
+    """
+    # 保存图片到本地
+    if save_path:
+        try:
+            image.save(save_path)
+            if verbose:
+                print(f"💾 图片已保存到: {save_path}")
+        except Exception as e:
+            print(f"⚠️  保存图片失败: {str(e)}")
+    
+    # 上传到图床
+    uploaded_url = None
+    url_future: Optional[Future] = None
+    if upload_on_success and image_upload_callbacks:
+        upload_manager = ImageUploadManager(
+            upload_callbacks=image_upload_callbacks,
+            strategy=upload_strategy,
+            verbose=verbose,
+        )
+        if async_upload:
+            url_future = _get_upload_executor().submit(upload_manager.upload, image)
+        else:
+            uploaded_url = upload_manager.upload(image)
+    
+    # 构建返回结果
+    result = {
+        'image': image,
+        'url': uploaded_url,
+        'model': model,
+        'api': api_config.name,
+        'size': image.size,
+    }
+    if url_future is not None:
+        result['url_future'] = url_future
+    
+    # 通知成功
+    notification_manager.notify(
+        f"图片生成成功！",
+        is_success=True,
+        data=result
+    )
+    
+    return result
+
+
+def _plan_attempts(
+    api_configs: List[APIConfig],
+    models: List[str],
+    api_selector: ResourceSelector,
+    model_selector: ResourceSelector,
+) -> List[tuple]:
+    """
+    按容错顺序列出所有 (API, 模型) 组合（与逐个尝试时的顺序一致）（内部函数）
+    
+    :return: [(APIConfig, 模型), ...]
+    """
+    attempts = []
+    used_api_mask = 0
+    used_model_mask = 0
+    all_models_mask = (1 << len(models)) - 1
+    
+    for _ in range(len(api_configs) * len(models)):
+        api_config, api_index = api_selector.select(api_configs, used_mask=used_api_mask)
+        model, model_index = model_selector.select(models, used_mask=used_model_mask)
+        if api_config is None or model is None:
+            break
+        attempts.append((api_config, model))
+        
+        # 与主循环相同：模型用完后切换 API 并重置模型
+        used_model_mask |= 1 << model_index
+        if used_model_mask == all_models_mask:
+            used_api_mask |= 1 << api_index
+            used_model_mask = 0
+    
+    return attempts
+
+
+def _parallel_generate_image(
+    attempts: List[tuple],
+    parallel_attempts: int,
+    notification_manager: NotificationManager,
+    **single_kwargs,
+) -> tuple:
+    """
+    同时进行多个 (API, 模型) 组合的生成，返回最先成功的结果（内部函数）
+    
+    始终保持最多 parallel_attempts 个任务在进行，某个组合失败时启动下一个；
+    获得结果后通过 cancel_event 通知其余任务停止轮询。
+    
+    :return: (PIL Image 对象, APIConfig, 模型)，全部失败返回 (None, None, None)
+    """
+    cancel_event = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=parallel_attempts)
+    pending = {}
+    next_index = 0
+    verbose = single_kwargs.get('verbose')
+    prompt = single_kwargs.get('prompt')
+    
+    try:
+        while True:
+            # 补足并行任务
+            while next_index < len(attempts) and len(pending) < parallel_attempts:
+                api_config, model = attempts[next_index]
+                next_index += 1
+                if verbose:
+                    print(f"\n🔀 并行尝试 ({next_index}/{len(attempts)}) - API: {api_config.name}, 模型: {model}")
+                notification_manager.notify(
+                    f"开始生成图片 - API: {api_config.name}, 模型: {model}",
+                    is_success=True,
+                    data={'prompt': prompt, 'model': model, 'api': api_config.name}
+                )
+                future = executor.submit(
+                    _generate_image_single,
+                    api_config=api_config,
+                    model=model,
+                    cancel_event=cancel_event,
+                    **single_kwargs,
+                )
+                pending[future] = (api_config, model)
+            
+            if not pending:
+                return None, None, None
+            
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                api_config, model = pending.pop(future)
+                try:
+                    image = future.result()
+                except Exception as e:
+                    print(f"⚠️  API {api_config.name} 生成失败: {str(e)}")
+                    image = None
+                if image is not None:
+                    if verbose:
+                        print(f"🏁 并行获胜 - API: {api_config.name}, 模型: {model}")
+                    return image, api_config, model
+                notification_manager.notify(
+                    f"生成失败 - API: {api_config.name}, 模型: {model}",
+                    is_success=False,
+                    data={'prompt': prompt, 'model': model, 'api': api_config.name}
+                )
+    finally:
+        cancel_event.set()
+        executor.shutdown(wait=False)
+
+
+async def generate_image_async(*args, **kwargs) -> Optional[Dict]:
+    """
+    generate_image 的异步版本（在线程池中执行，不阻塞事件循环）
+
+    参数与返回值与 generate_image 完全相同，适合用 asyncio.gather 同时生成多张图片。
+
+    示例:
+        async def main():
+            tasks = [
+                generate_image_async(prompt="可爱的小猫咪", api_configs="key", models=model)
+                for model in ["qwen", "flux-majic"]
+            ]
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = asyncio.run(main())
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(generate_image, *args, **kwargs))
+
+
+def _race_generate_image(
+    api_configs: List[APIConfig],
+    model: str,
+    **single_kwargs,
+) -> tuple:
+    """
+    使用多个 API 同时生成图片，返回最先成功的结果（内部函数）
+    
+    每个 API 使用独立的 Session，获得结果后通知其余任务停止轮询并关闭其连接。
+    注意：每个 API Key 都会提交一次生成任务。
+    
+    :return: (PIL Image 对象, 获胜的 APIConfig)，全部失败返回 (None, None)
+    """
+    cancel_event = threading.Event()
+    retry = _create_retry(
+        single_kwargs['max_retries'],
+        single_kwargs['retry_on_network_error'],
+        single_kwargs['retry_backoff_base'],
+        single_kwargs['retry_backoff_cap'],
+        single_kwargs['retry_jitter'],
+    )
+    sessions = [_create_generation_session(retry, api_config.base_url) for api_config in api_configs]
+    executor = ThreadPoolExecutor(max_workers=len(api_configs))
+    futures = {
+        executor.submit(
+            _generate_image_single,
+            api_config=api_config,
+            model=model,
+            session=session,
+            cancel_event=cancel_event,
+            **single_kwargs,
+        ): api_config
+        for api_config, session in zip(api_configs, sessions)
+    }
+    
+    try:
+        for future in as_completed(futures):
+            api_config = futures[future]
+            try:
+                image = future.result()
+            except Exception as e:
+                print(f"⚠️  API {api_config.name} 生成失败: {str(e)}")
+                continue
+            if image is not None:
+                if single_kwargs.get('verbose'):
+                    print(f"🏁 竞速获胜 API: {api_config.name}")
+                return image, api_config
+        return None, None
+    finally:
+        cancel_event.set()
+        for session in sessions:
+            session.close()
+        executor.shutdown(wait=False)
+
+
+def _create_generation_session(retry: Optional[Retry] = None,
+                               base_url: Optional[str] = None) -> requests.Session:
+    """
+    创建生成任务使用的 requests.Session（提交、下载复用同一个 keep-alive 连接池）
+
+    任务状态查询（{base_url}v1/tasks/）单独挂载不自动重试的连接池：轮询循环自己重试，
+    退避时间按剩余的 poll_timeout 预算截断，避免底层重试让单次查询远超总等待时间。
+
+    :param retry: 挂载到连接池的重试策略，None 时不自动重试
+    :param base_url: API 基础 URL，提供时为任务状态查询挂载不重试的连接池
+    :return: requests.Session 对象
+    """
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry or 0)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if base_url:
+        # requests 按最长前缀选择连接池
+        session.mount(f"{base_url}v1/tasks/", HTTPAdapter(pool_connections=1, pool_maxsize=16, max_retries=0))
+    return session
+
+
+def _generation_cache_key(api_config: APIConfig, prompt: str, model: str, size_str: str) -> bytes:
+    """
+    计算生成结果缓存键（包含 API 地址和密钥，命中时返回的 API 一定属于本次调用）
+
+    :return: 16 字节摘要
+    """
+    return hashlib.blake2b(
+        f"{api_config.base_url}|{api_config.api_key}|{model}|{size_str}|{prompt}".encode('utf-8'),
+        digest_size=16).digest()
+
+
+def _get_cached_generation(api_config: APIConfig, prompt: str, model: str,
+                           size_str: str) -> Optional[Image.Image]:
+    """
+    读取生成结果缓存（过期条目在读取时删除）
+
+    :return: PIL Image 对象，未命中返回 None
+    """
+    key = _generation_cache_key(api_config, prompt, model, size_str)
+    with _GENERATION_CACHE_LOCK:
+        entry = _GENERATION_CACHE.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            del _GENERATION_CACHE[key]
+            return None
+        _GENERATION_CACHE.move_to_end(key)
+
+    data = entry[1]
+    image = Image.open(BytesIO(data))
+    _remember_source_bytes(image, data)
+    return image
+
+
+def _cache_generation(
+    prompt: str,
+    model: str,
+    size_str: str,
+    image: Image.Image,
+    api_config: APIConfig,
+    ttl: float,
+    max_size: int,
+) -> None:
+    """
+    写入生成结果缓存，超出 max_size 时淘汰最久未使用的条目
+    """
+    data, _ = _image_to_bytes(image, format=None)
+    key = _generation_cache_key(api_config, prompt, model, size_str)
+    with _GENERATION_CACHE_LOCK:
+        _GENERATION_CACHE[key] = (time.monotonic() + ttl, data)
+        _GENERATION_CACHE.move_to_end(key)
+        while len(_GENERATION_CACHE) > max_size:
+            _GENERATION_CACHE.popitem(last=False)
+
+
+def _get_session(
+    api_config: APIConfig,
+    proxies: Optional[Dict[str, str]],
+    retry_policy: tuple = (),
+) -> requests.Session:
+    """
+    获取进程内共享的生成任务 Session（按 base_url、api_key、代理、重试策略缓存，多次 generate_image 调用复用连接）
+
+    缓存最多保留 _SESSION_CACHE_SIZE 个 Session，超出时关闭并淘汰最久未使用的一个。
+
+    :param api_config: API 配置
+    :param proxies: 代理配置
+    :param retry_policy: _create_retry 的参数元组，空元组表示不自动重试
+    :return: requests.Session 对象
+    """
+    key = (api_config.base_url, api_config.api_key,
+           tuple(sorted(proxies.items())) if proxies else (), retry_policy)
+    with _SESSION_LOCK:
+        session = _SESSION_CACHE.get(key)
+        if session is not None:
+            _SESSION_CACHE.move_to_end(key)
+            return session
+
+        session = _create_generation_session(_create_retry(*retry_policy) if retry_policy else None,
+                                             api_config.base_url)
+        _SESSION_CACHE[key] = session
+        while len(_SESSION_CACHE) > _SESSION_CACHE_SIZE:
+            _SESSION_CACHE.popitem(last=False)[1].close()
+        return session
+
+
+@functools.lru_cache(maxsize=32)
+def _build_api_headers(api_key: str) -> tuple:
+    """
+    构建提交任务和查询状态使用的请求头（按 API Key 缓存，只拼接一次）
+
+    Authorization 只随 API 请求发送，不放入 Session.headers，避免图片下载时发给其他主机。
+    返回的字典在多次调用间共享，不要修改。
+
+    :param api_key: API 密钥
+    :return: (提交任务请求头, 查询状态请求头)
+    """
+    common_headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    submit_headers = {**common_headers, "X-ModelScope-Async-Mode": "true"}
+    poll_headers = {**common_headers, "X-ModelScope-Task-Type": "image_generation"}
+    return submit_headers, poll_headers
+
+
+def _wait(seconds: float, cancel_event: Optional[threading.Event]) -> bool:
+    """
+    等待指定时间，可被 cancel_event 提前打断
+    
+    :return: 是否已被取消
+    """
+    if cancel_event is None:
+        time.sleep(seconds)
+        return False
+    return cancel_event.wait(seconds)
+
+
 def _generate_image_single(
     prompt: str,
     api_config: APIConfig,
@@ -399,161 +942,207 @@ def _generate_image_single(
     size_str: str,
     max_retries: int,
     retry_on_network_error: bool,
-    retry_delay: float,
+    retry_backoff_base: float,
+    retry_backoff_cap: float,
+    retry_jitter: bool,
     submit_timeout: int,
     poll_timeout: int,
     download_timeout: int,
-    poll_interval: int,
+    poll_interval_initial: float,
+    poll_interval_max: float,
+    poll_growth: float,
+    poll_long_wait: Optional[int],
     verbose: bool,
     proxies: Optional[Dict[str, str]],
+    session: Optional[requests.Session] = None,
+    cancel_event: Optional[threading.Event] = None,
 ) -> Optional[Image.Image]:
     """
     使用单个 API 配置和模型生成图片（内部函数）
     
+    :param session: 发起请求使用的 Session（需已挂载重试策略），None 时使用按 API 缓存的共享 Session（提交、轮询、下载共用连接）
+    :param cancel_event: 取消信号（竞速模式下其他 API 已成功时被设置）
     :return: 成功返回 PIL Image 对象，失败返回 None
     """
+    if session is None:
+        retry_policy = (max_retries, retry_on_network_error, retry_backoff_base, retry_backoff_cap, retry_jitter)
+        session = _get_session(api_config, proxies, retry_policy)
     
-    common_headers = {
-        "Authorization": f"Bearer {api_config.api_key}",
-        "Content-Type": "application/json",
-    }
+    submit_headers, poll_headers = _build_api_headers(api_config.api_key)
     
     # ==================== 提交任务（支持重试） ====================
     
-    task_id = None
-    for retry in range(max_retries + 1):
+    # 连接错误由 Session 的 Retry 策略重试（请求尚未发出）；只有 429 限流在这里显式重试，
+    # 5xx / 读取超时不重试：服务端可能已经接收任务，重发会重复生成
+    if verbose:
+        print(f"🚀 正在提交图片生成任务")
+        print(f"ℹ️  提示词: {prompt}")
+    
+    body = _dumps_json({
+        "model": model,
+        "prompt": prompt,
+        "size": size_str
+    })
+    for attempt in range(max_retries + 1):
         try:
-            if verbose and retry > 0:
-                print(f"🔄 重试提交任务 ({retry}/{max_retries})...")
-            
-            if verbose and retry == 0:
-                print(f"🚀 正在提交图片生成任务")
-                print(f"ℹ️  提示词: {prompt}")
-            
-            response = requests.post(
+            response = session.post(
                 f"{api_config.base_url}v1/images/generations",
-                headers={**common_headers, "X-ModelScope-Async-Mode": "true"},
-                data=json.dumps({
-                    "model": model,
-                    "prompt": prompt,
-                    "size": size_str
-                }, ensure_ascii=False).encode('utf-8'),
+                headers=submit_headers,
+                data=body,
                 timeout=submit_timeout,
                 proxies=proxies,
             )
+            if response.status_code == 429 and attempt < max_retries:
+                delay = _retry_wait_time(attempt, retry_backoff_base, retry_backoff_cap, retry_jitter,
+                                         response.headers.get('Retry-After'))
+                if verbose:
+                    print(f"⚠️  提交任务被限流 (HTTP 429)")
+                    print(f"⏰ {delay:.1f}秒后重试 ({attempt + 1}/{max_retries})...")
+                if _wait(delay, cancel_event):
+                    return None
+                continue
             response.raise_for_status()
-            task_id = response.json()["task_id"]
-            
-            if verbose:
-                print(f"✅ 任务提交成功")
-                print(f"🆔 任务ID: {task_id}")
+            task_id = _loads_json(response.content)["task_id"]
             break
-            
         except requests.exceptions.RequestException as e:
-            is_network_error = isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
-            
-            if retry < max_retries and (retry_on_network_error or not is_network_error):
-                if verbose:
-                    print(f"⚠️  提交任务失败: {str(e)}")
-                    print(f"⏰ {retry_delay}秒后重试...")
-                time.sleep(retry_delay)
-            else:
-                print(f"❌ 提交任务失败: {str(e)}")
-                return None
+            print(f"❌ 提交任务失败: {str(e)}")
+            return None
         except Exception as e:
             print(f"❌ 提交任务时发生未知错误: {str(e)}")
             return None
     
-    if task_id is None:
-        return None
+    if verbose:
+        print(f"✅ 任务提交成功")
+        print(f"🆔 任务ID: {task_id}")
     
     # ==================== 轮询任务状态 ====================
     
-    start_time = time.time()
+    # 使用单调时钟计算总预算，系统时间调整不影响超时判断
+    start_time = time.monotonic()
+    deadline = start_time + poll_timeout
     last_status = None
+    consecutive_not_ready = 0
+    
+    # 长轮询：首次查询时试探服务端是否支持，不支持则退回普通轮询
+    long_poll = bool(poll_long_wait)
+    if long_poll:
+        long_poll_headers = {**poll_headers, "Prefer": f"wait={poll_long_wait}"}
+    
+    # 连续查询失败次数（查询成功后清零），退避时间不超过剩余预算
+    poll_failures = 0
+    
+    # 条件请求：任务状态未变化时服务端可返回 304，沿用上一次的状态，省去响应体传输和 JSON 解析
+    etag = None
+    task_status = None
+    data = None
     
     while True:
-        elapsed_time = time.time() - start_time
-        if elapsed_time > poll_timeout:
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        
+        now = time.monotonic()
+        elapsed_time = now - start_time
+        if now >= deadline:
             print(f"⚠️  任务执行超时 ({poll_timeout}秒)")
             return None
         
-        # 查询任务状态（支持重试）
-        data = None
-        for retry in range(max_retries + 1):
-            try:
-                result = requests.get(
-                    f"{api_config.base_url}v1/tasks/{task_id}",
-                    headers={**common_headers, "X-ModelScope-Task-Type": "image_generation"},
-                    timeout=submit_timeout,
-                    proxies=proxies,
-                )
-                result.raise_for_status()
-                data = result.json()
-                break
-                
-            except requests.exceptions.RequestException as e:
-                is_network_error = isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
-                
-                if retry < max_retries and (retry_on_network_error or not is_network_error):
+        # 查询任务状态
+        headers = long_poll_headers if long_poll else poll_headers
+        if etag is not None:
+            headers = {**headers, "If-None-Match": etag}
+        # 每次查询沿用 submit_timeout（长轮询额外加上等待时间），但不超过剩余预算（至少 1 秒）
+        read_timeout = submit_timeout + poll_long_wait if long_poll else submit_timeout
+        read_timeout = max(1.0, min(deadline - now, read_timeout))
+        request_start = now
+        try:
+            result = session.get(
+                f"{api_config.base_url}v1/tasks/{task_id}",
+                headers=headers,
+                timeout=(submit_timeout, read_timeout),
+                proxies=proxies,
+            )
+            result.raise_for_status()
+            if result.status_code != 304 or task_status is None:
+                # 进行中的状态只用正则取出 task_status；终态才完整解析 JSON（需要 output_images 等字段）
+                body = result.content
+                match = _TASK_STATUS_RE.search(body)
+                if match is not None and match.group(1) not in _TERMINAL_STATUSES:
+                    task_status = match.group(1).decode('ascii')
+                else:
+                    data = _loads_json(body)
+                    task_status = data["task_status"]
+            etag = result.headers.get("ETag")
+            poll_failures = 0
+        except requests.exceptions.RequestException as e:
+            response = getattr(e, 'response', None)
+            if response is not None:
+                retryable = response.status_code in _RETRY_STATUS_CODES
+            else:
+                retryable = retry_on_network_error and isinstance(
+                    e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+            if retryable and poll_failures < max_retries:
+                delay = _retry_wait_time(
+                    poll_failures, retry_backoff_base, retry_backoff_cap, retry_jitter,
+                    response.headers.get('Retry-After') if response is not None else None)
+                remaining = deadline - time.monotonic()
+                if delay < remaining:
+                    poll_failures += 1
                     if verbose:
                         print(f"⚠️  查询任务状态失败: {str(e)}")
-                        print(f"⏰ {retry_delay}秒后重试...")
-                    time.sleep(retry_delay)
-                else:
-                    print(f"❌ 查询任务状态失败: {str(e)}")
-                    return None
-            except Exception as e:
-                print(f"❌ 查询任务状态时发生未知错误: {str(e)}")
-                return None
-        
-        if data is None:
+                        print(f"⏰ {delay:.1f}秒后重试 ({poll_failures}/{max_retries})...")
+                    if _wait(delay, cancel_event):
+                        return None
+                    continue
+            print(f"❌ 查询任务状态失败: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"❌ 查询任务状态时发生未知错误: {str(e)}")
             return None
         
-        task_status = data["task_status"]
+        if long_poll and 'wait' not in result.headers.get('Preference-Applied', ''):
+            long_poll = False
         
-        # 只在状态变化时打印
+        # 只在状态变化时打印（状态变化时重置轮询间隔）
         if task_status != last_status:
             status_display = get_status_display(task_status)
             elapsed = int(elapsed_time)
             if verbose:
                 print(f"📊 当前任务状态: {status_display} (已耗时: {elapsed}秒)")
             last_status = task_status
+            consecutive_not_ready = 0
         
         if task_status == "SUCCEED":
             if verbose:
                 print("🎉 图片生成成功！")
             
-            # 下载图片（支持重试）
+            # 下载图片
             image_url = data["output_images"][0]
-            for retry in range(max_retries + 1):
-                try:
-                    if verbose and retry == 0:
-                        print(f"⬇️  正在下载图片...")
-                    elif verbose:
-                        print(f"🔄 重试下载图片 ({retry}/{max_retries})...")
-                    
-                    image_content = requests.get(
-                        image_url,
-                        timeout=download_timeout,
-                        proxies=proxies,
-                    ).content
-                    image = Image.open(BytesIO(image_content))
-                    
-                    if verbose:
-                        print(f"✅ 图片下载成功，尺寸: {image.size}")
-                    return image
-                    
-                except Exception as e:
-                    if retry < max_retries:
-                        if verbose:
-                            print(f"⚠️  下载图片失败: {str(e)}")
-                            print(f"⏰ {retry_delay}秒后重试...")
-                        time.sleep(retry_delay)
-                    else:
-                        print(f"❌ 下载图片失败: {str(e)}")
-                        return None
+            if verbose:
+                print(f"⬇️  正在下载图片...")
+            try:
+                # 直接从底层连接一次性读取响应体：有 Content-Length 时只分配一块恰好大小的内存，
+                # 不经过 requests 的分块拼接，也不从 BytesIO 缓冲区再取一次字节副本
+                with session.get(
+                    image_url,
+                    stream=True,
+                    timeout=download_timeout,
+                    proxies=proxies,
+                ) as response:
+                    response.raise_for_status()
+                    response.raw.decode_content = True
+                    image_data = response.raw.read()
+                # BytesIO 以 bytes 初始化时与其共享内存，Image.open 与下方记录的原始字节是同一个对象
+                image = Image.open(BytesIO(image_data))
+                # 记录下载的原始字节：以相同格式上传到图床时直接转发，省去一次重新编码
+                _remember_source_bytes(image, image_data)
+            except Exception as e:
+                print(f"❌ 下载图片失败: {str(e)}")
+                return None
             
+            if verbose:
+                print(f"✅ 图片下载成功，尺寸: {image.size}")
+            return image
+        
         elif task_status == "FAILED":
             error_message = data.get("error_message", "未知错误")
             print(f"❌ 图片生成失败: {error_message}")
@@ -567,5 +1156,22 @@ def _generate_image_single(
             print(f"⏰ 任务执行超时")
             return None
         
-        # 任务仍在进行中，继续等待
-        time.sleep(poll_interval)
\ No newline at end of file
+        # 任务仍在进行中：长轮询时服务端已等待过，直接再次查询；
+        # 服务端确认了长轮询却立即返回（不足请求等待时间的 1/10）时至少间隔 poll_interval_initial，避免空转
+        if long_poll:
+            if time.monotonic() - request_start < poll_long_wait * 0.1:
+                interval = min(poll_interval_initial, max(0.0, deadline - time.monotonic()))
+                if _wait(interval, cancel_event):
+                    return None
+            continue
+        
+        # 否则按自适应间隔继续等待
+        interval = min(poll_interval_max, poll_interval_initial * (poll_growth ** consecutive_not_ready))
+        if interval < poll_interval_max:
+            consecutive_not_ready += 1
+        # ±20% 随机抖动，避免大量客户端同时轮询
+        interval = max(0.2, interval * random.uniform(0.8, 1.2))
+        # 等待时间不超过剩余预算
+        interval = min(interval, max(0.0, deadline - time.monotonic()))
+        if _wait(interval, cancel_event):
+            return None
\ No newline at end of file
@@ -60,20 +60,55 @@ msimg 图床上传模块
     ... )
 """
 
-import base64
+import asyncio
+import atexit
+import contextlib
+import functools
 import hashlib
+import json
+import logging
+import mimetypes
+import mmap
+import os
 import requests
-import re
+import shutil
+import string
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Union
-from datetime import datetime
+from typing import Callable, List, Optional, Union
 from io import BytesIO
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 try:
     from PIL import Image
 except ImportError:
     raise ImportError("请安装 Pillow: pip install Pillow")
 
+try:
+    # pybase64 使用 SIMD 加速，接口与标准库 base64 一致（可选依赖）
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+try:
+    # orjson 解析/序列化 JSON 比标准库快数倍（可选依赖）
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# 上传日志：库本身只挂 NullHandler，由使用者配置输出方式，例如
+# logging.basicConfig(level=logging.INFO, format='%(message)s') 在控制台显示上传结果；
+# 日志未启用时不再格式化消息
+_log = logging.getLogger('msimg.uploader')
+_log.addHandler(logging.NullHandler())
+
 
 # ============================================================================
 # 类型定义
@@ -88,10 +123,174 @@ ImageInput = Union[str, bytes, Image.Image]
 """
 
 
+# 上传结果缓存有效期（秒）：图床链接通常长期有效，默认 30 天
+UPLOAD_CACHE_TTL = 30 * 24 * 3600
+
+# 推荐的磁盘缓存目录（传给 persistent_cache_dir 使用）
+DEFAULT_UPLOAD_CACHE_DIR = '~/.cache/msimg/uploads'
+
+# 免费图床的单文件大小限制（字节）
+_SMMS_MAX_BYTES = 5 * 1024 * 1024
+_IMGURL_MAX_BYTES = 10 * 1024 * 1024
+
+# 删除 Base64 字符集（A-Z, a-z, 0-9, +, /, =）的转换表：转换后为空串说明只包含 Base64 字符
+_BASE64_STRIP = str.maketrans('', '', string.ascii_letters + string.digits + '+/=')
+
+
+# ============================================================================
+# HTTP 会话
+# ============================================================================
+
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def _create_session(pool_connections: int = 10, pool_maxsize: int = 50) -> requests.Session:
+    """
+    创建带连接池和自动重试的 requests.Session
+
+    :param pool_connections: 缓存的主机连接池数量
+    :param pool_maxsize: 每个主机连接池的最大连接数
+    :return: requests.Session 对象
+    """
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["POST", "GET", "PUT"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _get_shared_session() -> requests.Session:
+    """
+    获取模块级共享的 requests.Session（惰性创建，线程安全）
+
+    同一主机的多次上传会复用 keep-alive 连接，省去重复的 TCP/TLS 握手。
+
+    :return: 共享的 requests.Session 对象
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = _create_session()
+                # 进程退出时关闭连接池中的 keep-alive 连接
+                atexit.register(_shared_session.close)
+    return _shared_session
+
+
+# ============================================================================
+# 请求限流
+# ============================================================================
+
+class TokenBucket:
+    """
+    令牌桶限流器（线程安全）
+
+    令牌以 ``rpm / 60`` 个/秒的速度补充，桶容量为 ``capacity``（默认等于 rpm，即允许一分钟额度的突发）。
+    每次请求前调用 :meth:`acquire` 取走一个令牌，令牌不足时阻塞等待，
+    从而主动控制请求节奏，避免触发图床的频率限制后再被动重试。
+
+    示例：
+        >>> bucket = TokenBucket(rpm=20)
+        >>> bucket.acquire()  # 在发起请求前调用
+    """
+
+    def __init__(self, rpm: float, capacity: Optional[float] = None):
+        """
+        :param rpm: 每分钟允许的请求数
+        :param capacity: 桶容量（最大突发请求数），默认等于 rpm
+        """
+        if rpm <= 0:
+            raise ValueError("rpm 必须大于 0")
+        self.rate = rpm / 60.0
+        self.capacity = float(capacity if capacity is not None else rpm)
+        self.request_tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.request_tokens = min(self.capacity,
+                                  self.request_tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self, tokens: float = 1) -> None:
+        """
+        取走令牌，令牌不足时阻塞直到补充足够
+
+        :param tokens: 需要的令牌数
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self.request_tokens >= tokens:
+                    self.request_tokens -= tokens
+                    return
+                wait = (tokens - self.request_tokens) / self.rate
+            time.sleep(wait)
+
+
+def _with_rate_limit(upload: Callable[[ImageInput], str],
+                     rate_limit_rpm: Optional[float]) -> Callable[[ImageInput], str]:
+    """
+    为上传函数加上令牌桶限流
+
+    :param upload: 原始上传函数
+    :param rate_limit_rpm: 每分钟最大上传次数，None 或 0 表示不限流
+    :return: 上传函数
+    """
+    if not rate_limit_rpm:
+        return upload
+
+    bucket = TokenBucket(rpm=rate_limit_rpm)
+
+    @functools.wraps(upload)
+    def limited_upload(image: ImageInput) -> str:
+        bucket.acquire()
+        return upload(image)
+
+    return limited_upload
+
+
 # ============================================================================
 # 基础工具函数
 # ============================================================================
 
+def _dumps_json(obj) -> bytes:
+    """
+    将请求体序列化为 UTF-8 JSON 字节（安装了 orjson 时使用 orjson，否则使用标准库 json）
+
+    :param obj: 待序列化的对象
+    :return: JSON 字节
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+
+def _loads_json(data: bytes):
+    """
+    解析 JSON 字节（安装了 orjson 时使用 orjson，否则使用标准库 json）
+
+    :param data: JSON 字节
+    :return: 解析结果
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def _is_base64(s: str) -> bool:
     """
     判断字符串是否为 Base64 编码
@@ -103,16 +302,9 @@ def _is_base64(s: str) -> bool:
     if s.startswith('data:image/'):
         return True
 
-    # 检查是否为纯 Base64 字符串
-    # Base64 字符集：A-Z, a-z, 0-9, +, /, =
-    if re.match(r'^[A-Za-z0-9+/]*={0,2}$', s) and len(s) % 4 == 0:
-        try:
-            base64.b64decode(s, validate=True)
-            return True
-        except Exception:
-            return False
-
-    return False
+    # 检查是否为纯 Base64 字符串：只检查长度和开头部分的字符集，不扫描整个字符串
+    # 完整校验在 _decode_base64_image 解码时一并完成（只解码一次）
+    return len(s) % 4 == 0 and len(s) > 32 and not s[:64].translate(_BASE64_STRIP)
 
 
 def _decode_base64_image(base64_str: str) -> bytes:
@@ -123,19 +315,305 @@ def _decode_base64_image(base64_str: str) -> bytes:
     :return: 图片字节流
     """
     # 处理 data URI 格式: data:image/png;base64,xxxxx
-    if base64_str.startswith('data:image/'):
+    is_data_uri = base64_str.startswith('data:image/')
+    if is_data_uri:
         # 提取 Base64 部分
-        base64_str = base64_str.split(',', 1)[1]
+        base64_str = base64_str[base64_str.index(',') + 1:]
 
-    # 解码
+    # 解码（纯 Base64 字符串严格校验字符集，校验与解码在同一遍完成）
     try:
-        image_data = base64.b64decode(base64_str)
+        image_data = base64.b64decode(base64_str, validate=not is_data_uri)
         return image_data
     except Exception as e:
         raise ValueError(f"Base64 解码失败: {e}")
 
 
-def _image_to_bytes(image: ImageInput, format: str = 'PNG') -> tuple:
+def _sniff_format(data: bytes) -> Optional[str]:
+    """
+    根据文件头魔数识别图片格式（无需 PIL 解码）
+
+    :param data: 图片字节（至少前 12 字节）
+    :return: 'JPEG' / 'PNG' / 'GIF' / 'WEBP'，无法识别时返回 None
+    """
+    if data[:3] == b'\xff\xd8\xff':
+        return 'JPEG'
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'PNG'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'GIF'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'WEBP'
+    return None
+
+
+def _resolve_format(image: Image.Image, format: Optional[str]) -> str:
+    """
+    确定 PIL 图片的输出格式
+
+    format 为 None（自动）时沿用图片自身的格式（JPEG/PNG/GIF/WEBP），
+    这样由原始字节打开的图片可以直接复用原始字节，无需重新编码；其他情况使用 PNG。
+
+    :param image: PIL 图片对象
+    :param format: 指定的输出格式，None 表示自动
+    :return: 输出格式
+    """
+    if format:
+        return format
+    if image.format in ('JPEG', 'PNG', 'GIF', 'WEBP'):
+        return image.format
+    return 'PNG'
+
+
+def _data_filename(prefix: str, data: bytes, timestamp: str, format: Optional[str]) -> str:
+    """
+    为内存中的图片字节生成文件名，扩展名按文件头识别出的实际格式确定
+
+    :param prefix: 文件名前缀
+    :param data: 图片字节
+    :param timestamp: 时间戳
+    :param format: 无法识别格式时使用的格式，None 时为 PNG
+    :return: 文件名
+    """
+    detected = _sniff_format(data[:12]) or format or 'PNG'
+    return f"{prefix}_{timestamp}.{detected.lower()}"
+
+
+# 文件名时间戳缓存：(秒级时间, 日期字符串, 时间字符串)，同一秒内只格式化一次
+_filename_timestamp_cache = (0, '', '')
+
+
+def _timestamp_parts() -> tuple:
+    """
+    获取当前本地时间的 (日期, 时间) 字符串（格式: ('20250120', '100000')），按秒缓存
+
+    :return: (日期字符串, 时间字符串)
+    """
+    global _filename_timestamp_cache
+    now = int(time.time())
+    cached = _filename_timestamp_cache
+    if cached[0] != now:
+        tm = time.localtime(now)
+        cached = (now,
+                  f"{tm.tm_year:04d}{tm.tm_mon:02d}{tm.tm_mday:02d}",
+                  f"{tm.tm_hour:02d}{tm.tm_min:02d}{tm.tm_sec:02d}")
+        _filename_timestamp_cache = cached
+    return cached[1], cached[2]
+
+
+def _filename_timestamp(sep: str = '_') -> str:
+    """
+    获取用于生成文件名的时间戳（格式: 20250120_100000）
+
+    :param sep: 日期与时间之间的分隔符（如 '/' 生成按日期分目录的路径）
+    :return: 时间戳字符串
+    """
+    date, clock = _timestamp_parts()
+    return f"{date}{sep}{clock}"
+
+
+# MD5 只用于生成文件名，声明非安全用途（FIPS 模式下 hashlib.md5 默认不可用，Python 3.9+ 支持）
+_md5 = (functools.partial(hashlib.md5, usedforsecurity=False)
+        if sys.version_info >= (3, 9) else hashlib.md5)
+
+
+def _short_hash(file_data) -> str:
+    """
+    计算文件内容的短摘要（MD5 前 4 字节的十六进制，共 8 个字符），用于生成不重复的文件名
+
+    :param file_data: 文件字节（bytes、memoryview、mmap 等支持缓冲区协议的对象）
+    :return: 8 位十六进制字符串
+    """
+    return _md5(file_data).digest()[:4].hex()
+
+
+def _make_object_key(file_data, filename: str, prefix: str = 'msimg/', sep: Optional[str] = '_') -> str:
+    """
+    生成图床中的对象名：{prefix}{日期}{sep}{时间}_{短摘要}_{文件名}
+
+    :param file_data: 文件字节（支持缓冲区协议的对象）
+    :param filename: 原始文件名
+    :param prefix: 对象名前缀
+    :param sep: 日期与时间之间的分隔符；None 时只按日期分目录：{prefix}{日期}/{短摘要}_{文件名}
+    :return: 对象名
+    """
+    date, clock = _timestamp_parts()
+    file_hash = _short_hash(file_data)
+    if sep is None:
+        return f"{prefix}{date}/{file_hash}_{filename}"
+    return f"{prefix}{date}{sep}{clock}_{file_hash}_{filename}"
+
+
+# PIL 图片编码结果在 image.info 中的缓存键：
+# [id(图片), 像素摘要, {格式: 编码后的字节}, 原始字节或 None, 原始字节摘要或 None]
+# id 用于识别 copy()/convert() 等复制出来的新图片（info 会被一并复制），它们不沿用这份缓存；
+# 不用弱引用，保证图片仍可 pickle
+_ENCODED_INFO_KEY = '_msimg_encoded'
+
+# 一次上传内已计算的像素摘要：{id(图片): (图片, 摘要)}，见 _digest_reuse
+_digest_scope = threading.local()
+
+
+@contextlib.contextmanager
+def _digest_reuse():
+    """
+    在一次上传内复用 PIL 图片的像素摘要（上传期间图片不会被修改）
+
+    上传缓存键与编码缓存校验共用同一个摘要，同一张图片每次上传最多计算一次。
+    """
+    if getattr(_digest_scope, 'memo', None) is not None:
+        yield
+        return
+    _digest_scope.memo = {}
+    try:
+        yield
+    finally:
+        _digest_scope.memo = None
+
+
+def _pixel_digest(image: Image.Image) -> str:
+    """
+    计算 PIL 图片像素数据 + 模式 + 尺寸的 SHA-256 摘要（会解码像素）
+
+    :param image: PIL 图片对象
+    :return: 十六进制摘要
+    """
+    memo = getattr(_digest_scope, 'memo', None)
+    if memo is not None:
+        hit = memo.get(id(image))
+        if hit is not None and hit[0] is image:
+            return hit[1]
+
+    sha = hashlib.sha256()
+    sha.update(f"pil:{image.mode}:{image.size}:".encode())
+    sha.update(image.tobytes())
+    digest = sha.hexdigest()
+    if memo is not None:
+        memo[id(image)] = (image, digest)
+    return digest
+
+
+def _pixels_loaded(image: Image.Image) -> bool:
+    """PIL 图片的像素是否已解码（Pillow 11+ 核心对象存放在 _im 中，旧版本为 im 属性）"""
+    return (image._im if hasattr(image, '_im') else image.im) is not None
+
+
+def _encoding_entry(image: Image.Image) -> Optional[list]:
+    """读取属于该图片本身的编码缓存条目（复制出来的图片继承的条目不算）"""
+    entry = image.info.get(_ENCODED_INFO_KEY)
+    if entry is None or entry[0] != id(image):
+        return None
+    return entry
+
+
+def _source_untouched(image: Image.Image, entry: list) -> bool:
+    """
+    由原始字节打开的图片像素是否仍与原始字节一致
+
+    像素解码前不可能被修改，直接返回 True，不解码也不计算摘要；
+    解码后（可能被原地修改）才计算像素摘要，与原始字节解码结果的摘要（只算一次）比对。
+    """
+    if not _pixels_loaded(image):
+        return True
+    if entry[1] is None:
+        entry[1] = _pixel_digest(Image.open(BytesIO(entry[3])))
+    return entry[1] == _pixel_digest(image)
+
+
+def _cached_encoding(image: Image.Image, format: str) -> Optional[bytes]:
+    """
+    读取 PIL 图片已缓存的编码结果（或原始字节），像素已被修改时返回 None
+
+    :param image: PIL 图片对象
+    :param format: 输出格式
+    :return: 编码后的字节，没有可用缓存时返回 None
+    """
+    entry = _encoding_entry(image)
+    if entry is None or format not in entry[2]:
+        return None
+
+    if entry[3] is not None:
+        valid = _source_untouched(image, entry)
+    else:
+        valid = entry[1] == _pixel_digest(image)
+    if not valid:
+        del image.info[_ENCODED_INFO_KEY]
+        return None
+    return entry[2][format]
+
+
+def _to_jpeg_mode(image: Image.Image) -> Image.Image:
+    """
+    转换为 JPEG 可保存的颜色模式（透明通道合成到白色背景上）
+
+    :param image: PIL 图片对象
+    :return: RGB/L/CMYK 模式的图片（已是这些模式时原样返回）
+    """
+    if image.mode in ('RGB', 'L', 'CMYK'):
+        return image
+    if image.mode in ('RGBA', 'LA', 'P'):
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        # getchannel 只取出 alpha 通道，不像 split() 那样复制全部 4 个通道
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _encode_pil_image(image: Image.Image, format: str) -> bytes:
+    """
+    将 PIL 图片编码为指定格式的字节（结果缓存在 image.info 中，重复上传同一张图片时不再重新编码）
+
+    缓存以像素内容摘要校验，图片被修改后会重新编码。
+
+    :param image: PIL 图片对象
+    :param format: 输出格式（PNG/JPEG/WEBP）
+    :return: 编码后的字节
+    """
+    cached = _cached_encoding(image, format)
+    if cached is not None:
+        return cached
+
+    buffer = BytesIO()
+    if format == 'JPEG':
+        _to_jpeg_mode(image).save(buffer, format=format)
+    else:
+        image.save(buffer, format=format)
+    data = buffer.getvalue()
+
+    entry = _encoding_entry(image)
+    if entry is None:
+        entry = [id(image), _pixel_digest(image), {}, None, None]
+        image.info[_ENCODED_INFO_KEY] = entry
+    entry[2][format] = data
+    return data
+
+
+def _remember_source_bytes(image: Image.Image, data: bytes) -> None:
+    """
+    记录 PIL 图片解码前的原始字节，之后以相同格式上传时直接使用，不再重新编码
+
+    只保存字节，不解码像素也不计算摘要；没有上传时不产生任何额外开销。
+
+    :param image: 由 data 打开的 PIL 图片对象（尚未调用 load()）
+    :param data: 图片原始字节
+    """
+    if image.format:
+        image.info[_ENCODED_INFO_KEY] = [id(image), None, {image.format: data}, data, None]
+
+
+def _is_source_bytes(image: Image.Image, data: bytes) -> bool:
+    """
+    判断 data 是否为 PIL 图片记录的原始字节（见 _remember_source_bytes），而不是 msimg 以默认参数编码的结果
+
+    :param image: PIL 图片对象
+    :param data: _image_to_bytes 返回的字节
+    :return: 是原始字节时返回 True
+    """
+    entry = _encoding_entry(image)
+    return entry is not None and entry[3] is data
+
+
+def _image_to_bytes(image: ImageInput, format: Optional[str] = 'PNG') -> tuple:
     """
     将各种格式的图片转换为字节流
     
@@ -146,8 +624,11 @@ def _image_to_bytes(image: ImageInput, format: str = 'PNG') -> tuple:
     - Base64 编码字符串 (data:image/... 或纯 Base64)
     - 图片字节流 (bytes)
     
+    字节流、Base64、本地文件与网络图片始终原样返回，不经过 PIL 重新编码，
+    文件名扩展名按实际格式确定；format 只决定 PIL.Image 的编码格式。
+
     :param image: 图片输入
-    :param format: 输出格式（PNG/JPEG/WEBP）
+    :param format: PIL.Image 的输出格式（PNG/JPEG/WEBP），None 表示沿用图片自身格式
     :return: (字节数据, 文件名)
     
     示例：
@@ -172,20 +653,19 @@ def _image_to_bytes(image: ImageInput, format: str = 'PNG') -> tuple:
         >>> with open('image.jpg', 'rb') as f:
         ...     data, filename = _image_to_bytes(f.read())
     """
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    timestamp = _filename_timestamp()
 
     # 处理 PIL.Image 对象
     if isinstance(image, Image.Image):
-        buffer = BytesIO()
-        image.save(buffer, format=format)
-        file_data = buffer.getvalue()
+        format = _resolve_format(image, format)
+        file_data = _encode_pil_image(image, format)
         filename = f"msimg_{timestamp}.{format.lower()}"
         return file_data, filename
 
     # 处理字节流
     elif isinstance(image, bytes):
         file_data = image
-        filename = f"msimg_{timestamp}.{format.lower()}"
+        filename = _data_filename('msimg', file_data, timestamp, format)
         return file_data, filename
 
     # 处理字符串（路径、URL、Base64）
@@ -193,7 +673,7 @@ def _image_to_bytes(image: ImageInput, format: str = 'PNG') -> tuple:
         # 1. 检查是否为网络 URL
         if image.startswith(('http://', 'https://')):
             try:
-                response = requests.get(image, timeout=10)
+                response = _get_shared_session().get(image, timeout=10)
                 response.raise_for_status()
                 file_data = response.content
                 # 尝试从 URL 提取文件名
@@ -207,28 +687,29 @@ def _image_to_bytes(image: ImageInput, format: str = 'PNG') -> tuple:
             except Exception as e:
                 raise ValueError(f"下载网络图片失败: {e}")
 
-        # 2. 检查是否为 Base64
-        elif _is_base64(image):
+        # 2. 检查是否为 Base64（先做廉价的前缀检查，再直接解码）
+        if _is_base64(image):
             try:
                 file_data = _decode_base64_image(image)
-                filename = f"base64_{timestamp}.{format.lower()}"
+                filename = _data_filename('base64', file_data, timestamp, format)
                 return file_data, filename
-            except Exception as e:
-                raise ValueError(f"Base64 解码失败: {e}")
+            except ValueError:
+                if image.startswith('data:image/'):
+                    raise
+                # 纯 Base64 校验失败，继续当作本地文件路径处理
 
         # 3. 当作本地文件路径处理
-        else:
-            try:
-                file_path = Path(image)
-                if not file_path.exists():
-                    raise FileNotFoundError(f"文件不存在: {image}")
-
-                with open(file_path, 'rb') as f:
-                    file_data = f.read()
-                filename = file_path.name
-                return file_data, filename
-            except Exception as e:
-                raise ValueError(f"读取本地文件失败: {e}")
+        try:
+            file_path = Path(image)
+            if not file_path.exists():
+                raise FileNotFoundError(f"文件不存在: {image}")
+
+            with open(file_path, 'rb') as f:
+                file_data = f.read()
+            filename = file_path.name
+            return file_data, filename
+        except Exception as e:
+            raise ValueError(f"读取本地文件失败: {e}")
 
     else:
         raise TypeError(
@@ -237,11 +718,273 @@ def _image_to_bytes(image: ImageInput, format: str = 'PNG') -> tuple:
         )
 
 
+def _image_to_stream(image: ImageInput, format: Optional[str] = 'PNG') -> tuple:
+    """
+    将各种格式的图片转换为可读取的文件对象（用于流式上传）
+
+    与 _image_to_bytes 不同，本地文件直接以二进制方式打开，大图片不会整体读入内存；
+    PIL.Image 写入 SpooledTemporaryFile，超过 1MB 时自动落盘。
+    调用方负责关闭返回的文件对象。
+
+    :param image: 图片输入（支持的格式同 _image_to_bytes）
+    :param format: PIL.Image 的输出格式（PNG/JPEG/WEBP），None 表示沿用图片自身格式
+    :return: (文件对象, 文件名)
+    """
+    if isinstance(image, Image.Image):
+        format = _resolve_format(image, format)
+        timestamp = _filename_timestamp()
+        cached = _cached_encoding(image, format)
+        if cached is not None:
+            # 已有编码结果（或原始字节）时直接引用，不再重新编码后写入临时文件
+            return BytesIO(cached), f"msimg_{timestamp}.{format.lower()}"
+        spool = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+        image.save(spool, format=format)
+        spool.seek(0)
+        return spool, f"msimg_{timestamp}.{format.lower()}"
+
+    if (isinstance(image, str)
+            and not image.startswith(('http://', 'https://', 'data:'))
+            and os.path.isfile(image)):
+        return open(image, 'rb'), Path(image).name
+
+    # 字节流、网络 URL、Base64：数据本身已在内存中，BytesIO 直接引用不再复制
+    file_data, filename = _image_to_bytes(image, format=format)
+    return BytesIO(file_data), filename
+
+
+def _stream_size(fileobj) -> int:
+    """获取文件对象从当前位置到末尾的字节数（不改变读取位置）"""
+    position = fileobj.tell()
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell() - position
+    fileobj.seek(position)
+    return size
+
+
+class _MultipartStream:
+    """
+    流式 multipart/form-data 请求体
+
+    requests 的 ``files=`` 参数会把整个请求体编码到内存中，图片较大时内存占用翻倍。
+    本类按需从文件对象中读取数据，作为 ``data=`` 传给 requests 后，请求体按块发送，
+    并提供 ``__len__`` 让 requests 设置 Content-Length，``tell``/``seek`` 让 urllib3 重试时能够倒回开头。
+
+    示例：
+        >>> with _MultipartStream('smfile', 'a.png', open('a.png', 'rb')) as body:
+        ...     session.post(url, data=body, headers={'Content-Type': body.content_type})
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, field_name: str, filename: str, fileobj,
+                 mime_type: Optional[str] = None,
+                 fields: Optional[dict] = None):
+        """
+        :param field_name: 文件字段名
+        :param filename: 文件名
+        :param fileobj: 文件对象（从当前位置读到末尾）
+        :param mime_type: 文件的 MIME 类型（默认根据文件名推断，无法推断时为 application/octet-stream）
+        :param fields: 其他普通表单字段
+        """
+        if mime_type is None:
+            mime_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        boundary = os.urandom(16).hex()
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+
+        head = b''
+        for name, value in (fields or {}).items():
+            head += (f'--{boundary}\r\n'
+                     f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                     f'{value}\r\n').encode('utf-8')
+        safe_filename = filename.replace('"', '%22')
+        head += (f'--{boundary}\r\n'
+                 f'Content-Disposition: form-data; name="{field_name}"; filename="{safe_filename}"\r\n'
+                 f'Content-Type: {mime_type}\r\n\r\n').encode('utf-8')
+        tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+
+        self._file = fileobj
+        # 每段为 (文件对象, 起始偏移, 长度)
+        self._segments = [
+            (BytesIO(head), 0, len(head)),
+            (fileobj, fileobj.tell(), _stream_size(fileobj)),
+            (BytesIO(tail), 0, len(tail)),
+        ]
+        self._length = sum(length for _, _, length in self._segments)
+        self._position = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def read(self, size: int = -1) -> bytes:
+        """读取最多 size 个字节，size 为负数时读取全部剩余数据"""
+        if size is None or size < 0:
+            size = self._length - self._position
+
+        chunks = []
+        offset = 0
+        for fileobj, start, length in self._segments:
+            if size <= 0:
+                break
+            if self._position < offset + length:
+                segment_offset = self._position - offset
+                fileobj.seek(start + segment_offset)
+                data = fileobj.read(min(size, length - segment_offset))
+                if not data:
+                    break
+                chunks.append(data)
+                self._position += len(data)
+                size -= len(data)
+            offset += length
+        return b''.join(chunks)
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self._length
+        self._position = max(0, min(offset, self._length))
+        return self._position
+
+    def close(self) -> None:
+        """关闭底层文件对象"""
+        self._file.close()
+
+
+def _log_on_error(message: str) -> Callable:
+    """
+    上传方法的异常日志装饰器：记录一次错误日志后原样抛出异常（DEBUG 级别时附带堆栈）
+
+    :param message: 错误日志前缀（如 "SM.MS 上传失败"）
+    :return: 装饰器
+    """
+    def decorator(upload: Callable) -> Callable:
+        @functools.wraps(upload)
+        def wrapper(self, image: ImageInput) -> str:
+            try:
+                return upload(self, image)
+            except Exception as e:
+                _log.error("  ❌ %s: %s", message, e, exc_info=_log.isEnabledFor(logging.DEBUG))
+                raise
+
+        return wrapper
+
+    return decorator
+
+
+# ============================================================================
+# 批量上传
+# ============================================================================
+
+def upload_batch(uploader: Callable[[ImageInput], str], images: List[ImageInput],
+                 max_workers: int = 8) -> List[Optional[str]]:
+    """
+    并发上传多张图片（上传主要在等待网络，多线程即可线性提升吞吐，直到图床限流）
+
+    :param uploader: 上传函数（create_*_uploader 创建的函数或上传器的 upload 方法）
+    :param images: 图片列表（支持多种格式）
+    :param max_workers: 最大并发数
+    :return: 与 images 顺序一致的 URL 列表，上传失败的位置为 None
+
+    示例：
+        >>> uploader = create_luoguo_uploader()
+        >>> urls = upload_batch(uploader, ['a.png', 'b.png', 'c.png'])
+    """
+    def safe_upload(image: ImageInput) -> Optional[str]:
+        try:
+            return uploader(image)
+        except Exception as e:
+            _log.error("  ❌ 批量上传失败: %s", e)
+            return None
+
+    if not images:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(images))) as executor:
+        return list(executor.map(safe_upload, images))
+
+
+async def upload_many_async(uploader: Callable[[ImageInput], str], images: List[ImageInput],
+                            concurrency: int = 8) -> List[Optional[str]]:
+    """
+    在事件循环中并发上传多张图片（上传在线程池中执行，不阻塞事件循环）
+
+    :param uploader: 上传函数（create_*_uploader 创建的函数或上传器的 upload 方法）
+    :param images: 图片列表（支持多种格式）
+    :param concurrency: 最大并发数
+    :return: 与 images 顺序一致的 URL 列表，上传失败的位置为 None
+
+    示例：
+        >>> urls = await upload_many_async(create_luoguo_uploader(), ['a.png', 'b.png'])
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def safe_upload(image: ImageInput) -> Optional[str]:
+        async with semaphore:
+            try:
+                return await loop.run_in_executor(None, uploader, image)
+            except Exception as e:
+                _log.error("  ❌ 异步上传失败: %s", e)
+                return None
+
+    return list(await asyncio.gather(*(safe_upload(image) for image in images)))
+
+
+class _BatchUploadMixin:
+    """为上传器类提供 upload_batch / upload_async / upload_many_async 方法"""
+
+    def upload_batch(self, images: List[ImageInput], max_workers: int = 8) -> List[Optional[str]]:
+        """
+        并发上传多张图片
+
+        :param images: 图片列表（支持多种格式）
+        :param max_workers: 最大并发数
+        :return: 与 images 顺序一致的 URL 列表，上传失败的位置为 None
+        """
+        return upload_batch(self.upload, images, max_workers)
+
+    async def upload_async(self, image: ImageInput) -> str:
+        """
+        异步上传单张图片（在线程池中执行 upload）
+
+        :param image: 图片输入（支持多种格式）
+        :return: 图床URL
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.upload, image)
+
+    async def upload_many_async(self, images: List[ImageInput],
+                                concurrency: int = 8) -> List[Optional[str]]:
+        """
+        异步并发上传多张图片
+
+        :param images: 图片列表（支持多种格式）
+        :param concurrency: 最大并发数
+        :return: 与 images 顺序一致的 URL 列表，上传失败的位置为 None
+        """
+        return await upload_many_async(self.upload, images, concurrency)
+
+
 # ============================================================================
 # 免费图床
 # ============================================================================
 
-class SMUploader:
+class SMUploader(_BatchUploadMixin):
     """
     SM.MS 图床上传器
     
@@ -268,17 +1011,23 @@ class SMUploader:
 
     def __init__(self,
                  api_token: Optional[str] = None,
-                 api_domain: str = 'https://smms.app') -> None:
+                 api_domain: str = 'https://smms.app',
+                 session: Optional[requests.Session] = None) -> None:
         """
         初始化上传器
         
         :param api_token: SM.MS API Token（可选，建议提供以提高配额）
         :param api_domain: API 域名，默认 https://smms.app（国内优化），也可使用 https://sm.ms
+        :param session: 复用的 requests.Session（可选，默认使用模块级共享会话）
         """
         self.api_domain = api_domain.rstrip('/')
         self.api_url = f'{self.api_domain}/api/v2/upload'
         self.api_token = api_token
+        self.session = session or _get_shared_session()
+        # 固定的请求头只构建一次
+        self._headers = {'Authorization': api_token} if api_token else {}
 
+    @_log_on_error("SM.MS 上传失败")
     def upload(self, image: ImageInput) -> str:
         """
         上传图片到 SM.MS
@@ -308,52 +1057,44 @@ class SMUploader:
             >>> # 上传 Base64
             >>> url = uploader.upload('data:image/png;base64,iVBORw0KGgo...')
         """
-        try:
-            # 转换为字节流
-            file_data, filename = _image_to_bytes(image, format='PNG')
+        # 转换为文件流（本地文件不整体读入内存）
+        fileobj, filename = _image_to_stream(image, format=None)
 
+        with _MultipartStream('smfile', filename, fileobj) as body:
             # 检查文件大小（SM.MS 限制 5MB）
-            file_size_mb = len(file_data) / 1024 / 1024
-            if file_size_mb > 5:
-                raise ValueError(f"文件大小超过 5MB: {file_size_mb:.2f}MB")
-
-            # 准备上传
-            files = {'smfile': (filename, file_data)}
-            headers = {}
+            size = _stream_size(fileobj)
+            if size > _SMMS_MAX_BYTES:
+                raise ValueError(f"文件大小超过 5MB: {size / 1048576:.2f}MB")
 
-            if self.api_token:
-                headers['Authorization'] = self.api_token
+            # 准备上传（Content-Type 含每次请求不同的 boundary）
+            headers = {**self._headers, 'Content-Type': body.content_type}
 
             # 上传
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
-                files=files,
+                data=body,
                 headers=headers,
                 timeout=30
             )
 
-            result = response.json()
-
-            # 处理结果
-            if result.get('success'):
-                url = result['data']['url']
-                print(f"  ✅ SM.MS 上传成功: {url}")
-                return url
-            elif result.get('code') == 'image_repeated':
-                # 图片已存在
-                url = result['images']
-                print(f"  ℹ️ 图片已存在: {url}")
-                return url
-            else:
-                error_msg = result.get('message', '未知错误')
-                raise Exception(f"SM.MS 上传失败: {error_msg}")
+        result = _loads_json(response.content)
 
-        except Exception as e:
-            print(f"  ❌ SM.MS 上传失败: {e}")
-            raise
+        # 处理结果
+        if result.get('success'):
+            url = result['data']['url']
+            _log.info("  ✅ SM.MS 上传成功: %s", url)
+            return url
+        elif result.get('code') == 'image_repeated':
+            # 图片已存在
+            url = result['images']
+            _log.info("  ℹ️ 图片已存在: %s", url)
+            return url
+        else:
+            error_msg = result.get('message', '未知错误')
+            raise Exception(f"SM.MS 上传失败: {error_msg}")
 
 
-class ImgURLUploader:
+class ImgURLUploader(_BatchUploadMixin):
     """
     ImgURL 图床上传器
     
@@ -368,17 +1109,21 @@ class ImgURLUploader:
     获取配置：https://www.imgurl.org/vip/manage/api
     """
 
-    def __init__(self, api_token: str, api_uid: str):
+    def __init__(self, api_token: str, api_uid: str,
+                 session: Optional[requests.Session] = None):
         """
         初始化上传器
         
         :param api_token: ImgURL API Token
         :param api_uid: ImgURL 用户 UID
+        :param session: 复用的 requests.Session（可选，默认使用模块级共享会话）
         """
         self.api_url = 'https://www.imgurl.org/api/v2/upload'
         self.api_token = api_token
         self.api_uid = api_uid
+        self.session = session or _get_shared_session()
 
+    @_log_on_error("ImgURL 上传失败")
     def upload(self, image: ImageInput) -> str:
         """
         上传图片到 ImgURL
@@ -386,42 +1131,37 @@ class ImgURLUploader:
         :param image: 图片输入（支持多种格式）
         :return: 图床URL
         """
-        try:
-            # 转换为字节流
-            file_data, _ = _image_to_bytes(image, format='PNG')
-
-            # 检查文件大小
-            file_size_mb = len(file_data) / 1024 / 1024
-            if file_size_mb > 10:
-                raise ValueError(f"文件大小超过 10MB: {file_size_mb:.2f}MB")
-
-            # Base64 编码
-            image_base64 = base64.b64encode(file_data).decode('utf-8')
-
-            # 上传
-            data = {
-                'uid': self.api_uid,
-                'token': self.api_token,
-                'image': image_base64
-            }
-
-            response = requests.post(self.api_url, data=data, timeout=30)
-            result = response.json()
-
-            if result.get('code') == 200:
-                url = result['data']['url']
-                print(f"  ✅ ImgURL 上传成功: {url}")
-                return url
-            else:
-                error_msg = result.get('msg', '未知错误')
-                raise Exception(f"ImgURL 上传失败: {error_msg}")
-
-        except Exception as e:
-            print(f"  ❌ ImgURL 上传失败: {e}")
-            raise
+        # 转换为字节流
+        file_data, _ = _image_to_bytes(image, format=None)
+
+        # 检查文件大小
+        size = len(file_data)
+        if size > _IMGURL_MAX_BYTES:
+            raise ValueError(f"文件大小超过 10MB: {size / 1048576:.2f}MB")
+
+        # Base64 编码
+        image_base64 = base64.b64encode(file_data).decode('ascii')
+
+        # 上传
+        data = {
+            'uid': self.api_uid,
+            'token': self.api_token,
+            'image': image_base64
+        }
+
+        response = self.session.post(self.api_url, data=data, timeout=30)
+        result = _loads_json(response.content)
+
+        if result.get('code') == 200:
+            url = result['data']['url']
+            _log.info("  ✅ ImgURL 上传成功: %s", url)
+            return url
+        else:
+            error_msg = result.get('msg', '未知错误')
+            raise Exception(f"ImgURL 上传失败: {error_msg}")
 
 
-class LuoGuoUploader:
+class LuoGuoUploader(_BatchUploadMixin):
     """
     路过图床上传器
     
@@ -434,10 +1174,16 @@ class LuoGuoUploader:
     - 🚀 国内访问快
     """
 
-    def __init__(self):
-        """初始化上传器"""
+    def __init__(self, session: Optional[requests.Session] = None):
+        """
+        初始化上传器
+
+        :param session: 复用的 requests.Session（可选，默认使用模块级共享会话）
+        """
         self.api_url = 'https://imgtu.com/api/v1/upload'
+        self.session = session or _get_shared_session()
 
+    @_log_on_error("路过图床上传失败")
     def upload(self, image: ImageInput) -> str:
         """
         上传图片到路过图床
@@ -445,39 +1191,34 @@ class LuoGuoUploader:
         :param image: 图片输入（支持多种格式）
         :return: 图床URL
         """
-        try:
-            # 转换为字节流
-            file_data, filename = _image_to_bytes(image, format='PNG')
-
-            # 上传
-            files = {'source': (filename, file_data)}
+        # 转换为文件流（本地文件不整体读入内存）
+        fileobj, filename = _image_to_stream(image, format=None)
 
-            response = requests.post(
+        # 上传
+        with _MultipartStream('source', filename, fileobj) as body:
+            response = self.session.post(
                 self.api_url,
-                files=files,
+                data=body,
+                headers={'Content-Type': body.content_type},
                 timeout=30
             )
 
-            result = response.json()
+        result = _loads_json(response.content)
 
-            if result.get('status_code') == 200:
-                url = result['image']['url']
-                print(f"  ✅ 路过图床上传成功: {url}")
-                return url
-            else:
-                error_msg = result.get('error', {}).get('message', '未知错误')
-                raise Exception(f"路过图床上传失败: {error_msg}")
-
-        except Exception as e:
-            print(f"  ❌ 路过图床上传失败: {e}")
-            raise
+        if result.get('status_code') == 200:
+            url = result['image']['url']
+            _log.info("  ✅ 路过图床上传成功: %s", url)
+            return url
+        else:
+            error_msg = result.get('error', {}).get('message', '未知错误')
+            raise Exception(f"路过图床上传失败: {error_msg}")
 
 
 # ============================================================================
 # 云服务商图床
 # ============================================================================
 
-class QiniuUploader:
+class QiniuUploader(_BatchUploadMixin):
     """
     七牛云上传器
     
@@ -492,7 +1233,9 @@ class QiniuUploader:
     依赖：pip install qiniu
     """
 
-    def __init__(self, access_key: str, secret_key: str, bucket: str, domain: str):
+    def __init__(self, access_key: str, secret_key: str, bucket: str, domain: str,
+                 upload_host: Optional[str] = None,
+                 session: Optional[requests.Session] = None):
         """
         初始化上传器
         
@@ -500,6 +1243,10 @@ class QiniuUploader:
         :param secret_key: 七牛云 SecretKey
         :param bucket: 存储空间名称
         :param domain: CDN 域名（需要自己配置）
+        :param upload_host: 存储区域的上传域名（如 https://upload.qiniup.com 为华东区域）。
+                            指定后直接通过复用的 Session 表单上传，保持连接复用；
+                            None 时使用 SDK 的 put_data（自动查询区域，每次新建连接）
+        :param session: 复用的 requests.Session（可选，默认使用模块级共享会话，仅 upload_host 指定时使用）
         """
         try:
             from qiniu import Auth, put_data
@@ -509,7 +1256,11 @@ class QiniuUploader:
             self.put_data = put_data
         except ImportError:
             raise ImportError("请先安装七牛云SDK: pip install qiniu")
+        self.upload_host = upload_host.rstrip('/') if upload_host else None
+        self.session = session or _get_shared_session()
+        self._url_prefix = f"http://{domain}/"
 
+    @_log_on_error("七牛云上传失败")
     def upload(self, image: ImageInput) -> str:
         """
         上传图片到七牛云
@@ -517,34 +1268,55 @@ class QiniuUploader:
         :param image: 图片输入（支持多种格式）
         :return: CDN URL
         """
-        try:
-            # 转换为字节流
-            file_data, filename = _image_to_bytes(image, format='PNG')
+        # 转换为字节流
+        file_data, filename = _image_to_bytes(image, format=None)
 
-            # 生成唯一文件名
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            file_hash = hashlib.md5(file_data).hexdigest()[:8]
-            key = f"msimg/{timestamp}_{file_hash}_{filename}"
+        # 生成唯一文件名
+        key = _make_object_key(file_data, filename)
 
-            # 生成上传凭证
-            token = self.auth.upload_token(self.bucket, key)
+        # 生成上传凭证
+        token = self.auth.upload_token(self.bucket, key)
 
-            # 上传
+        # 上传
+        if self.upload_host:
+            status_code, info = self._form_upload(token, key, file_data)
+        else:
             ret, info = self.put_data(token, key, file_data)
+            status_code = info.status_code
 
-            if info.status_code == 200:
-                url = f"http://{self.domain}/{key}"
-                print(f"  ✅ 七牛云上传成功: {url}")
-                return url
-            else:
-                raise Exception(f"七牛云上传失败: {info}")
+        if status_code == 200:
+            url = self._url_prefix + key
+            _log.info("  ✅ 七牛云上传成功: %s", url)
+            return url
+        else:
+            raise Exception(f"七牛云上传失败: {info}")
 
-        except Exception as e:
-            print(f"  ❌ 七牛云上传失败: {e}")
-            raise
+    def _form_upload(self, token: str, key: str, file_data: bytes) -> tuple:
+        """
+        通过表单上传接口直接上传（不经过 SDK）
+
+        :param token: 上传凭证
+        :param key: 文件名
+        :param file_data: 文件字节
+        :return: (HTTP 状态码, 错误信息或响应内容)
+        """
+        with _MultipartStream('file', key.rsplit('/', 1)[-1], BytesIO(file_data),
+                              fields={'token': token, 'key': key}) as body:
+            response = self.session.post(
+                self.upload_host,
+                data=body,
+                headers={'Content-Type': body.content_type},
+                timeout=30
+            )
+        if response.status_code == 200:
+            return 200, response.content
+        try:
+            return response.status_code, _loads_json(response.content).get('error', response.text)
+        except ValueError:
+            return response.status_code, response.text
 
 
-class AliyunOSSUploader:
+class AliyunOSSUploader(_BatchUploadMixin):
     """
     阿里云 OSS 上传器
     
@@ -574,9 +1346,11 @@ class AliyunOSSUploader:
             self.bucket = oss2.Bucket(auth, endpoint, bucket_name)
             self.endpoint = endpoint
             self.bucket_name = bucket_name
+            self._url_prefix = f"https://{bucket_name}.{endpoint}/"
         except ImportError:
             raise ImportError("请先安装阿里云OSS SDK: pip install oss2")
 
+    @_log_on_error("阿里云OSS上传失败")
     def upload(self, image: ImageInput) -> str:
         """
         上传图片到阿里云 OSS
@@ -584,31 +1358,24 @@ class AliyunOSSUploader:
         :param image: 图片输入（支持多种格式）
         :return: CDN URL
         """
-        try:
-            # 转换为字节流
-            file_data, filename = _image_to_bytes(image, format='PNG')
+        # 转换为字节流
+        file_data, filename = _image_to_bytes(image, format=None)
 
-            # 生成对象名
-            timestamp = datetime.now().strftime('%Y%m%d/%H%M%S')
-            file_hash = hashlib.md5(file_data).hexdigest()[:8]
-            object_name = f"msimg/{timestamp}_{file_hash}_{filename}"
+        # 生成对象名
+        object_name = _make_object_key(file_data, filename, sep='/')
 
-            # 上传
-            result = self.bucket.put_object(object_name, file_data)
-
-            if result.status == 200:
-                url = f"https://{self.bucket_name}.{self.endpoint}/{object_name}"
-                print(f"  ✅ 阿里云OSS上传成功: {url}")
-                return url
-            else:
-                raise Exception(f"阿里云OSS上传失败: {result}")
+        # 上传
+        result = self.bucket.put_object(object_name, file_data)
 
-        except Exception as e:
-            print(f"  ❌ 阿里云OSS上传失败: {e}")
-            raise
+        if result.status == 200:
+            url = self._url_prefix + object_name
+            _log.info("  ✅ 阿里云OSS上传成功: %s", url)
+            return url
+        else:
+            raise Exception(f"阿里云OSS上传失败: {result}")
 
 
-class UpyunUploader:
+class UpyunUploader(_BatchUploadMixin):
     """
     又拍云上传器
     
@@ -635,9 +1402,11 @@ class UpyunUploader:
             import upyun
             self.up = upyun.UpYun(bucket, username, password, timeout=30)
             self.domain = domain
+            self._url_prefix = f"http://{domain}"
         except ImportError:
             raise ImportError("请先安装又拍云SDK: pip install upyun")
 
+    @_log_on_error("又拍云上传失败")
     def upload(self, image: ImageInput) -> str:
         """
         上传图片到又拍云
@@ -645,35 +1414,28 @@ class UpyunUploader:
         :param image: 图片输入（支持多种格式）
         :return: CDN URL
         """
-        try:
-            # 转换为字节流
-            file_data, filename = _image_to_bytes(image, format='PNG')
-
-            # 生成路径
-            timestamp = datetime.now().strftime('%Y%m%d/%H%M%S')
-            file_hash = hashlib.md5(file_data).hexdigest()[:8]
-            remote_path = f"/msimg/{timestamp}_{file_hash}_{filename}"
+        # 转换为字节流
+        file_data, filename = _image_to_bytes(image, format=None)
 
-            # 上传
-            result = self.up.put(remote_path, file_data)
+        # 生成路径
+        remote_path = _make_object_key(file_data, filename, prefix='/msimg/', sep='/')
 
-            if result:
-                url = f"http://{self.domain}{remote_path}"
-                print(f"  ✅ 又拍云上传成功: {url}")
-                return url
-            else:
-                raise Exception("又拍云上传失败")
+        # 上传
+        result = self.up.put(remote_path, file_data)
 
-        except Exception as e:
-            print(f"  ❌ 又拍云上传失败: {e}")
-            raise
+        if result:
+            url = self._url_prefix + remote_path
+            _log.info("  ✅ 又拍云上传成功: %s", url)
+            return url
+        else:
+            raise Exception("又拍云上传失败")
 
 
 # ============================================================================
 # 特殊图床
 # ============================================================================
 
-class GitHubUploader:
+class GitHubUploader(_BatchUploadMixin):
     """
     GitHub 作为图床
     
@@ -687,7 +1449,8 @@ class GitHubUploader:
     """
 
     def __init__(self, token: str, repo: str, branch: str = 'main',
-                 use_jsdelivr: bool = True):
+                 use_jsdelivr: bool = True,
+                 session: Optional[requests.Session] = None):
         """
         初始化上传器
         
@@ -695,13 +1458,23 @@ class GitHubUploader:
         :param repo: 仓库名（格式：username/repo）
         :param branch: 分支名
         :param use_jsdelivr: 是否使用 jsdelivr CDN
+        :param session: 复用的 requests.Session（可选，默认使用模块级共享会话）
         """
         self.api_url = 'https://api.github.com/repos'
         self.token = token
         self.repo = repo
         self.branch = branch
         self.use_jsdelivr = use_jsdelivr
-
+        self.session = session or _get_shared_session()
+        # 固定的请求头和 URL 前缀只构建一次
+        self._headers = {
+            'Authorization': f'token {token}',
+            'Content-Type': 'application/json'
+        }
+        self._contents_url = f"{self.api_url}/{repo}/contents/"
+        self._cdn_prefix = f"https://cdn.jsdelivr.net/gh/{repo}@{branch}/"
+
+    @_log_on_error("GitHub上传失败")
     def upload(self, image: ImageInput) -> str:
         """
         上传图片到 GitHub
@@ -709,54 +1482,61 @@ class GitHubUploader:
         :param image: 图片输入（支持多种格式）
         :return: 图片URL
         """
-        try:
-            # 转换为字节流
-            file_data, filename = _image_to_bytes(image, format='PNG')
-
-            # Base64 编码
-            content_base64 = base64.b64encode(file_data).decode('utf-8')
+        # 转换为字节流
+        file_data, filename = _image_to_bytes(image, format=None)
+
+        # 生成路径
+        path = _make_object_key(file_data, filename, sep=None)
+
+        # 上传
+        url = self._contents_url + path
+        # 直接拼接 JSON 请求体：Base64 输出只含 JSON 安全字符，无需转义，
+        # 省去 Base64 字符串和 json 序列化产生的中间副本
+        body = b''.join((
+            b'{"message":', json.dumps(f'Upload {filename} via msimg').encode('utf-8'),
+            b',"branch":', json.dumps(self.branch).encode('utf-8'),
+            b',"content":"', base64.b64encode(file_data), b'"}',
+        ))
+
+        response = self.session.put(
+            url, data=body, headers=self._headers, timeout=30)
+
+        # 使用 jsdelivr CDN 时 URL 只由仓库和路径决定，成功时无需解析响应体
+        if response.status_code == 201 and self.use_jsdelivr:
+            cdn_url = self._cdn_prefix + path
+            _log.info("  ✅ GitHub上传成功（jsdelivr CDN）: %s", cdn_url)
+            return cdn_url
+
+        result = _loads_json(response.content)
+
+        if response.status_code == 201:
+            raw_url = result['content']['download_url']
+            _log.info("  ✅ GitHub上传成功: %s", raw_url)
+            return raw_url
+        else:
+            error_msg = result.get('message', '未知错误')
+            raise Exception(f"GitHub上传失败: {error_msg}")
 
-            # 生成路径
-            timestamp = datetime.now().strftime('%Y%m%d')
-            file_hash = hashlib.md5(file_data).hexdigest()[:8]
-            path = f"msimg/{timestamp}/{file_hash}_{filename}"
 
-            # 上传
-            url = f"{self.api_url}/{self.repo}/contents/{path}"
-            headers = {
-                'Authorization': f'token {self.token}',
-                'Content-Type': 'application/json'
-            }
-            data = {
-                'message': f'Upload {filename} via msimg',
-                'content': content_base64,
-                'branch': self.branch
-            }
-
-            response = requests.put(
-                url, json=data, headers=headers, timeout=30)
-            result = response.json()
-
-            if response.status_code == 201:
-                # 使用 jsdelivr CDN
-                if self.use_jsdelivr:
-                    cdn_url = f"https://cdn.jsdelivr.net/gh/{self.repo}@{self.branch}/{path}"
-                    print(f"  ✅ GitHub上传成功（jsdelivr CDN）: {cdn_url}")
-                    return cdn_url
-                else:
-                    raw_url = result['content']['download_url']
-                    print(f"  ✅ GitHub上传成功: {raw_url}")
-                    return raw_url
-            else:
-                error_msg = result.get('message', '未知错误')
-                raise Exception(f"GitHub上传失败: {error_msg}")
+def _write_file(path: Path, data: bytes) -> None:
+    """
+    将字节直接写入文件（不经过 Python 的缓冲 IO 层）
 
-        except Exception as e:
-            print(f"  ❌ GitHub上传失败: {e}")
-            raise
+    :param path: 文件路径
+    :param data: 文件字节
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(str(path), flags, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
 
 
-class LocalStorageUploader:
+class LocalStorageUploader(_BatchUploadMixin):
     """
     本地存储上传器（复制到本地目录）
     
@@ -775,10 +1555,14 @@ class LocalStorageUploader:
         """
         self.storage_dir = Path(storage_dir)
         self.base_url = base_url.rstrip('/')
+        self._url_prefix = self.base_url + '/'
 
         # 创建目录
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        # 已创建的日期目录（每个日期只调用一次 mkdir）
+        self._ensured_dirs = set()
 
+    @_log_on_error("本地存储失败")
     def upload(self, image: ImageInput) -> str:
         """
         复制图片到本地目录
@@ -786,33 +1570,269 @@ class LocalStorageUploader:
         :param image: 图片输入（支持多种格式）
         :return: 访问URL
         """
-        try:
+        # 本地文件：内存映射计算摘要，再由 shutil.copyfile 在内核中复制（Linux 上使用 sendfile），
+        # 文件内容不经过 Python 读入内存
+        source_path = None
+        if (isinstance(image, str)
+                and not image.startswith(('http://', 'https://', 'data:'))
+                and os.path.isfile(image)
+                and os.path.getsize(image) > 0):
+            source_path = image
+            file_data = None
+            filename = Path(image).name
+            with open(image, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                relative_path = _make_object_key(mapped, filename, prefix='', sep=None)
+        else:
             # 转换为字节流
-            file_data, filename = _image_to_bytes(image, format='PNG')
+            file_data, filename = _image_to_bytes(image, format=None)
+            relative_path = _make_object_key(file_data, filename, prefix='', sep=None)
+
+        # 创建日期目录
+        timestamp = relative_path.partition('/')[0]
+        if timestamp not in self._ensured_dirs:
+            (self.storage_dir / timestamp).mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(timestamp)
 
-            # 生成保存路径
-            timestamp = datetime.now().strftime('%Y%m%d')
-            file_hash = hashlib.md5(file_data).hexdigest()[:8]
+        # 保存文件（目录被外部删除时重新创建后重试一次，如清理任务、卷重新挂载）
+        save_path = self.storage_dir / relative_path
+        try:
+            self._save(save_path, source_path, file_data)
+        except FileNotFoundError:
+            self._ensured_dirs.discard(timestamp)
+            (self.storage_dir / timestamp).mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(timestamp)
+            self._save(save_path, source_path, file_data)
+
+        # 生成URL
+        url = self._url_prefix + relative_path
+
+        _log.info("  ✅ 本地存储成功: %s", save_path)
+        return url
+
+    @staticmethod
+    def _save(save_path: Path, source_path: Optional[str], file_data: Optional[bytes]) -> None:
+        """复制本地文件（source_path）或写入字节（file_data）到 save_path"""
+        if source_path is not None:
+            shutil.copyfile(source_path, save_path)
+        else:
+            _write_file(save_path, file_data)
 
-            # 创建日期目录
-            date_dir = self.storage_dir / timestamp
-            date_dir.mkdir(exist_ok=True)
 
-            # 保存文件
-            save_path = date_dir / f"{file_hash}_{filename}"
-            with open(save_path, 'wb') as f:
-                f.write(file_data)
+# ============================================================================
+# 上传结果缓存
+# ============================================================================
 
-            # 生成URL
-            relative_path = f"{timestamp}/{file_hash}_{filename}"
-            url = f"{self.base_url}/{relative_path}"
+def _image_cache_key(image: ImageInput) -> str:
+    """
+    计算图片内容的 SHA-256 摘要，作为上传结果的缓存键
 
-            print(f"  ✅ 本地存储成功: {save_path}")
-            return url
+    - PIL.Image.Image：像素数据 + 模式 + 尺寸；由原始字节打开且像素未被修改的图片使用原始字节的摘要，
+      不解码像素（见 _remember_source_bytes）
+    - bytes：字节内容
+    - 本地文件路径：文件内容
+    - 网络 URL / Base64 字符串：字符串本身
 
-        except Exception as e:
-            print(f"  ❌ 本地存储失败: {e}")
-            raise
+    :param image: 图片输入
+    :return: 十六进制摘要
+    """
+    if isinstance(image, Image.Image):
+        entry = _encoding_entry(image)
+        if entry is None or entry[3] is None:
+            return _pixel_digest(image)
+        if not _source_untouched(image, entry):
+            del image.info[_ENCODED_INFO_KEY]
+            return _pixel_digest(image)
+        if entry[4] is None:
+            entry[4] = hashlib.sha256(b"pil-source:" + entry[3]).hexdigest()
+        return entry[4]
+
+    sha = hashlib.sha256()
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        sha.update(b"bytes:")
+        sha.update(image)
+    elif isinstance(image, str):
+        if not image.startswith(('http://', 'https://', 'data:')) and os.path.isfile(image):
+            sha.update(b"file:")
+            with open(image, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    sha.update(chunk)
+        else:
+            sha.update(b"str:")
+            sha.update(image.encode('utf-8'))
+    else:
+        raise TypeError(f"不支持的图片类型: {type(image)}")
+
+    return sha.hexdigest()
+
+
+class _LRUCache:
+    """线程安全的定长 LRU 缓存（超出容量时淘汰最久未使用的条目）"""
+
+    def __init__(self, maxsize: int = 1000):
+        """
+        :param maxsize: 最大缓存条目数
+        """
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """读取缓存，命中时将条目移到最近使用位置，未命中返回 None"""
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class _DiskUploadCache:
+    """
+    上传结果的磁盘缓存（跨进程复用）
+
+    每条记录保存为 ``{cache_dir}/{key}.json``，内容为
+    ``{"url": ..., "ts": 写入时间, "expires": 过期时间}``，写入时先写临时文件再 ``os.replace``，
+    保证读取方不会看到写了一半的文件。
+    """
+
+    def __init__(self, cache_dir: Union[str, Path], namespace: str, ttl: float):
+        """
+        :param cache_dir: 缓存目录（支持 ~）
+        :param namespace: 命名空间（图床名称 + 上传类型），不同图床的结果互不干扰
+        :param ttl: 缓存有效期（秒）
+        """
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(f"{self.namespace}:{key}".encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """读取未过期的缓存 URL，不存在、已过期或文件损坏时返回 None"""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if time.time() < entry.get('expires', 0):
+                return entry.get('url')
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def put(self, key: str, url: str) -> None:
+        """原子写入缓存记录，写入失败时静默忽略"""
+        now = time.time()
+        entry = {'url': url, 'ts': now, 'expires': now + self.ttl}
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                    'w', encoding='utf-8', dir=self.cache_dir,
+                    suffix='.tmp', delete=False) as f:
+                json.dump(entry, f, ensure_ascii=False)
+                tmp_path = f.name
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            pass
+
+
+def _accepts_bytes(upload: Callable[[ImageInput], str], canonical: bool = True) -> Callable[[ImageInput], str]:
+    """
+    标记上传函数是否可以直接接收统一转换后的图片字节
+
+    ImageUploadManager 在多图床故障转移时，会把图片统一转换为字节（只转换一次）再传给 ``__canonical__``
+    为 True 的函数，避免每个图床各自重新编码 PIL 图片或重复下载网络图片。
+    统一转换使用自动格式（与大多数图床上传时的格式相同）；需要其他格式（如微信 JPEG）
+    或依赖原始输入（如本地存储保留原文件名）的图床应传 canonical=False，继续收到原始图片。
+
+    :param upload: 上传函数
+    :param canonical: 是否接收统一转换后的字节
+    :return: 带 ``__canonical__`` 标记的上传函数（绑定方法会包一层普通函数，以便设置属性）
+    """
+    try:
+        upload.__canonical__ = canonical
+        return upload
+    except AttributeError:
+        # 绑定方法不能设置属性，包一层普通函数
+        @functools.wraps(upload)
+        def canonical_upload(image: ImageInput) -> str:
+            return upload(image)
+
+        canonical_upload.__canonical__ = canonical
+        return canonical_upload
+
+
+def _with_upload_cache(upload: Callable[[ImageInput], str],
+                       cache: bool = True,
+                       cache_size: int = 1000,
+                       persistent_cache_dir: Optional[Union[str, Path]] = None,
+                       cache_namespace: str = '',
+                       cache_ttl: float = UPLOAD_CACHE_TTL,
+                       canonical: bool = True) -> Callable[[ImageInput], str]:
+    """
+    为上传函数加上按图片内容去重的缓存
+
+    同一张图片再次上传时直接返回上次的 URL，不再发起网络请求：
+    先查进程内 LRU 缓存，再查磁盘缓存（如果配置了 persistent_cache_dir），都未命中才真正上传。
+    返回的函数带有 ``cache`` 属性（进程内缓存，未启用时为 None），可调用 ``cache.clear()`` 清空；
+    ImageUploadManager 据此跳过自己的结果缓存，cache=False 时同一图片会如实重复上传。
+
+    :param upload: 原始上传函数
+    :param cache: 是否启用进程内缓存
+    :param cache_size: 进程内缓存的最大条目数
+    :param persistent_cache_dir: 磁盘缓存目录，None 时不使用磁盘缓存
+    :param cache_namespace: 缓存命名空间（图床名称 + 上传类型）
+    :param cache_ttl: 缓存有效期（秒）
+    :param canonical: 多图床故障转移时是否接收统一转换后的字节（见 _accepts_bytes）
+    :return: 上传函数
+    """
+    if not cache and persistent_cache_dir is None:
+        upload = _accepts_bytes(upload, canonical)
+        upload.cache = None
+        return upload
+
+    store = _LRUCache(cache_size) if cache else None
+    disk = (_DiskUploadCache(persistent_cache_dir, cache_namespace, cache_ttl)
+            if persistent_cache_dir is not None else None)
+
+    @functools.wraps(upload)
+    def cached_upload(image: ImageInput) -> str:
+        # 缓存键与上传时的编码缓存校验共用同一个像素摘要
+        with _digest_reuse():
+            key = _image_cache_key(image)
+
+            if store is not None:
+                entry = store.get(key)
+                if entry is not None and time.time() < entry[1]:
+                    return entry[0]
+
+            url = disk.get(key) if disk is not None else None
+            if url is None:
+                url = upload(image)
+                if url and disk is not None:
+                    disk.put(key, url)
+
+        if url and store is not None:
+            store.put(key, (url, time.time() + cache_ttl))
+        return url
+
+    cached_upload.cache = store
+    return _accepts_bytes(cached_upload, canonical)
 
 
 # ============================================================================
@@ -820,12 +1840,21 @@ class LocalStorageUploader:
 # ============================================================================
 
 def create_smms_uploader(api_token: Optional[str] = None,
-                         api_domain: str = 'https://smms.app') -> callable:
+                         api_domain: str = 'https://smms.app',
+                         cache: bool = True,
+                         cache_size: int = 1000,
+                         persistent_cache_dir: Optional[str] = None,
+                         rate_limit_rpm: Optional[int] = None) -> callable:
     """
     创建 SM.MS 图床上传函数
     
     :param api_token: API Token（可选，建议提供）
     :param api_domain: API 域名（默认 https://smms.app 国内优化）
+    :param cache: 是否缓存上传结果（相同图片直接返回上次的 URL）
+    :param cache_size: 最大缓存条目数
+    :param persistent_cache_dir: 磁盘缓存目录（如 DEFAULT_UPLOAD_CACHE_DIR），进程重启后仍可命中
+    :param rate_limit_rpm: 每分钟最大上传次数（令牌桶限流，默认 None 不限流）；
+                           批量上传时建议设为 5，超出后调用会阻塞等待
     :return: 上传函数
     
     示例：
@@ -854,26 +1883,44 @@ def create_smms_uploader(api_token: Optional[str] = None,
         ...     upload_on_success=True
         ... )
     """
-    uploader = SMUploader(api_token, api_domain)
-    return uploader.upload
+    uploader = SMUploader(api_token, api_domain, session=_get_shared_session())
+    return _with_upload_cache(_with_rate_limit(uploader.upload, rate_limit_rpm),
+                              cache, cache_size,
+                              persistent_cache_dir, cache_namespace=f'smms:{api_domain}')
 
 
-def create_imgurl_uploader(api_token: str, api_uid: str) -> callable:
+def create_imgurl_uploader(api_token: str, api_uid: str,
+                           cache: bool = True, cache_size: int = 1000,
+                           persistent_cache_dir: Optional[str] = None,
+                           rate_limit_rpm: Optional[int] = None) -> callable:
     """
     创建 ImgURL 图床上传函数
     
     :param api_token: ImgURL API Token
     :param api_uid: ImgURL 用户 UID
+    :param cache: 是否缓存上传结果（相同图片直接返回上次的 URL）
+    :param cache_size: 最大缓存条目数
+    :param persistent_cache_dir: 磁盘缓存目录（如 DEFAULT_UPLOAD_CACHE_DIR），进程重启后仍可命中
+    :param rate_limit_rpm: 每分钟最大上传次数（令牌桶限流，None 表示不限流）
     :return: 上传函数
     """
-    uploader = ImgURLUploader(api_token, api_uid)
-    return uploader.upload
+    uploader = ImgURLUploader(api_token, api_uid, session=_get_shared_session())
+    return _with_upload_cache(_with_rate_limit(uploader.upload, rate_limit_rpm),
+                              cache, cache_size,
+                              persistent_cache_dir, cache_namespace='imgurl')
 
 
-def create_luoguo_uploader() -> callable:
+def create_luoguo_uploader(cache: bool = True, cache_size: int = 1000,
+                           persistent_cache_dir: Optional[str] = None,
+                           rate_limit_rpm: Optional[int] = None) -> callable:
     """
     创建路过图床上传函数（无需注册）
     
+    :param cache: 是否缓存上传结果（相同图片直接返回上次的 URL）
+    :param cache_size: 最大缓存条目数
+    :param persistent_cache_dir: 磁盘缓存目录（如 DEFAULT_UPLOAD_CACHE_DIR），进程重启后仍可命中
+    :param rate_limit_rpm: 每分钟最大上传次数（令牌桶限流，默认 None 不限流）；
+                           批量上传时建议设为 60，超出后调用会阻塞等待
     :return: 上传函数
     
     示例：
@@ -890,12 +1937,18 @@ def create_luoguo_uploader() -> callable:
         ...     upload_on_success=True
         ... )
     """
-    uploader = LuoGuoUploader()
-    return uploader.upload
+    uploader = LuoGuoUploader(session=_get_shared_session())
+    return _with_upload_cache(_with_rate_limit(uploader.upload, rate_limit_rpm),
+                              cache, cache_size,
+                              persistent_cache_dir, cache_namespace='luoguo')
 
 
 def create_qiniu_uploader(access_key: str, secret_key: str,
-                          bucket: str, domain: str) -> callable:
+                          bucket: str, domain: str,
+                          cache: bool = True, cache_size: int = 1000,
+                          persistent_cache_dir: Optional[str] = None,
+                          rate_limit_rpm: Optional[int] = None,
+                          upload_host: Optional[str] = None) -> callable:
     """
     创建七牛云上传函数
     
@@ -903,14 +1956,25 @@ def create_qiniu_uploader(access_key: str, secret_key: str,
     :param secret_key: SecretKey
     :param bucket: 存储空间
     :param domain: CDN域名
+    :param cache: 是否缓存上传结果（相同图片直接返回上次的 URL）
+    :param cache_size: 最大缓存条目数
+    :param persistent_cache_dir: 磁盘缓存目录（如 DEFAULT_UPLOAD_CACHE_DIR），进程重启后仍可命中
+    :param rate_limit_rpm: 每分钟最大上传次数（令牌桶限流，None 表示不限流）
+    :param upload_host: 存储区域的上传域名（如 https://upload.qiniup.com），指定后复用连接直接上传
     :return: 上传函数
     """
-    uploader = QiniuUploader(access_key, secret_key, bucket, domain)
-    return uploader.upload
+    uploader = QiniuUploader(access_key, secret_key, bucket, domain,
+                             upload_host=upload_host, session=_get_shared_session())
+    return _with_upload_cache(_with_rate_limit(uploader.upload, rate_limit_rpm),
+                              cache, cache_size,
+                              persistent_cache_dir, cache_namespace=f'qiniu:{bucket}')
 
 
 def create_aliyun_uploader(access_key_id: str, access_key_secret: str,
-                           endpoint: str, bucket_name: str) -> callable:
+                           endpoint: str, bucket_name: str,
+                           cache: bool = True, cache_size: int = 1000,
+                           persistent_cache_dir: Optional[str] = None,
+                           rate_limit_rpm: Optional[int] = None) -> callable:
     """
     创建阿里云 OSS 上传函数
     
@@ -918,15 +1982,24 @@ def create_aliyun_uploader(access_key_id: str, access_key_secret: str,
     :param access_key_secret: AccessKey Secret
     :param endpoint: Endpoint
     :param bucket_name: Bucket 名称
+    :param cache: 是否缓存上传结果（相同图片直接返回上次的 URL）
+    :param cache_size: 最大缓存条目数
+    :param persistent_cache_dir: 磁盘缓存目录（如 DEFAULT_UPLOAD_CACHE_DIR），进程重启后仍可命中
+    :param rate_limit_rpm: 每分钟最大上传次数（令牌桶限流，None 表示不限流）
     :return: 上传函数
     """
     uploader = AliyunOSSUploader(
         access_key_id, access_key_secret, endpoint, bucket_name)
-    return uploader.upload
+    return _with_upload_cache(_with_rate_limit(uploader.upload, rate_limit_rpm),
+                              cache, cache_size,
+                              persistent_cache_dir, cache_namespace=f'aliyun:{endpoint}/{bucket_name}')
 
 
 def create_upyun_uploader(bucket: str, username: str,
-                          password: str, domain: str) -> callable:
+                          password: str, domain: str,
+                          cache: bool = True, cache_size: int = 1000,
+                          persistent_cache_dir: Optional[str] = None,
+                          rate_limit_rpm: Optional[int] = None) -> callable:
     """
     创建又拍云上传函数
     
@@ -934,14 +2007,23 @@ def create_upyun_uploader(bucket: str, username: str,
     :param username: 操作员账号
     :param password: 操作员密码
     :param domain: 加速域名
+    :param cache: 是否缓存上传结果（相同图片直接返回上次的 URL）
+    :param cache_size: 最大缓存条目数
+    :param persistent_cache_dir: 磁盘缓存目录（如 DEFAULT_UPLOAD_CACHE_DIR），进程重启后仍可命中
+    :param rate_limit_rpm: 每分钟最大上传次数（令牌桶限流，None 表示不限流）
     :return: 上传函数
     """
     uploader = UpyunUploader(bucket, username, password, domain)
-    return uploader.upload
+    return _with_upload_cache(_with_rate_limit(uploader.upload, rate_limit_rpm),
+                              cache, cache_size,
+                              persistent_cache_dir, cache_namespace=f'upyun:{bucket}')
 
 
 def create_github_uploader(token: str, repo: str, branch: str = 'main',
-                           use_jsdelivr: bool = True) -> callable:
+                           use_jsdelivr: bool = True,
+                           cache: bool = True, cache_size: int = 1000,
+                           persistent_cache_dir: Optional[str] = None,
+                           rate_limit_rpm: Optional[int] = None) -> callable:
     """
     创建 GitHub 图床上传函数
     
@@ -949,19 +2031,36 @@ def create_github_uploader(token: str, repo: str, branch: str = 'main',
     :param repo: 仓库（username/repo）
     :param branch: 分支
     :param use_jsdelivr: 使用 jsdelivr CDN
+    :param cache: 是否缓存上传结果（相同图片直接返回上次的 URL）
+    :param cache_size: 最大缓存条目数
+    :param persistent_cache_dir: 磁盘缓存目录（如 DEFAULT_UPLOAD_CACHE_DIR），进程重启后仍可命中
+    :param rate_limit_rpm: 每分钟最大上传次数（令牌桶限流，None 表示不限流）
     :return: 上传函数
     """
-    uploader = GitHubUploader(token, repo, branch, use_jsdelivr)
-    return uploader.upload
+    uploader = GitHubUploader(token, repo, branch, use_jsdelivr,
+                              session=_get_shared_session())
+    return _with_upload_cache(_with_rate_limit(uploader.upload, rate_limit_rpm),
+                              cache, cache_size,
+                              persistent_cache_dir, cache_namespace=f'github:{repo}@{branch}')
 
 
-def create_local_uploader(storage_dir: str, base_url: str) -> callable:
+def create_local_uploader(storage_dir: str, base_url: str,
+                          cache: bool = True, cache_size: int = 1000,
+                          persistent_cache_dir: Optional[str] = None,
+                          rate_limit_rpm: Optional[int] = None) -> callable:
     """
     创建本地存储上传函数
     
     :param storage_dir: 存储目录
     :param base_url: 访问URL
+    :param cache: 是否缓存上传结果（相同图片直接返回上次的 URL）
+    :param cache_size: 最大缓存条目数
+    :param persistent_cache_dir: 磁盘缓存目录（如 DEFAULT_UPLOAD_CACHE_DIR），进程重启后仍可命中
+    :param rate_limit_rpm: 每分钟最大上传次数（令牌桶限流，None 表示不限流）
     :return: 上传函数
     """
     uploader = LocalStorageUploader(storage_dir, base_url)
-    return uploader.upload
+    return _with_upload_cache(_with_rate_limit(uploader.upload, rate_limit_rpm),
+                              cache, cache_size,
+                              persistent_cache_dir, cache_namespace=f'local:{storage_dir}',
+                              canonical=False)
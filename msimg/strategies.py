@@ -14,6 +14,8 @@ class SelectionStrategy(Enum):
     RANDOM = "random"              # 随机选择
     SEQUENTIAL = "sequential"      # 顺序选择（从第一个开始）
     ROUND_ROBIN = "round_robin"    # 轮询选择（记住上次位置）
+    RACE = "race"                  # 竞速（同时请求全部，取最先成功的结果，用于 API 选择）
+    PARALLEL = "parallel"          # 并行（同时请求全部并等待全部完成，用于图床镜像上传）
 
 
 class NotificationMode(Enum):
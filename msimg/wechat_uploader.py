@@ -34,9 +34,12 @@
 import os
 import json
 import time
+import random
+import logging
 import tempfile
+import threading
 import requests
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from enum import Enum
 from io import BytesIO
 
@@ -47,12 +50,40 @@ except ImportError:
 
 # 导入图片转换工具函数
 try:
-    from .image_uploader import _image_to_bytes
+    from .image_uploader import (
+        UPLOAD_CACHE_TTL,
+        _BatchUploadMixin,
+        _MultipartStream,
+        _dumps_json,
+        _image_to_bytes,
+        _is_source_bytes,
+        _loads_json,
+        _sniff_format,
+        _to_jpeg_mode,
+        _get_shared_session,
+        _with_rate_limit,
+        _with_upload_cache,
+    )
 except ImportError:
     raise ImportError(
         "❌ 无法导入 image_uploader 模块，请确保 msimg 包已正确安装"
     )
 
+# 日志向上传递给 msimg.uploader 的 stdout 处理器，静默方式与其它图床一致
+_log = logging.getLogger('msimg.uploader.wechat')
+
+# access_token 无效（40001）、不合法（40014）或已过期（42001）时微信返回的错误码
+_TOKEN_INVALID_ERRCODES = (40001, 40014, 42001)
+
+
+class _WechatTokenError(Exception):
+    """微信接口返回 access_token 失效类错误码，清除缓存后可重新获取 token 重试"""
+
+
+def _backoff_delay(attempt: int) -> float:
+    """第 attempt 次重试前的等待时间（秒）：指数退避并加随机抖动，避免多个进程同时重试"""
+    return 0.5 * (2 ** attempt) * (0.5 + random.random())
+
 
 # ============================================================================
 # 类型定义
@@ -65,11 +96,20 @@ class WechatUploadType(Enum):
     NEWS_IMAGE = "news_image"  # 图文消息图片
 
 
+# 微信支持的图片扩展名对应的 MIME 类型
+_MIME_BY_EXT = {
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'gif': 'image/gif'
+}
+
+
 # ============================================================================
 # 微信公众号上传器
 # ============================================================================
 
-class WechatUploader:
+class WechatUploader(_BatchUploadMixin):
     """
     微信公众号图床上传器
 
@@ -108,6 +148,16 @@ class WechatUploader:
 
     # Token 缓存过期时间（提前5分钟刷新）
     TOKEN_EXPIRE_MARGIN = 300
+    # 缓存的 token 距过期不足该时间（秒）时在后台提前获取新 token，上传不必等待刷新
+    TOKEN_REFRESH_AHEAD = 300
+
+    # 进程内共享的 access_token 缓存：{(app_id, server_url): (access_token, monotonic 过期时刻)}
+    _TOKEN_CACHE: Dict[tuple, Tuple[str, float]] = {}
+    _TOKEN_LOCK = threading.Lock()
+    # 正在获取 token 的请求：{(app_id, server_url): Event}，同一公众号同时只发起一次获取
+    _TOKEN_INFLIGHT: Dict[tuple, threading.Event] = {}
+    # 上次后台提前刷新的时间：{(app_id, server_url): monotonic 时刻}，服务器返回同一个 token 时避免每次上传都触发刷新
+    _TOKEN_REFRESHED_AHEAD: Dict[tuple, float] = {}
 
     def __init__(
             self,
@@ -119,6 +169,10 @@ class WechatUploader:
             server_token: Optional[str] = None,
             verbose: bool = True,
             proxies: Optional[dict] = None,
+            session: Optional[requests.Session] = None,
+            auto_resize: bool = True,
+            max_bytes_temporary: int = 2 * 1024 * 1024,
+            max_bytes_permanent: int = 10 * 1024 * 1024,
     ):
         """
         初始化微信公众号图床上传器
@@ -131,6 +185,10 @@ class WechatUploader:
         :param server_token: 服务器认证令牌（可选）
         :param verbose: 是否显示详细日志
         :param proxies: 代理配置
+        :param session: 复用的 requests.Session（可选，默认使用模块级共享会话）
+        :param auto_resize: 图片超过大小限制时是否自动压缩（降低 JPEG 质量、缩小尺寸）后再上传
+        :param max_bytes_temporary: 临时素材的大小上限（字节）
+        :param max_bytes_permanent: 永久素材的大小上限（字节）
 
         示例：
             >>> # 自动获取 Token（优先从服务器，失败则直接获取）
@@ -147,6 +205,10 @@ class WechatUploader:
         self.upload_type = upload_type
         self.verbose = verbose
         self.proxies = proxies
+        self.session = session or _get_shared_session()
+        self.auto_resize = auto_resize
+        self.max_bytes_temporary = max_bytes_temporary
+        self.max_bytes_permanent = max_bytes_permanent
 
         # 服务器获取 token 配置
         self.server_url = server_url
@@ -161,9 +223,8 @@ class WechatUploader:
             cache_name = f"wechat_upload_token_{self.app_id}.json"
             self.access_token_file = os.path.join(temp_dir, cache_name)
 
-        # Token 缓存
-        self._access_token = None
-        self._token_expires_at = 0
+        # Token 缓存键（同一公众号的所有实例共享 access_token）
+        self._token_key = (self.app_id, self.server_url)
 
     def upload(self, image) -> str:
         """
@@ -197,43 +258,121 @@ class WechatUploader:
             # 使用 image_uploader 的工具函数转换图片
             file_data, filename = _image_to_bytes(image, format='JPEG')
 
-            # 根据上传类型检查文件大小
-            max_size_mb = self._get_max_size()
-            file_size_mb = len(file_data) / 1024 / 1024
-            if file_size_mb > max_size_mb:
+            # 根据上传类型检查文件大小，超限时先尝试压缩
+            max_bytes = self._get_max_bytes()
+            size = len(file_data)
+            if size > max_bytes and self.auto_resize:
+                source = image if isinstance(image, Image.Image) else None
+                # PIL 图片（记录了原始字节的除外）刚以默认质量 75 编码，更高的质量只会更大
+                encoded_at_default = source is not None and not _is_source_bytes(source, file_data)
+                file_data, filename = self._shrink_to_limit(
+                    file_data, filename, max_bytes, source, encoded_at_default)
+                size = len(file_data)
+
+            if size > max_bytes:
                 raise ValueError(
-                    f"❌ 文件大小超过 {max_size_mb}MB 限制: {file_size_mb:.2f}MB")
+                    f"❌ 文件大小超过 {max_bytes / 1024 / 1024:g}MB 限制: {size / 1024 / 1024:.2f}MB")
 
             # 确保图片格式符合微信要求
             file_data, filename = self._ensure_valid_format(file_data, filename)
 
-            # 根据上传类型选择不同的上传方式
-            if self.upload_type == WechatUploadType.TEMPORARY:
-                return self._upload_temporary(access_token, file_data, filename)
-            elif self.upload_type == WechatUploadType.PERMANENT:
-                return self._upload_permanent(access_token, file_data, filename)
-            elif self.upload_type == WechatUploadType.NEWS_IMAGE:
-                return self._upload_news_image(access_token, file_data, filename)
-            else:
-                raise ValueError(f"❌ 不支持的上传类型: {self.upload_type}")
+            try:
+                return self._upload_by_type(access_token, file_data, filename)
+            except _WechatTokenError:
+                # 缓存的 token 已被微信判定失效（如在别处刷新过），清除缓存后重新获取并重试一次
+                if self.verbose:
+                    _log.warning("  ⚠️  access_token 已失效，重新获取后重试...")
+                self._invalidate_token(access_token)
+                access_token = self._get_access_token()
+                if not access_token:
+                    raise Exception("❌ 获取 access_token 失败")
+                return self._upload_by_type(access_token, file_data, filename)
 
         except Exception as e:
             if self.verbose:
-                print(f"  ❌ 微信图片上传失败: {e}")
+                _log.error("  ❌ 微信图片上传失败: %s", e)
             raise
 
-    def _get_max_size(self) -> int:
-        """获取不同上传类型的最大文件大小限制（MB）"""
-        if self.upload_type == WechatUploadType.TEMPORARY:
-            return 2  # 临时素材 2MB
-        elif self.upload_type == WechatUploadType.PERMANENT:
-            return 10  # 永久素材 10MB
-        elif self.upload_type == WechatUploadType.NEWS_IMAGE:
-            return 1  # 图文消息图片 1MB
-        return 2
+    def _upload_by_type(self, access_token: str, file_data: bytes, filename: str) -> str:
+        """根据上传类型选择不同的上传方式"""
+        if self.upload_type is WechatUploadType.TEMPORARY:
+            return self._upload_temporary(access_token, file_data, filename)
+        elif self.upload_type is WechatUploadType.PERMANENT:
+            return self._upload_permanent(access_token, file_data, filename)
+        elif self.upload_type is WechatUploadType.NEWS_IMAGE:
+            return self._upload_news_image(access_token, file_data, filename)
+        raise ValueError(f"❌ 不支持的上传类型: {self.upload_type}")
+
+    def _get_max_bytes(self) -> int:
+        """获取不同上传类型的最大文件大小限制（字节）"""
+        if self.upload_type is WechatUploadType.PERMANENT:
+            return self.max_bytes_permanent  # 永久素材默认 10MB
+        elif self.upload_type is WechatUploadType.NEWS_IMAGE:
+            return 1024 * 1024  # 图文消息图片 1MB
+        return self.max_bytes_temporary  # 临时素材默认 2MB
+
+    def _shrink_to_limit(self, file_data: bytes, filename: str, max_bytes: int,
+                         source: Optional[Image.Image] = None,
+                         encoded_at_default: bool = False) -> tuple:
+        """
+        将图片压缩到大小限制以内
+
+        先依次降低 JPEG 质量（90 → 80 → 70），仍超限则把尺寸缩小为 1/1.3 后重试，
+        直到满足限制或图片已缩到很小。GIF 动图不处理。
+
+        :param file_data: 超限的图片字节
+        :param filename: 文件名
+        :param max_bytes: 大小上限（字节）
+        :param source: file_data 对应的 PIL 图片（可选），提供时直接使用，不再解码 file_data
+        :param encoded_at_default: file_data 是否为以默认质量 75 编码的 JPEG（已经超限），
+                                   是时原尺寸下只尝试更低的质量
+        :return: (压缩后的字节, 文件名)，无法压缩时原样返回
+        """
+        try:
+            img = source if source is not None else Image.open(BytesIO(file_data))
+            if img.format == 'GIF':
+                return file_data, filename
+
+            img = _to_jpeg_mode(img)
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            original_size = img.size
+            qualities = (70,) if encoded_at_default else (90, 80, 70)
+            # 各次尝试复用同一个缓冲区
+            output = BytesIO()
+            while True:
+                for quality in qualities:
+                    output.seek(0)
+                    output.truncate()
+                    img.save(output, format='JPEG', quality=quality, optimize=True)
+                    if output.tell() <= max_bytes:
+                        if self.verbose:
+                            _log.info("  ℹ️  图片已压缩: %sx%s → %sx%s，%.2fMB → %.2fMB",
+                                      original_size[0], original_size[1], img.size[0], img.size[1],
+                                      len(file_data) / 1024 / 1024, output.tell() / 1024 / 1024)
+                        return output.getvalue(), os.path.splitext(filename)[0] + '.jpg'
+
+                width, height = img.size
+                if min(width, height) < 64:
+                    return file_data, filename
+                # resize 返回新图片，不修改调用方传入的 source
+                img = img.resize((int(width / 1.3), int(height / 1.3)), Image.Resampling.LANCZOS)
+                qualities = (90, 80, 70)
+
+        except Exception as e:
+            if self.verbose:
+                _log.warning("  ⚠️  图片压缩失败: %s", e)
+            return file_data, filename
 
     def _ensure_valid_format(self, file_data: bytes, filename: str) -> tuple:
         """确保图片格式符合微信要求（只支持 JPG、PNG、GIF）"""
+        # 先按文件头快速识别，已是支持的格式则直接上传，不经过 PIL 解码
+        sniffed = _sniff_format(file_data[:12])
+        if sniffed in ('JPEG', 'PNG', 'GIF'):
+            ext = 'jpg' if sniffed == 'JPEG' else sniffed.lower()
+            return file_data, f"{os.path.splitext(filename)[0]}.{ext}"
+
         try:
             img_buffer = BytesIO(file_data)
             img = Image.open(img_buffer)
@@ -244,19 +383,11 @@ class WechatUploader:
             if img_format.upper() not in ['JPEG', 'JPG', 'PNG', 'GIF']:
                 # 转换为 JPEG
                 if self.verbose:
-                    print(f"  ℹ️  将 {img_format} 格式转换为 JPEG")
+                    _log.info("  ℹ️  将 %s 格式转换为 JPEG", img_format)
 
                 output = BytesIO()
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    # 处理透明通道
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'RGBA':
-                        background.paste(img, mask=img.split()[-1])
-                    else:
-                        background.paste(img)
-                    background.save(output, format='JPEG', quality=95)
-                else:
-                    img.save(output, format='JPEG', quality=95)
+                # 处理透明通道
+                _to_jpeg_mode(img).save(output, format='JPEG', quality=95)
 
                 file_data = output.getvalue()
                 filename = os.path.splitext(filename)[0] + '.jpg'
@@ -265,9 +396,34 @@ class WechatUploader:
 
         except Exception as e:
             if self.verbose:
-                print(f"  ⚠️  图片格式检查失败: {e}")
+                _log.warning("  ⚠️  图片格式检查失败: %s", e)
             return file_data, filename
 
+    def _post_media(self, url: str, params: dict, file_data: bytes, filename: str) -> dict:
+        """
+        以流式 multipart 请求体上传图片（media 字段），并检查微信返回的 errcode
+
+        :param url: 上传接口 URL
+        :param params: 查询参数（access_token 等）
+        :param file_data: 图片字节
+        :param filename: 文件名
+        :return: 微信返回的 JSON
+        """
+        body = _MultipartStream('media', filename, BytesIO(file_data), self._get_mime_type(filename))
+        response = self.session.post(
+            url, params=params, data=body, headers={'Content-Type': body.content_type},
+            proxies=self.proxies, timeout=30)
+        response.raise_for_status()
+
+        result = _loads_json(response.content)
+
+        if 'errcode' in result and result['errcode'] != 0:
+            message = f"{result.get('errmsg', '未知错误')} (errcode: {result['errcode']})"
+            if result['errcode'] in _TOKEN_INVALID_ERRCODES:
+                raise _WechatTokenError(message)
+            raise Exception(message)
+        return result
+
     def _upload_temporary(
             self,
             access_token: str,
@@ -276,36 +432,26 @@ class WechatUploader:
     ) -> str:
         """上传临时素材"""
         try:
-            url = f"{self.UPLOAD_TEMP_URL}?access_token={access_token}&type=image"
-
-            # 获取 MIME 类型
-            mime_type = self._get_mime_type(filename)
-            files = {'media': (filename, file_data, mime_type)}
-
             if self.verbose:
-                print(f"  📤 正在上传临时素材到微信公众号...")
+                _log.info("  📤 正在上传临时素材到微信公众号...")
 
-            response = requests.post(
-                url, files=files, proxies=self.proxies, timeout=30)
-            response.raise_for_status()
-
-            result = response.json()
-
-            if 'errcode' in result and result['errcode'] != 0:
-                raise Exception(
-                    f"{result.get('errmsg', '未知错误')} (errcode: {result['errcode']})")
+            result = self._post_media(
+                self.UPLOAD_TEMP_URL, {'access_token': access_token, 'type': 'image'}, file_data, filename)
 
             media_id = result.get('media_id')
             if self.verbose:
-                print(f"  ✅ 微信临时素材上传成功！")
-                print(f"     Media ID: {media_id}")
-                print(f"     有效期: 3天")
+                _log.info("  ✅ 微信临时素材上传成功！")
+                _log.info("     Media ID: %s", media_id)
+                _log.info("     有效期: 3天")
 
             return media_id
 
+        except _WechatTokenError:
+            # access_token 失效由 upload() 重新获取后重试，不在此记录错误
+            raise
         except Exception as e:
             if self.verbose:
-                print(f"  ❌ 上传临时素材失败: {e}")
+                _log.error("  ❌ 上传临时素材失败: %s", e)
             raise
 
     def _upload_permanent(
@@ -316,41 +462,31 @@ class WechatUploader:
     ) -> str:
         """上传永久素材"""
         try:
-            url = f"{self.UPLOAD_PERMANENT_URL}?access_token={access_token}&type=image"
-
-            # 获取 MIME 类型
-            mime_type = self._get_mime_type(filename)
-            files = {'media': (filename, file_data, mime_type)}
-
             if self.verbose:
-                print(f"  📤 正在上传永久素材到微信公众号...")
-
-            response = requests.post(
-                url, files=files, proxies=self.proxies, timeout=30)
-            response.raise_for_status()
+                _log.info("  📤 正在上传永久素材到微信公众号...")
 
-            result = response.json()
-
-            if 'errcode' in result and result['errcode'] != 0:
-                raise Exception(
-                    f"{result.get('errmsg', '未知错误')} (errcode: {result['errcode']})")
+            result = self._post_media(
+                self.UPLOAD_PERMANENT_URL, {'access_token': access_token, 'type': 'image'}, file_data, filename)
 
             media_id = result.get('media_id')
             image_url = result.get('url')
 
             if self.verbose:
-                print(f"  ✅ 微信永久素材上传成功！")
+                _log.info("  ✅ 微信永久素材上传成功！")
                 if media_id:
-                    print(f"     Media ID: {media_id}")
+                    _log.info("     Media ID: %s", media_id)
                 if image_url:
-                    print(f"     URL: {image_url}")
+                    _log.info("     URL: %s", image_url)
 
             # 返回 URL（如果有），否则返回 media_id
             return image_url if image_url else media_id
 
+        except _WechatTokenError:
+            # access_token 失效由 upload() 重新获取后重试，不在此记录错误
+            raise
         except Exception as e:
             if self.verbose:
-                print(f"  ❌ 上传永久素材失败: {e}")
+                _log.error("  ❌ 上传永久素材失败: %s", e)
             raise
 
     def _upload_news_image(
@@ -361,71 +497,151 @@ class WechatUploader:
     ) -> str:
         """上传图文消息图片"""
         try:
-            url = f"{self.UPLOAD_NEWS_IMAGE_URL}?access_token={access_token}"
-
-            # 获取 MIME 类型
-            mime_type = self._get_mime_type(filename)
-            files = {'media': (filename, file_data, mime_type)}
-
             if self.verbose:
-                print(f"  📤 正在上传图文消息图片到微信公众号...")
-
-            response = requests.post(
-                url, files=files, proxies=self.proxies, timeout=30)
-            response.raise_for_status()
+                _log.info("  📤 正在上传图文消息图片到微信公众号...")
 
-            result = response.json()
-
-            if 'errcode' in result and result['errcode'] != 0:
-                raise Exception(
-                    f"{result.get('errmsg', '未知错误')} (errcode: {result['errcode']})")
+            result = self._post_media(
+                self.UPLOAD_NEWS_IMAGE_URL, {'access_token': access_token}, file_data, filename)
 
             image_url = result.get('url')
             if self.verbose:
-                print(f"  ✅ 微信图文消息图片上传成功！")
-                print(f"     URL: {image_url}")
+                _log.info("  ✅ 微信图文消息图片上传成功！")
+                _log.info("     URL: %s", image_url)
 
             return image_url
 
+        except _WechatTokenError:
+            # access_token 失效由 upload() 重新获取后重试，不在此记录错误
+            raise
         except Exception as e:
             if self.verbose:
-                print(f"  ❌ 上传图文消息图片失败: {e}")
+                _log.error("  ❌ 上传图文消息图片失败: %s", e)
             raise
 
     def _get_mime_type(self, filename: str) -> str:
         """根据文件名获取 MIME 类型"""
-        ext = filename.rsplit('.', 1)[-1].lower()
-        mime_types = {
-            'jpg': 'image/jpeg',
-            'jpeg': 'image/jpeg',
-            'png': 'image/png',
-            'gif': 'image/gif'
-        }
-        return mime_types.get(ext, 'image/jpeg')
+        return _MIME_BY_EXT.get(filename.rpartition('.')[2].lower(), 'image/jpeg')
 
     def _get_access_token(self) -> Optional[str]:
         """
         获取 access_token（自动选择最佳方式）
 
         优先级：
-        1. 内存缓存（未过期）
+        1. 内存缓存（未过期，同一公众号的所有实例共享）
         2. 文件缓存（未过期）
         3. 从服务器获取（如果配置了 server_url）
         4. 从微信 API 获取
 
         :return: access_token 或 None
         """
-        # 1. 检查内存缓存
-        if self._access_token and time.time() < self._token_expires_at:
-            if self.verbose:
-                print(f"  ℹ️  使用内存缓存的 access_token")
-            return self._access_token
+        while True:
+            with self._TOKEN_LOCK:
+                # 1. 检查内存缓存（所有实例共享）
+                token = self._get_cached_token()
+                if token:
+                    if self.verbose:
+                        _log.info("  ℹ️  使用内存缓存的 access_token")
+                    self._maybe_refresh_ahead()
+                    return token
+
+                event = self._TOKEN_INFLIGHT.get(self._token_key)
+                is_leader = event is None
+                if is_leader:
+                    event = threading.Event()
+                    self._TOKEN_INFLIGHT[self._token_key] = event
+
+            if is_leader:
+                break
+
+            # 其他线程正在获取，等待其结果；对方失败时由当前线程重新获取
+            event.wait(timeout=30)
+
+        try:
+            return self._fetch_access_token()
+        finally:
+            with self._TOKEN_LOCK:
+                self._TOKEN_INFLIGHT.pop(self._token_key, None)
+            event.set()
 
+    def _maybe_refresh_ahead(self):
+        """
+        缓存的 token 即将过期时启动后台线程获取新 token（调用方需持有 _TOKEN_LOCK）
+
+        与前台获取共用 _TOKEN_INFLIGHT，同一公众号同时只有一个获取请求。
+        """
+        now = time.monotonic()
+        cached = self._TOKEN_CACHE.get(self._token_key)
+        last_refresh = self._TOKEN_REFRESHED_AHEAD.get(self._token_key)
+        if (not cached or now < cached[1] - self.TOKEN_REFRESH_AHEAD
+                or self._token_key in self._TOKEN_INFLIGHT
+                or (last_refresh is not None and now - last_refresh < 60)):
+            return
+
+        self._TOKEN_REFRESHED_AHEAD[self._token_key] = now
+        event = threading.Event()
+        self._TOKEN_INFLIGHT[self._token_key] = event
+
+        def refresh():
+            try:
+                self._fetch_remote_token()
+            finally:
+                with self._TOKEN_LOCK:
+                    self._TOKEN_INFLIGHT.pop(self._token_key, None)
+                event.set()
+
+        threading.Thread(target=refresh, name='msimg-wechat-token', daemon=True).start()
+
+    def _get_cached_token(self) -> Optional[str]:
+        """读取进程内缓存的未过期 access_token"""
+        cached = self._TOKEN_CACHE.get(self._token_key)
+        if cached and time.monotonic() < cached[1]:
+            return cached[0]
+        return None
+
+    def _cache_token(self, access_token: str, ttl: float):
+        """
+        写入进程内 access_token 缓存
+
+        进程内用 monotonic 时钟记录过期时刻，不受系统时间回拨/校时影响；
+        缓存文件跨进程共享，仍保存墙上时间。
+
+        :param access_token: access_token
+        :param ttl: 剩余有效秒数（已扣除提前过期余量）
+        """
+        self._TOKEN_CACHE[self._token_key] = (access_token, time.monotonic() + ttl)
+
+    def _invalidate_token(self, access_token: str):
+        """
+        清除已失效的 access_token（内存缓存和缓存文件）
+
+        只清除仍是该 token 的缓存，其它线程已换上的新 token 会保留。
+
+        :param access_token: 微信判定失效的 access_token
+        """
+        with self._TOKEN_LOCK:
+            cached = self._TOKEN_CACHE.get(self._token_key)
+            if cached and cached[0] == access_token:
+                del self._TOKEN_CACHE[self._token_key]
+
+        try:
+            with open(self.access_token_file, 'rb') as f:
+                data = _loads_json(f.read())
+            if data.get('access_token') == access_token:
+                os.remove(self.access_token_file)
+        except (OSError, ValueError):
+            pass
+
+    def _fetch_access_token(self) -> Optional[str]:
+        """依次从文件缓存、服务器、微信 API 获取 access_token"""
         # 2. 尝试从文件加载
         token = self._load_token_from_file()
         if token:
             return token
 
+        return self._fetch_remote_token()
+
+    def _fetch_remote_token(self) -> Optional[str]:
+        """从服务器（如果配置了）或微信 API 获取新的 access_token"""
         # 3. 如果配置了服务器 URL，优先从服务器获取
         if self.server_url:
             token = self._get_token_from_server()
@@ -433,7 +649,7 @@ class WechatUploader:
                 return token
 
             if self.verbose:
-                print(f"  ⚠️  从服务器获取 token 失败，尝试直接从微信 API 获取...")
+                _log.warning("  ⚠️  从服务器获取 token 失败，尝试直接从微信 API 获取...")
 
         # 4. 从微信 API 获取
         return self._refresh_access_token()
@@ -452,9 +668,9 @@ class WechatUploader:
             try:
                 if self.verbose:
                     if i == 0:
-                        print(f"  🌐 正在从服务器获取 access_token...")
+                        _log.info("  🌐 正在从服务器获取 access_token...")
                     else:
-                        print(f"  🔄 重试从服务器获取 access_token ({i}/{retries})...")
+                        _log.info("  🔄 重试从服务器获取 access_token (%s/%s)...", i, retries)
 
                 headers = {'Content-Type': 'application/json'}
                 data = {}
@@ -463,7 +679,7 @@ class WechatUploader:
                 if self.server_token:
                     data['token'] = self.server_token
 
-                response = requests.post(
+                response = self.session.post(
                     self.server_url,
                     headers=headers,
                     json=data if data else None,
@@ -471,14 +687,14 @@ class WechatUploader:
                     timeout=10
                 )
                 response.raise_for_status()
-                result = response.json()
+                result = _loads_json(response.content)
 
                 # 检查错误信息
                 if result.get("detail"):
                     if self.verbose:
-                        print(f"  ⚠️  服务器返回错误: {result['detail']}")
+                        _log.warning("  ⚠️  服务器返回错误: %s", result['detail'])
                     if i < retries:
-                        time.sleep(1)
+                        time.sleep(_backoff_delay(i))
                         continue
                     return None
 
@@ -488,44 +704,43 @@ class WechatUploader:
 
                 if not access_token:
                     if self.verbose:
-                        print(f"  ⚠️  服务器响应中未找到 access_token")
+                        _log.warning("  ⚠️  服务器响应中未找到 access_token")
                     if i < retries:
-                        time.sleep(1)
+                        time.sleep(_backoff_delay(i))
                         continue
                     return None
 
                 # 缓存 token
-                self._access_token = access_token
-                self._token_expires_at = time.time() + expires_in - self.TOKEN_EXPIRE_MARGIN
+                self._cache_token(access_token, expires_in - self.TOKEN_EXPIRE_MARGIN)
 
                 # 保存到文件
                 self._save_token_to_file(access_token, expires_in)
 
                 if self.verbose:
-                    print(f"  ✅ 从服务器获取 access_token 成功")
-                    print(f"     有效期: {expires_in}秒")
+                    _log.info("  ✅ 从服务器获取 access_token 成功")
+                    _log.info("     有效期: %s秒", expires_in)
 
                 return access_token
 
             except requests.exceptions.RequestException as e:
                 if self.verbose:
-                    print(f"  ⚠️  请求服务器失败: {e}")
+                    _log.warning("  ⚠️  请求服务器失败: %s", e)
                 if i < retries:
-                    time.sleep(1)
+                    time.sleep(_backoff_delay(i))
                     continue
                 return None
             except json.JSONDecodeError as e:
                 if self.verbose:
-                    print(f"  ⚠️  服务器响应解析失败: {e}")
+                    _log.warning("  ⚠️  服务器响应解析失败: %s", e)
                 if i < retries:
-                    time.sleep(1)
+                    time.sleep(_backoff_delay(i))
                     continue
                 return None
             except Exception as e:
                 if self.verbose:
-                    print(f"  ⚠️  从服务器获取 token 时发生错误: {e}")
+                    _log.warning("  ⚠️  从服务器获取 token 时发生错误: %s", e)
                 if i < retries:
-                    time.sleep(1)
+                    time.sleep(_backoff_delay(i))
                     continue
                 return None
 
@@ -535,19 +750,19 @@ class WechatUploader:
         """使用 AppID 和 AppSecret 从微信 API 获取 access_token"""
         try:
             if self.verbose:
-                print(f"  🔄 正在从微信 API 获取 access_token...")
+                _log.info("  🔄 正在从微信 API 获取 access_token...")
 
-            url = f"{self.TOKEN_URL}?grant_type=client_credential&appid={self.app_id}&secret={self.app_secret}"
+            params = {'grant_type': 'client_credential', 'appid': self.app_id, 'secret': self.app_secret}
 
-            response = requests.get(url, proxies=self.proxies, timeout=10)
+            response = self.session.get(self.TOKEN_URL, params=params, proxies=self.proxies, timeout=10)
             response.raise_for_status()
 
-            result = response.json()
+            result = _loads_json(response.content)
 
             if 'errcode' in result:
                 error_msg = result.get('errmsg', '未知错误')
                 if self.verbose:
-                    print(f"  ❌ 获取 access_token 失败: {error_msg}")
+                    _log.error("  ❌ 获取 access_token 失败: %s", error_msg)
                 return None
 
             access_token = result.get('access_token')
@@ -555,25 +770,24 @@ class WechatUploader:
 
             if not access_token:
                 if self.verbose:
-                    print(f"  ❌ 响应中未找到 access_token")
+                    _log.error("  ❌ 响应中未找到 access_token")
                 return None
 
             # 缓存 token
-            self._access_token = access_token
-            self._token_expires_at = time.time() + expires_in - self.TOKEN_EXPIRE_MARGIN
+            self._cache_token(access_token, expires_in - self.TOKEN_EXPIRE_MARGIN)
 
             # 保存到文件
             self._save_token_to_file(access_token, expires_in)
 
             if self.verbose:
-                print(f"  ✅ 从微信 API 获取 access_token 成功")
-                print(f"     有效期: {expires_in}秒")
+                _log.info("  ✅ 从微信 API 获取 access_token 成功")
+                _log.info("     有效期: %s秒", expires_in)
 
             return access_token
 
         except Exception as e:
             if self.verbose:
-                print(f"  ❌ 从微信 API 获取 access_token 失败: {e}")
+                _log.error("  ❌ 从微信 API 获取 access_token 失败: %s", e)
             return None
 
     def _load_token_from_file(self) -> Optional[str]:
@@ -582,31 +796,31 @@ class WechatUploader:
             if not os.path.exists(self.access_token_file):
                 return None
 
-            with open(self.access_token_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(self.access_token_file, 'rb') as f:
+                data = _loads_json(f.read())
 
             access_token = data.get('access_token')
             expires_at = data.get('expire_time', 0)
 
             # 检查是否过期
-            if time.time() < expires_at:
-                self._access_token = access_token
-                self._token_expires_at = expires_at
+            remaining = expires_at - time.time()
+            if remaining > 0:
+                self._cache_token(access_token, remaining)
                 if self.verbose:
-                    print(f"  ✅ 从缓存文件加载 access_token 成功")
+                    _log.info("  ✅ 从缓存文件加载 access_token 成功")
                 return access_token
             else:
                 if self.verbose:
-                    print(f"  ⚠️  缓存的 access_token 已过期")
+                    _log.warning("  ⚠️  缓存的 access_token 已过期")
                 return None
 
         except json.JSONDecodeError:
             if self.verbose:
-                print(f"  ⚠️  缓存文件解析失败")
+                _log.warning("  ⚠️  缓存文件解析失败")
             return None
         except Exception as e:
             if self.verbose:
-                print(f"  ⚠️  加载缓存文件失败: {e}")
+                _log.warning("  ⚠️  加载缓存文件失败: %s", e)
             return None
 
     def _save_token_to_file(self, access_token: str, expires_in: int):
@@ -624,15 +838,21 @@ class WechatUploader:
                 'updated_at': time.time(),
             }
 
-            with open(self.access_token_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            # 先写临时文件再 os.replace，进程中途退出或多进程同时写入时，读取方不会看到写了一半的文件
+            with tempfile.NamedTemporaryFile(
+                    'wb', dir=dir_path or '.', suffix='.tmp', delete=False) as f:
+                f.write(_dumps_json(data))
+                f.flush()
+                os.fsync(f.fileno())
+                tmp_path = f.name
+            os.replace(tmp_path, self.access_token_file)
 
             if self.verbose:
-                print(f"  💾 access_token 已缓存到: {self.access_token_file}")
+                _log.info("  💾 access_token 已缓存到: %s", self.access_token_file)
 
         except Exception as e:
             if self.verbose:
-                print(f"  ⚠️  保存 access_token 缓存失败: {e}")
+                _log.warning("  ⚠️  保存 access_token 缓存失败: %s", e)
 
 
 # ============================================================================
@@ -645,6 +865,13 @@ def create_wechat_uploader(
         upload_type: WechatUploadType = WechatUploadType.TEMPORARY,
         server_url: Optional[str] = None,
         server_token: Optional[str] = None,
+        cache: bool = True,
+        cache_size: int = 1000,
+        persistent_cache_dir: Optional[str] = None,
+        rate_limit_rpm: Optional[int] = None,
+        auto_resize: bool = True,
+        max_bytes_temporary: int = 2 * 1024 * 1024,
+        max_bytes_permanent: int = 10 * 1024 * 1024,
         **kwargs
 ) -> callable:
     """
@@ -655,6 +882,14 @@ def create_wechat_uploader(
     :param upload_type: 上传类型（TEMPORARY/PERMANENT/NEWS_IMAGE），默认 TEMPORARY
     :param server_url: 从服务器获取 access_token 的 URL（可选）
     :param server_token: 服务器认证令牌（可选）
+    :param cache: 是否缓存上传结果（相同图片直接返回上次的 media_id/url）
+    :param cache_size: 最大缓存条目数
+    :param persistent_cache_dir: 磁盘缓存目录（如 DEFAULT_UPLOAD_CACHE_DIR），进程重启后仍可命中
+    :param rate_limit_rpm: 每分钟最大上传次数（令牌桶限流，默认 None 不限流）；
+                           批量上传时建议设为 20，超出后调用会阻塞等待
+    :param auto_resize: 图片超过大小限制时是否自动压缩后再上传
+    :param max_bytes_temporary: 临时素材的大小上限（字节）
+    :param max_bytes_permanent: 永久素材的大小上限（字节）
     :param kwargs: 其他参数传递给 WechatUploader
     :return: 上传函数
 
@@ -678,13 +913,29 @@ def create_wechat_uploader(
         ...     upload_on_success=True
         ... )
     """
+    kwargs.setdefault('session', _get_shared_session())
     uploader = WechatUploader(
         app_id=app_id,
         app_secret=app_secret,
         upload_type=upload_type,
         server_url=server_url,
         server_token=server_token,
+        auto_resize=auto_resize,
+        max_bytes_temporary=max_bytes_temporary,
+        max_bytes_permanent=max_bytes_permanent,
         **kwargs
     )
 
-    return uploader.upload
\ No newline at end of file
+    # 临时素材 3 天后失效，缓存提前 1 小时过期
+    if upload_type is WechatUploadType.TEMPORARY:
+        cache_ttl = 3 * 24 * 3600 - 3600
+    else:
+        cache_ttl = UPLOAD_CACHE_TTL
+
+    return _with_upload_cache(
+        _with_rate_limit(uploader.upload, rate_limit_rpm), cache, cache_size, persistent_cache_dir,
+        cache_namespace=f'wechat:{app_id}:{upload_type.value}',
+        cache_ttl=cache_ttl,
+        # 微信需要 JPEG，统一转换的自动格式（PIL 图片为 PNG）还要再解码压缩，直接接收原始图片
+        canonical=False,
+    )
\ No newline at end of file
@@ -0,0 +1,229 @@
+# 作者：Xiaoqiang
+# 微信公众号：XiaoqiangClub
+# GitHub：https://github.com/xiaoqiangclub
+# 邮箱：xiaoqiangclub@hotmail.com
+# 创建时间：2025-01-20 10:00
+# 文件描述：回调管理器单元测试
+# 文件路径：tests/test_callbacks.py
+
+import json
+import threading
+import time
+from io import BytesIO
+
+from PIL import Image
+
+import msimg.image_uploader as image_uploader
+from msimg.callbacks import ImageUploadManager, NotificationManager, ResourceSelector
+from msimg.image_uploader import _remember_source_bytes, _with_upload_cache, create_local_uploader
+from msimg.strategies import NotificationMode, SelectionStrategy
+
+
+class TestImageUploadManager:
+    """测试图床上传管理器"""
+
+    def test_failover_to_next_host(self):
+        """测试第一个图床失败时使用下一个"""
+        def broken(image):
+            raise RuntimeError("boom")
+
+        manager = ImageUploadManager([broken, lambda image: "https://b.example/1.png"], verbose=False)
+        assert manager.upload(b"img") == "https://b.example/1.png"
+
+    def test_hedge_slow_host(self):
+        """测试第一个图床过慢时并发尝试下一个"""
+        def slow(image):
+            time.sleep(2)
+            return "https://slow.example/1.png"
+
+        manager = ImageUploadManager(
+            [slow, lambda image: "https://fast.example/1.png"], verbose=False, hedge_delay=0.1)
+        start = time.monotonic()
+        assert manager.upload(b"img") == "https://fast.example/1.png"
+        assert time.monotonic() - start < 1
+
+    def test_parallel_mirrors_to_all_hosts(self):
+        """测试并行策略同时上传到所有图床，耗时约等于最慢的图床"""
+        uploaded = []
+
+        def make_host(name):
+            def host(image):
+                time.sleep(0.3)
+                uploaded.append(name)
+                return f"https://{name}.example/1.png"
+            return host
+
+        manager = ImageUploadManager([make_host(n) for n in "abc"],
+                                     strategy=SelectionStrategy.PARALLEL, verbose=False)
+        start = time.monotonic()
+        assert manager.upload(b"parallel-img") == "https://a.example/1.png"
+        assert sorted(uploaded) == ["a", "b", "c"]
+        assert time.monotonic() - start < 0.8
+
+    def test_same_image_not_reuploaded(self):
+        """测试同一回调上传相同图片时使用缓存的 URL"""
+        calls = []
+
+        def upload(image):
+            calls.append(image)
+            return "https://a.example/1.png"
+
+        ImageUploadManager.clear_cache()
+        for _ in range(2):
+            assert ImageUploadManager([upload], verbose=False).upload(b"same") == "https://a.example/1.png"
+        assert len(calls) == 1
+
+    def test_cached_upload_not_rehashed(self, monkeypatch):
+        """测试再次上传同一张图片时命中结果缓存，不调用回调也不重新计算摘要"""
+        buffer = BytesIO()
+        Image.new('RGB', (8, 8), 'blue').save(buffer, format='PNG')
+        data = buffer.getvalue()
+        image = Image.open(BytesIO(data))
+        _remember_source_bytes(image, data)
+        calls = []
+
+        def upload(img):
+            calls.append(img)
+            return "https://a.example/blue.png"
+
+        ImageUploadManager.clear_cache()
+        manager = ImageUploadManager([upload], verbose=False)
+        assert manager.upload(image) == "https://a.example/blue.png"
+
+        hashes = []
+        real_sha256 = image_uploader.hashlib.sha256
+        monkeypatch.setattr(image_uploader.hashlib, 'sha256', lambda *a: hashes.append(a) or real_sha256(*a))
+        assert manager.upload(image) == "https://a.example/blue.png"
+        assert len(calls) == 1
+        assert hashes == []
+
+    def test_result_cache_opt_out(self):
+        """测试 cache=False 的内置图床函数和 result_cache=False 时不复用上次的 URL"""
+        calls = []
+
+        def upload(image):
+            calls.append(image)
+            return f"https://a.example/{len(calls)}.png"
+
+        ImageUploadManager.clear_cache()
+        uncached = _with_upload_cache(upload, cache=False)
+        for callbacks, kwargs in (([uncached], {}), ([upload], {'result_cache': False})):
+            calls.clear()
+            manager = ImageUploadManager(callbacks, verbose=False, **kwargs)
+            assert manager.upload(b"same") != manager.upload(b"same")
+            assert len(calls) == 2
+
+    def test_non_canonical_builtin_receives_original(self, tmp_path):
+        """测试本地存储等不接收统一字节的内置图床，故障转移时仍收到原始图片"""
+        path = tmp_path / "photo.png"
+        Image.new('RGB', (4, 4), 'red').save(path)
+
+        def broken(image):
+            raise RuntimeError("boom")
+
+        broken.__canonical__ = True
+        local = create_local_uploader(str(tmp_path / "store"), "https://cdn.example")
+        assert not local.__canonical__
+        url = ImageUploadManager([broken, local], verbose=False).upload(str(path))
+        assert url.endswith("_photo.png")
+
+    def test_canonical_callbacks_receive_bytes(self):
+        """测试故障转移时内置图床函数收到统一转换后的字节，其他回调收到原始图片"""
+        received = []
+
+        def broken(image):
+            received.append(image)
+            raise RuntimeError("boom")
+
+        def ok(image):
+            received.append(image)
+            return "https://ok.example/1.png"
+
+        broken.__canonical__ = True
+        ok.__canonical__ = True
+        img = Image.new('RGB', (4, 4), 'red')
+        manager = ImageUploadManager([broken, lambda image: received.append(image), ok],
+                                     verbose=False, hedge_delay=None)
+        assert manager.upload(img) == "https://ok.example/1.png"
+        assert isinstance(received[0], bytes)
+        assert received[1] is img
+        assert received[2] is received[0]
+
+
+class TestResourceSelector:
+    """测试资源选择器"""
+
+    def test_skip_used(self):
+        """测试跳过已失败的资源（位掩码与集合两种写法）"""
+        selector = ResourceSelector(SelectionStrategy.SEQUENTIAL)
+        assert selector.select(['a', 'b', 'c'], used_mask=0b011) == ('c', 2)
+        assert selector.select(['a', 'b', 'c'], {0}) == ('b', 1)
+        assert selector.select(['a', 'b'], used_mask=0b11) == (None, -1)
+
+    def test_round_robin(self):
+        """测试轮询选择"""
+        selector = ResourceSelector(SelectionStrategy.ROUND_ROBIN)
+        picks = [selector.select(['a', 'b', 'c'])[0] for _ in range(4)]
+        assert picks == ['a', 'b', 'c', 'a']
+        assert selector.select(['a', 'b', 'c'], used_mask=0b010) == ('c', 2)
+
+
+class TestNotificationManager:
+    """测试通知管理器"""
+
+    def test_notify_all_concurrently(self):
+        """测试多个通知回调并发发送，且 notify 返回前全部完成"""
+        received = []
+
+        def make_callback(name):
+            def callback(data):
+                time.sleep(0.2)
+                received.append(name)
+            return callback
+
+        manager = NotificationManager([make_callback(n) for n in "abc"], mode=NotificationMode.ALL,
+                                      strategy=SelectionStrategy.PARALLEL, verbose=False)
+        start = time.monotonic()
+        manager.notify("done")
+        assert sorted(received) == ["a", "b", "c"]
+        assert time.monotonic() - start < 0.5
+
+    def test_sequential_notify_in_order_on_caller_thread(self):
+        """测试顺序策略在调用线程中按列表顺序发送通知"""
+        received = []
+
+        def make_callback(name):
+            def callback(data):
+                received.append((name, threading.current_thread()))
+            return callback
+
+        manager = NotificationManager([make_callback(n) for n in "abc"], mode=NotificationMode.ALL, verbose=False)
+        manager.notify("done")
+        assert received == [(n, threading.current_thread()) for n in "abc"]
+
+    def test_mode_none_is_noop(self):
+        """测试不发送通知时 notify 为空操作，且实例不带 __dict__"""
+        calls = []
+        manager = NotificationManager([calls.append], mode=NotificationMode.NONE, verbose=False)
+        manager.notify("done")
+        assert calls == []
+        assert not hasattr(manager, "__dict__")
+
+    def test_compiled_notify_honours_mode(self):
+        """测试生成的 notify 按模式过滤消息，单个回调时直接调用且吞掉回调异常"""
+        received = []
+        manager = NotificationManager([received.append], mode=NotificationMode.ERROR, verbose=False)
+        manager.notify("ok", is_success=True)
+        manager.notify("failed", is_success=False, data={"code": 1})
+        assert [p["message"] for p in received] == ["failed"]
+        assert received[0]["data"] == {"code": 1}
+
+        # 没有附加数据时也是普通字典，回调可以直接序列化为 JSON
+        payloads = []
+        NotificationManager([payloads.append], mode=NotificationMode.ALL, verbose=False).notify("ok")
+        assert json.dumps(payloads[0]) == '{"message": "ok", "is_success": true, "data": {}}'
+
+        def broken(payload):
+            raise RuntimeError("boom")
+
+        NotificationManager([broken], mode=NotificationMode.ALL, verbose=True).notify("x")
@@ -6,7 +6,11 @@
 # 文件描述：单元测试
 # 文件路径：tests/test_generator.py
 
+import time
+
 import pytest
+import requests
+from PIL import Image
 from msimg import (
     generate_image,
     APIConfig,
@@ -14,63 +18,52 @@ from msimg import (
     NotificationMode,
     ValidationError,
 )
-from msimg.generator import _parse_api_configs, _parse_models
+from msimg.generator import (
+    _create_retry,
+    _generate_image_single,
+    _get_session,
+    _parse_api_configs,
+    _parse_models,
+)
 
 
 class TestParseAPIConfigs:
     """测试 API 配置解析"""
-    
-    def test_parse_single_string(self):
-        """测试单个字符串"""
-        result = _parse_api_configs("test-key")
-        assert len(result) == 1
-        assert result[0].api_key == "test-key"
-    
-    def test_parse_string_list(self):
-        """测试字符串列表"""
-        result = _parse_api_configs(["key1", "key2"])
-        assert len(result) == 2
-        assert result[0].api_key == "key1"
-        assert result[1].api_key == "key2"
-    
-    def test_parse_api_config(self):
-        """测试 APIConfig 对象"""
-        config = APIConfig(api_key="test-key", name="Test")
-        result = _parse_api_configs(config)
-        assert len(result) == 1
-        assert result[0].api_key == "test-key"
-        assert result[0].name == "Test"
-    
-    def test_parse_mixed_list(self):
-        """测试混合列表"""
-        configs = [
-            "key1",
-            APIConfig(api_key="key2", name="API2")
-        ]
-        result = _parse_api_configs(configs)
-        assert len(result) == 2
-        assert result[0].api_key == "key1"
-        assert result[1].name == "API2"
+
+    @pytest.mark.parametrize("inp,expected", [
+        # 单个字符串
+        ("test-key", [{"api_key": "test-key"}]),
+        # 字符串列表
+        (["key1", "key2"], [{"api_key": "key1"}, {"api_key": "key2"}]),
+        # APIConfig 对象
+        (APIConfig(api_key="test-key", name="Test"), [{"api_key": "test-key", "name": "Test"}]),
+        # 混合列表
+        (["key1", APIConfig(api_key="key2", name="API2")],
+         [{"api_key": "key1"}, {"api_key": "key2", "name": "API2"}]),
+    ], ids=["single_string", "string_list", "api_config", "mixed_list"])
+    def test_parse_api_configs(self, inp, expected):
+        """测试各种输入形式都能解析为 APIConfig 列表"""
+        result = _parse_api_configs(inp)
+        assert len(result) == len(expected)
+        for config, fields in zip(result, expected):
+            for attr, value in fields.items():
+                assert getattr(config, attr) == value
 
 
 class TestParseModels:
     """测试模型解析"""
-    
-    def test_parse_preset_name(self):
-        """测试预设名称"""
-        result = _parse_models("qwen")
-        assert result == ["Qwen/Qwen-Image"]
-    
-    def test_parse_full_id(self):
-        """测试完整 ID"""
-        result = _parse_models("Custom/Model-ID")
-        assert result == ["Custom/Model-ID"]
-    
-    def test_parse_list(self):
-        """测试列表"""
-        result = _parse_models(["qwen", "flux-majic"])
-        assert len(result) == 2
-        assert "Qwen/Qwen-Image" in result
+
+    @pytest.mark.parametrize("inp,expected", [
+        # 预设名称
+        ("qwen", ["Qwen/Qwen-Image"]),
+        # 完整 ID
+        ("Custom/Model-ID", ["Custom/Model-ID"]),
+        # 列表
+        (["qwen", "flux-majic"], ["Qwen/Qwen-Image", "MAILAND/majicflus_v1"]),
+    ], ids=["preset_name", "full_id", "list"])
+    def test_parse_models(self, inp, expected):
+        """测试预设名称与完整模型 ID 的解析"""
+        assert _parse_models(inp) == expected
 
 
 class TestValidation:
@@ -86,6 +79,150 @@ class TestValidation:
             )
 
 
+class TestSessionCache:
+    """测试生成任务 Session 缓存"""
+    
+    def test_reuse_per_api(self):
+        """测试同一 API 复用 Session，不同 API Key 使用不同 Session"""
+        a = APIConfig(api_key="session-key-a")
+        b = APIConfig(api_key="session-key-b")
+        assert _get_session(a, None) is _get_session(APIConfig(api_key="session-key-a"), None)
+        assert _get_session(a, None) is not _get_session(b, None)
+        assert _get_session(a, {"https": "http://proxy"}) is not _get_session(a, None)
+
+
+class TestParallelAttempts:
+    """测试并行尝试多个 (API, 模型) 组合"""
+    
+    def test_first_success_wins(self, monkeypatch):
+        """测试慢组合不阻塞快组合，返回最先成功的结果"""
+        def fake_single(api_config, model, cancel_event=None, **kwargs):
+            if api_config.api_key == "slow":
+                cancel_event.wait(5)
+                return None
+            return Image.new("RGB", (4, 4))
+        
+        monkeypatch.setattr("msimg.generator._generate_image_single", fake_single)
+        start = time.monotonic()
+        result = generate_image(
+            prompt="test",
+            api_configs=[APIConfig(api_key="slow", name="slow"), APIConfig(api_key="fast", name="fast")],
+            models=["model-a"],
+            parallel_attempts=2,
+            verbose=False,
+        )
+        assert result["api"] == "fast"
+        assert time.monotonic() - start < 2
+
+
+class _FakeResponse:
+    """模拟 requests 响应"""
+
+    def __init__(self, content, headers=None):
+        self.content = content
+        self.headers = headers or {}
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+
+class _EagerLongPollSession:
+    """确认长轮询（Preference-Applied: wait）却立即返回进行中状态的服务端"""
+
+    def __init__(self):
+        self.polls = 0
+
+    def post(self, url, **kwargs):
+        return _FakeResponse(b'{"task_id": "t1"}')
+
+    def get(self, url, **kwargs):
+        self.polls += 1
+        return _FakeResponse(b'{"task_status": "RUNNING"}', {"Preference-Applied": "wait=25"})
+
+
+class TestSubmitRetry:
+    """测试提交任务的重试策略"""
+
+    def test_post_not_retried_on_server_error(self):
+        """测试 POST 不因 5xx / 429 被 urllib3 自动重发（可能重复生成），GET 仍会重试"""
+        retry = _create_retry(3, True, 0.1, 1, False)
+        assert not retry.is_retry("POST", 502)
+        assert not retry.is_retry("POST", 429)
+        assert retry.is_retry("GET", 502)
+
+
+class _UnavailablePollSession(_EagerLongPollSession):
+    """任务状态查询始终返回 503 的服务端"""
+
+    def get(self, url, **kwargs):
+        self.polls += 1
+        response = _FakeResponse(b'', {"Retry-After": "20"})
+        response.status_code = 503
+
+        def raise_for_status():
+            raise requests.exceptions.HTTPError("503 Service Unavailable", response=response)
+
+        response.raise_for_status = raise_for_status
+        return response
+
+
+class TestPolling:
+    """测试任务状态轮询"""
+
+    def test_poll_retries_bounded_by_budget(self):
+        """测试查询失败时的重试等待不超过 poll_timeout 剩余预算"""
+        session = _UnavailablePollSession()
+        start = time.monotonic()
+        result = _generate_image_single(
+            prompt="test", api_config=APIConfig(api_key="key"), model="model-a", size_str="64x64",
+            max_retries=10, retry_on_network_error=True, retry_backoff_base=0.3, retry_backoff_cap=30,
+            retry_jitter=False, submit_timeout=5, poll_timeout=1, download_timeout=5,
+            poll_interval_initial=0.2, poll_interval_max=1, poll_growth=1.5, poll_long_wait=None,
+            verbose=False, proxies=None, session=session,
+        )
+        assert result is None
+        assert time.monotonic() - start < 1.5
+
+    def test_eager_long_poll_does_not_spin(self):
+        """测试服务端确认长轮询却立即返回时仍按最小间隔查询，不会空转"""
+        session = _EagerLongPollSession()
+        result = _generate_image_single(
+            prompt="test", api_config=APIConfig(api_key="key"), model="model-a", size_str="64x64",
+            max_retries=0, retry_on_network_error=False, retry_backoff_base=0.1, retry_backoff_cap=1,
+            retry_jitter=False, submit_timeout=5, poll_timeout=1, download_timeout=5,
+            poll_interval_initial=0.2, poll_interval_max=1, poll_growth=1.5, poll_long_wait=25,
+            verbose=False, proxies=None, session=session,
+        )
+        assert result is None
+        assert session.polls <= 10
+
+
+class TestGenerationCache:
+    """测试生成结果缓存"""
+    
+    def test_identical_request_uses_cache(self, monkeypatch):
+        """测试开启 cache_ttl 后相同请求不再提交任务"""
+        calls = []
+        
+        def fake_single(api_config, model, **kwargs):
+            calls.append(model)
+            return Image.new("RGB", (4, 4), "blue")
+        
+        monkeypatch.setattr("msimg.generator._generate_image_single", fake_single)
+        kwargs = dict(prompt="cache-test", api_configs="key", models=["model-a"], cache_ttl=60, verbose=False)
+        first = generate_image(**kwargs)
+        second = generate_image(**kwargs)
+        assert calls == ["model-a"]
+        assert second["image"].getpixel((0, 0)) == first["image"].getpixel((0, 0))
+        assert generate_image(**{**kwargs, "cache_ttl": None}) is not None
+        assert len(calls) == 2
+
+        # 换用其他 API 时不复用缓存，返回的 api 始终是本次调用的 API
+        other = generate_image(**{**kwargs, "api_configs": APIConfig(api_key="key2", name="Other")})
+        assert len(calls) == 3 and other["api"] == "Other"
+
+
 # 注意：以下测试需要真实的 API Key 才能运行
 # 在实际环境中取消注释并配置
 
@@ -100,4 +237,5 @@ class TestValidation:
 #             verbose=False
 #         )
 #         assert result is not None
-#         assert 'image' in result
\ No newline at end of file
+#         assert 'image' in result
+
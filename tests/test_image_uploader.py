@@ -0,0 +1,290 @@
+# 作者：Xiaoqiang
+# 微信公众号：XiaoqiangClub
+# GitHub：https://github.com/xiaoqiangclub
+# 邮箱：xiaoqiangclub@hotmail.com
+# 创建时间：2025-01-20 10:00
+# 文件描述：图床上传工具单元测试
+# 文件路径：tests/test_image_uploader.py
+
+import asyncio
+import base64
+import shutil
+import time
+from io import BytesIO
+
+from PIL import Image, ImageFile
+
+from msimg.image_uploader import (
+    LocalStorageUploader,
+    LuoGuoUploader,
+    TokenBucket,
+    _MultipartStream,
+    _filename_timestamp,
+    _image_cache_key,
+    _image_to_bytes,
+    _pixels_loaded,
+    _remember_source_bytes,
+    _sniff_format,
+    _with_upload_cache,
+    create_local_uploader,
+    upload_batch,
+)
+
+
+class TestUploadCache:
+    """测试上传结果缓存"""
+
+    def test_same_image_uploaded_once(self):
+        """测试相同图片只上传一次"""
+        calls = []
+
+        def upload(image):
+            calls.append(image)
+            return f"https://example.com/{len(calls)}.png"
+
+        uploader = _with_upload_cache(upload)
+        first = uploader(b"image-bytes")
+        second = uploader(b"image-bytes")
+        assert first == second
+        assert len(calls) == 1
+
+    def test_lru_eviction(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        uploader = _with_upload_cache(lambda image: f"url-{image!r}", cache_size=2)
+        uploader(b"a")
+        uploader(b"b")
+        uploader(b"c")
+        assert len(uploader.cache) == 2
+        assert uploader.cache.get(_image_cache_key(b"a")) is None
+
+    def test_pil_image_key(self):
+        """测试 PIL 图片按像素内容计算缓存键"""
+        red1 = Image.new('RGB', (8, 8), 'red')
+        red2 = Image.new('RGB', (8, 8), 'red')
+        blue = Image.new('RGB', (8, 8), 'blue')
+        assert _image_cache_key(red1) == _image_cache_key(red2)
+        assert _image_cache_key(red1) != _image_cache_key(blue)
+
+    def test_disk_cache_survives_restart(self, tmp_path):
+        """测试磁盘缓存在新的上传函数（模拟进程重启）中仍可命中"""
+        calls = []
+
+        def upload(image):
+            calls.append(image)
+            return "https://example.com/a.png"
+
+        _with_upload_cache(upload, persistent_cache_dir=tmp_path, cache_namespace='test')(b"img")
+        url = _with_upload_cache(upload, persistent_cache_dir=tmp_path, cache_namespace='test')(b"img")
+        assert url == "https://example.com/a.png"
+        assert len(calls) == 1
+
+
+class TestTokenBucket:
+    """测试令牌桶限流"""
+
+    def test_burst_then_wait(self):
+        """测试令牌用完后按速率等待"""
+        bucket = TokenBucket(rpm=600, capacity=2)  # 每 0.1 秒补充一个令牌
+        start = time.monotonic()
+        bucket.acquire()
+        bucket.acquire()
+        assert time.monotonic() - start < 0.05
+        bucket.acquire()
+        assert time.monotonic() - start >= 0.08
+
+
+class TestMultipartStream:
+    """测试流式 multipart 请求体"""
+
+    def test_chunked_read_matches_full_body(self):
+        """测试分块读取与一次性读取结果一致，且可倒回重读"""
+        data = bytes(range(256)) * 100
+        body = _MultipartStream('file', 'a.png', BytesIO(data), 'image/png')
+        full = body.read()
+        assert len(full) == len(body)
+        assert data in full
+
+        body.seek(0)
+        assert b''.join(iter(body)) == full
+
+    def test_mime_type_from_filename(self):
+        """测试未指定 MIME 类型时根据文件名推断"""
+        assert b'Content-Type: image/png' in _MultipartStream('file', 'a.png', BytesIO(b'x')).read()
+        assert b'Content-Type: application/octet-stream' in _MultipartStream('file', 'a', BytesIO(b'x')).read()
+
+
+class TestFilenameTimestamp:
+    """测试文件名时间戳"""
+
+    def test_matches_strftime(self, monkeypatch):
+        """测试手工格式化结果与 strftime 一致"""
+        now = 1737338400.5
+        monkeypatch.setattr(time, 'time', lambda: now)
+        assert _filename_timestamp() == time.strftime('%Y%m%d_%H%M%S', time.localtime(now))
+        assert _filename_timestamp('/') == time.strftime('%Y%m%d/%H%M%S', time.localtime(now))
+
+
+class TestSniffFormat:
+    """测试文件头格式识别"""
+
+    def test_sniff_matches_pil(self):
+        """测试识别结果与 PIL 编码格式一致"""
+        img = Image.new('RGB', (4, 4), 'red')
+        for fmt in ('JPEG', 'PNG', 'GIF', 'WEBP'):
+            buffer = BytesIO()
+            img.save(buffer, format=fmt)
+            assert _sniff_format(buffer.getvalue()) == fmt
+        assert _sniff_format(b'not an image') is None
+
+
+class TestBase64Input:
+    """测试 Base64 图片输入"""
+
+    def test_decode_once_and_fallback_to_path(self, tmp_path, monkeypatch):
+        """测试 Base64 正常解码，形似 Base64 的文件名按本地路径处理"""
+        buffer = BytesIO()
+        Image.new('RGB', (4, 4), 'red').save(buffer, format='PNG')
+        data = buffer.getvalue()
+        encoded = base64.b64encode(data).decode('ascii')
+        assert _image_to_bytes(encoded)[0] == data
+        assert _image_to_bytes('data:image/png;base64,' + encoded)[0] == data
+
+        monkeypatch.chdir(tmp_path)
+        name = 'A' * 40 + '.png'
+        (tmp_path / name).write_bytes(data)
+        assert _image_to_bytes(name)[0] == data
+
+
+class TestEncodeCache:
+    """测试 PIL 图片编码结果缓存"""
+
+    def test_reuse_until_modified(self):
+        """测试同一张图片只编码一次，修改像素后重新编码"""
+        img = Image.new('RGB', (8, 8), 'red')
+        first = _image_to_bytes(img)[0]
+        assert _image_to_bytes(img)[0] is first
+
+        img.putpixel((0, 0), (0, 0, 255))
+        assert _image_to_bytes(img)[0] != first
+
+    def test_forward_source_bytes(self):
+        """测试下载得到的图片以相同格式上传时直接使用原始字节"""
+        buffer = BytesIO()
+        Image.new('RGB', (8, 8), 'green').save(buffer, format='PNG')
+        raw = buffer.getvalue()
+        img = Image.open(BytesIO(raw))
+        _remember_source_bytes(img, raw)
+        assert _image_to_bytes(img, format='PNG')[0] is raw
+
+    def test_source_bytes_deferred_until_modified(self):
+        """测试记录原始字节时不解码像素，原地修改后不再使用原始字节"""
+        buffer = BytesIO()
+        Image.new('RGB', (8, 8), 'green').save(buffer, format='PNG')
+        raw = buffer.getvalue()
+        img = Image.open(BytesIO(raw))
+        _remember_source_bytes(img, raw)
+        assert not _pixels_loaded(img)
+        assert _image_to_bytes(img.convert('RGB'))[0] is not raw
+
+        img.putpixel((0, 0), (255, 0, 0))
+        assert _image_to_bytes(img)[0] != raw
+
+    def test_generated_image_uploaded_without_decoding(self, tmp_path, monkeypatch):
+        """测试下载得到的图片经默认开启缓存的上传函数上传时不解码像素，原始字节原样写入"""
+        buffer = BytesIO()
+        Image.new('RGB', (8, 8), 'green').save(buffer, format='PNG')
+        raw = buffer.getvalue()
+        img = Image.open(BytesIO(raw))
+        _remember_source_bytes(img, raw)
+
+        loads = []
+        original_load = ImageFile.ImageFile.load
+        monkeypatch.setattr(ImageFile.ImageFile, "load",
+                            lambda self: loads.append(1) or original_load(self))
+
+        upload = create_local_uploader(str(tmp_path), 'https://example.com')
+        url = upload(img)
+        assert upload(img) == url
+        assert (tmp_path / url[len('https://example.com/'):]).read_bytes() == raw
+        assert loads == []
+
+    def test_pixel_digest_once_per_upload(self, monkeypatch):
+        """测试上传缓存键与编码缓存共用一次像素摘要"""
+        calls = []
+        original_tobytes = Image.Image.tobytes
+        monkeypatch.setattr(Image.Image, "tobytes",
+                            lambda self, *args: calls.append(1) or original_tobytes(self, *args))
+
+        upload = _with_upload_cache(lambda image: len(_image_to_bytes(image)[0]))
+        assert upload(Image.new('RGB', (8, 8), 'purple'))
+        assert len(calls) == 1
+
+    def test_jpeg_flattens_alpha(self):
+        """测试带透明通道的图片可以直接编码为 JPEG"""
+        img = Image.new('RGBA', (8, 8), (255, 0, 0, 128))
+        data, filename = _image_to_bytes(img, format='JPEG')
+        assert _sniff_format(data) == 'JPEG' and filename.endswith('.jpeg')
+
+    def test_auto_format_passthrough(self):
+        """测试自动格式下 JPEG 原样透传，文件名扩展名与实际格式一致"""
+        buffer = BytesIO()
+        Image.new('RGB', (8, 8), 'green').save(buffer, format='JPEG')
+        raw = buffer.getvalue()
+        assert _image_to_bytes(raw, format=None)[1].endswith('.jpeg')
+
+        img = Image.open(BytesIO(raw))
+        _remember_source_bytes(img, raw)
+        data, filename = _image_to_bytes(img, format=None)
+        assert data is raw and filename.endswith('.jpeg')
+
+
+class TestLocalStorage:
+    """测试本地存储上传器"""
+
+    def test_path_and_bytes_saved_identically(self, tmp_path):
+        """测试本地文件直接复制，与字节输入得到相同的摘要和内容"""
+        data = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 64
+        source = tmp_path / 'src.png'
+        source.write_bytes(data)
+        uploader = LocalStorageUploader(str(tmp_path / 'store'), 'https://example.com/')
+
+        url = uploader.upload(str(source))
+        assert url.startswith('https://example.com/') and url.endswith('_src.png')
+        saved = tmp_path / 'store' / url[len('https://example.com/'):]
+        assert saved.read_bytes() == data
+        assert uploader.upload(data).split('/')[-1][:8] == saved.name[:8]
+
+    def test_recreates_removed_date_dir(self, tmp_path):
+        """测试日期目录被外部删除后，下次上传重新创建目录"""
+        uploader = LocalStorageUploader(str(tmp_path / 'store'), 'https://example.com')
+        url = uploader.upload(b'first')
+        date_dir = (tmp_path / 'store' / url[len('https://example.com/'):]).parent
+        shutil.rmtree(date_dir)
+
+        url = uploader.upload(b'second')
+        assert (tmp_path / 'store' / url[len('https://example.com/'):]).read_bytes() == b'second'
+
+
+class TestUploadBatch:
+    """测试批量上传"""
+
+    def test_concurrent_and_ordered(self):
+        """测试并发上传且结果顺序与输入一致，失败位置为 None"""
+        def upload(image):
+            time.sleep(0.2)
+            if image == b'bad':
+                raise RuntimeError('boom')
+            return f"https://example.com/{image.decode()}.png"
+
+        start = time.monotonic()
+        urls = upload_batch(upload, [b'a', b'bad', b'c', b'd'])
+        assert urls == ["https://example.com/a.png", None, "https://example.com/c.png", "https://example.com/d.png"]
+        assert time.monotonic() - start < 0.6
+
+    def test_upload_many_async(self):
+        """测试异步并发上传（上传器类的 upload_many_async 方法）"""
+        uploader = LuoGuoUploader()
+        uploader.upload = lambda image: f"https://example.com/{image.decode()}.png"
+
+        urls = asyncio.run(uploader.upload_many_async([b'a', b'b']))
+        assert urls == ["https://example.com/a.png", "https://example.com/b.png"]
@@ -0,0 +1,135 @@
+# 作者：Xiaoqiang
+# 微信公众号：XiaoqiangClub
+# GitHub：https://github.com/xiaoqiangclub
+# 邮箱：xiaoqiangclub@hotmail.com
+# 创建时间：2025-01-20 10:00
+# 文件描述：微信公众号图床上传器单元测试
+# 文件路径：tests/test_wechat_uploader.py
+
+import logging
+import threading
+import time
+
+from PIL import Image
+
+from msimg.wechat_uploader import WechatUploader, _WechatTokenError
+
+
+class TestTokenCache:
+    """测试 access_token 进程内共享缓存"""
+
+    def test_instances_share_token_and_fetch_once(self, monkeypatch):
+        """测试并发获取同一公众号的 token 时只请求一次"""
+        WechatUploader._TOKEN_CACHE.clear()
+        calls = []
+
+        def fake_fetch(self):
+            calls.append(1)
+            time.sleep(0.05)
+            self._cache_token("token-123", 3600)
+            return "token-123"
+
+        monkeypatch.setattr(WechatUploader, "_fetch_access_token", fake_fetch)
+
+        tokens = []
+        uploaders = [WechatUploader("wx_test", "secret", verbose=False) for _ in range(5)]
+        threads = [threading.Thread(target=lambda u=u: tokens.append(u._get_access_token()))
+                   for u in uploaders]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert tokens == ["token-123"] * 5
+        assert len(calls) == 1
+        WechatUploader._TOKEN_CACHE.clear()
+
+    def test_token_file_roundtrip(self, tmp_path):
+        """测试 token 缓存文件原子写入后可以正常读取，且不残留临时文件"""
+        WechatUploader._TOKEN_CACHE.clear()
+        token_file = tmp_path / "token.json"
+        uploader = WechatUploader("wx_file", "secret", access_token_file=str(token_file), verbose=False)
+
+        uploader._save_token_to_file("token-456", 7200)
+        assert uploader._load_token_from_file() == "token-456"
+        assert [p.name for p in tmp_path.iterdir()] == ["token.json"]
+        WechatUploader._TOKEN_CACHE.clear()
+
+    def test_refresh_ahead_in_background(self, monkeypatch):
+        """测试 token 即将过期时仍返回当前 token，并只在后台刷新一次"""
+        WechatUploader._TOKEN_CACHE.clear()
+        WechatUploader._TOKEN_REFRESHED_AHEAD.clear()
+        refreshed = threading.Event()
+        calls = []
+
+        def fake_remote(self):
+            calls.append(1)
+            self._cache_token("token-new", 3600)
+            refreshed.set()
+            return "token-new"
+
+        monkeypatch.setattr(WechatUploader, "_fetch_remote_token", fake_remote)
+
+        uploader = WechatUploader("wx_ahead", "secret", verbose=False)
+        uploader._cache_token("token-old", 60)
+        assert uploader._get_access_token() == "token-old"
+        assert uploader._get_access_token() == "token-old" or refreshed.is_set()
+        assert refreshed.wait(1)
+        assert uploader._get_access_token() == "token-new"
+        assert len(calls) == 1
+        WechatUploader._TOKEN_CACHE.clear()
+
+    def test_invalid_token_refetched_once(self, tmp_path, monkeypatch, caplog):
+        """测试微信返回 token 失效错误码时清除缓存、重新获取 token 并重试一次，且不记录上传失败的错误日志"""
+        WechatUploader._TOKEN_CACHE.clear()
+        WechatUploader._TOKEN_REFRESHED_AHEAD.clear()
+        used = []
+
+        def fake_remote(self):
+            self._cache_token("token-new", 3600)
+            return "token-new"
+
+        def fake_post(self, url, params, file_data, filename):
+            used.append(params['access_token'])
+            if params['access_token'] == "token-stale":
+                raise _WechatTokenError("invalid credential (errcode: 40001)")
+            return {'media_id': 'media-1'}
+
+        monkeypatch.setattr(WechatUploader, "_fetch_remote_token", fake_remote)
+        monkeypatch.setattr(WechatUploader, "_post_media", fake_post)
+
+        uploader = WechatUploader("wx_stale", "secret", access_token_file=str(tmp_path / "token.json"),
+                                  verbose=True)
+        uploader._save_token_to_file("token-stale", 7200)
+        uploader._cache_token("token-stale", 3600)
+
+        with caplog.at_level(logging.INFO, logger='msimg.uploader'):
+            assert uploader.upload(Image.new('RGB', (8, 8))) == 'media-1'
+        assert used == ["token-stale", "token-new"]
+        assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+        WechatUploader._TOKEN_CACHE.clear()
+
+
+class TestShrinkToLimit:
+    """测试超限图片压缩"""
+
+    def test_default_encoded_png_skips_higher_quality(self, tmp_path, monkeypatch):
+        """测试从 PNG 文件打开的图片以默认质量编码超限后，原尺寸下不再尝试更高的质量"""
+        path = tmp_path / "noise.png"
+        Image.effect_noise((256, 256), 64).convert('RGB').save(path)
+        qualities = []
+        original_save = Image.Image.save
+
+        def spy_save(self, fp, format=None, **params):
+            if 'quality' in params:
+                qualities.append(params['quality'])
+            return original_save(self, fp, format=format, **params)
+
+        monkeypatch.setattr(Image.Image, "save", spy_save)
+        monkeypatch.setattr(WechatUploader, "_get_access_token", lambda self: "token")
+        monkeypatch.setattr(WechatUploader, "_get_max_bytes", lambda self: 20 * 1024)
+        monkeypatch.setattr(WechatUploader, "_upload_by_type", lambda self, token, data, name: len(data))
+
+        uploader = WechatUploader("wx_shrink", "secret", verbose=False)
+        assert uploader.upload(Image.open(path)) <= 20 * 1024
+        assert qualities and qualities[0] == 70